@@ -4,18 +4,18 @@ import hmac
 import json
 import os
 import time
-import urllib.parse
-import urllib.request
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
 from fastapi import Depends, HTTPException, Request
 from pydantic import BaseModel
 
+from .core import http_client
 from .core.config import get_auth_secret_or_raise
 from .core.logging import get_request_id, logger
 from .db import execute, fetch_one
 from .repositories import rbac_repo
+from .search import USER_SEARCH, invalidate_search_index
 from .services import rbac_service
 
 
@@ -111,13 +111,11 @@ def _verify_token(token: str, secret: str) -> Dict[str, Any]:
 
 
 def _http_get_json(url: str, params: Dict[str, str], timeout: int) -> Dict[str, Any]:
-    query = urllib.parse.urlencode(params)
-    full_url = f"{url}?{query}" if query else url
     endpoint = str(url or "").split("?")[0]
     try:
-        with urllib.request.urlopen(full_url, timeout=timeout) as resp:
-            data = resp.read().decode("utf-8")
-        return json.loads(data)
+        resp = http_client.request("GET", url, params=params, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
     except Exception as exc:
         logger.warning(
             "dingtalk_http_get_failed endpoint=%s rid=%s err=%s",
@@ -129,18 +127,11 @@ def _http_get_json(url: str, params: Dict[str, str], timeout: int) -> Dict[str,
 
 
 def _http_post_json(url: str, body: Dict[str, Any], timeout: int) -> Dict[str, Any]:
-    payload = json.dumps(body).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
     endpoint = str(url or "").split("?")[0]
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            data = resp.read().decode("utf-8")
-        return json.loads(data)
+        resp = http_client.request("POST", url, json=body, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
     except Exception as exc:
         logger.warning(
             "dingtalk_http_post_failed endpoint=%s rid=%s err=%s",
@@ -470,6 +461,7 @@ def _upsert_user(userid: str, username: str, avatar_url: Optional[str], default_
         """,
         (userid, username, avatar_url, default_role),
     )
+    invalidate_search_index(USER_SEARCH)
 
     row = fetch_one(USER_SELECT_SQL, (userid,))
     if not row:
@@ -513,6 +505,8 @@ def refresh_user_profile(userid: str) -> Dict[str, Any]:
             """,
             (username, avatar_url, userid),
         )
+        if username:
+            invalidate_search_index(USER_SEARCH)
         if affected == 0:
             default_role = _env("DINGTALK_DEFAULT_ROLE", "operator") or "operator"
             _upsert_user(userid, username or userid, avatar_url, default_role)
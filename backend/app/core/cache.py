@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+CacheTag = Tuple[Any, ...]
+
+
+class TaggedTTLCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 2048) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, Any, Tuple[CacheTag, ...]]] = {}
+        self._tag_index: Dict[CacheTag, Set[Hashable]] = {}
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tag_index.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._tag_index[tag]
+
+    def _purge_expired(self, now: float) -> None:
+        for key in [key for key, entry in self._entries.items() if entry[0] <= now]:
+            self._remove(key)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                self._remove(key)
+                return None
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[CacheTag] = (), ttl_seconds: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + (self._ttl_seconds if ttl_seconds is None else ttl_seconds)
+        unique_tags = tuple(dict.fromkeys(tags))
+        with self._lock:
+            self._remove(key)
+            if len(self._entries) >= self._max_entries:
+                self._purge_expired(now)
+            self._entries[key] = (expires_at, value, unique_tags)
+            for tag in unique_tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+
+    def invalidate_tags(self, *tags: CacheTag) -> int:
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tag_index.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+        return removed
+
+    def patch_tag(self, tag: CacheTag, patcher: Callable[[Any], Any]) -> int:
+        """Replace every live entry under `tag` with `patcher(value)`; entries keep their tags and expiry."""
+        now = time.time()
+        patched = 0
+        with self._lock:
+            for key in list(self._tag_index.get(tag, ())):
+                expires_at, value, entry_tags = self._entries[key]
+                if expires_at <= now:
+                    self._remove(key)
+                    continue
+                self._entries[key] = (expires_at, patcher(value), entry_tags)
+                patched += 1
+        return patched
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
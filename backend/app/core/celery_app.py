@@ -19,6 +19,8 @@ celery_app = Celery(
     backend=result_backend,
     include=[
         "app.tasks.ai_insight_tasks",
+        "app.tasks.bsr_import_tasks",
+        "app.tasks.keepa_import_tasks",
     ],
 )
 
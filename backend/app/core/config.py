@@ -17,6 +17,41 @@ def normalize_site(value: Optional[str]) -> str:
     return DEFAULT_BSR_SITE
 
 
+def env_str(name: str, default: str = "") -> str:
+    """Stripped value of an environment variable; unset or blank gives default."""
+    value = str(os.getenv(name, "") or "").strip()
+    return value or default
+
+
+def env_int(name: str, default: int) -> int:
+    value = env_str(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    value = env_str(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = env_str(name).lower()
+    if value in {"1", "true", "yes", "y", "on"}:
+        return True
+    if value in {"0", "false", "no", "n", "off"}:
+        return False
+    return default
+
+
 def get_required_env(name: str) -> str:
     value = str(os.getenv(name, "")).strip()
     if not value:
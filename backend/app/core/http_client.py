@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Union
+
+import httpx
+
+from .config import env_bool, env_float, env_int
+from .logging import logger
+
+TimeoutValue = Union[float, httpx.Timeout, None]
+
+_RETRY_STATUSES = {429, 502, 503, 504}
+# The server says it did not act on the request, so even a POST can be sent again.
+_NOT_PROCESSED_STATUSES = {429, 503}
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Safe to retry even for POST: the request never reached the server.
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+_MAX_BACKOFF_SECONDS = 10.0
+
+
+def _http2_enabled() -> bool:
+    # httpx only speaks HTTP/2 with the optional h2 package; without it the pool stays on HTTP/1.1 keep-alive.
+    return env_bool("HTTP_CLIENT_HTTP2", True) and importlib.util.find_spec("h2") is not None
+
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "http2": _http2_enabled(),
+        "limits": httpx.Limits(
+            max_connections=env_int("HTTP_CLIENT_MAX_CONNECTIONS", 100),
+            max_keepalive_connections=env_int("HTTP_CLIENT_MAX_KEEPALIVE", 20),
+            keepalive_expiry=env_float("HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS", 30.0),
+        ),
+        "timeout": httpx.Timeout(env_float("HTTP_CLIENT_TIMEOUT_SECONDS", 15.0), connect=5.0),
+        "follow_redirects": True,
+    }
+
+
+def _per_host_limit() -> int:
+    return max(1, env_int("HTTP_CLIENT_PER_HOST_LIMIT", 8))
+
+
+def _default_retries() -> int:
+    return max(0, env_int("HTTP_CLIENT_RETRIES", 2))
+
+
+def _backoff_seconds(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    if response is not None:
+        retry_after = response.headers.get("retry-after", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), _MAX_BACKOFF_SECONDS)
+    base = env_float("HTTP_CLIENT_BACKOFF_SECONDS", 0.5)
+    # Full jitter: concurrent callers hitting the same outage do not retry in lockstep.
+    return random.uniform(0, min(_MAX_BACKOFF_SECONDS, base * (2**attempt)))
+
+
+def _should_retry_status(response: httpx.Response, method: str, attempt: int, retries: int) -> bool:
+    if attempt >= retries:
+        return False
+    statuses = _RETRY_STATUSES if method in _IDEMPOTENT_METHODS else _NOT_PROCESSED_STATUSES
+    return response.status_code in statuses
+
+
+def _should_retry_error(exc: httpx.HTTPError, method: str, attempt: int, retries: int) -> bool:
+    if attempt >= retries:
+        return False
+    if isinstance(exc, _NOT_SENT_ERRORS):
+        return True
+    return method in _IDEMPOTENT_METHODS and isinstance(exc, httpx.TransportError)
+
+
+_sync_lock = threading.Lock()
+_sync_client: Optional[httpx.Client] = None
+_sync_pid: Optional[int] = None
+_sync_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+
+
+def get_client() -> httpx.Client:
+    """Process-wide pooled client; recreated after fork so Celery children never share sockets."""
+    global _sync_client, _sync_pid
+    pid = os.getpid()
+    if _sync_client is not None and _sync_pid == pid:
+        return _sync_client
+    with _sync_lock:
+        if _sync_client is None or _sync_pid != pid:
+            _sync_client = httpx.Client(**_client_options())
+            _sync_pid = pid
+            _sync_host_slots.clear()
+        return _sync_client
+
+
+@contextmanager
+def _host_slot(host: str) -> Iterator[None]:
+    with _sync_lock:
+        slot = _sync_host_slots.get(host)
+        if slot is None:
+            slot = _sync_host_slots[host] = threading.BoundedSemaphore(_per_host_limit())
+    if not slot.acquire(timeout=env_float("HTTP_CLIENT_HOST_WAIT_SECONDS", 30.0)):
+        raise httpx.PoolTimeout(f"per-host limit reached for {host}")
+    try:
+        yield
+    finally:
+        slot.release()
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    json: Any = None,
+    content: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: TimeoutValue = None,
+    retries: Optional[int] = None,
+) -> httpx.Response:
+    """Blocking request on the shared pool; the response is fully read. Idempotent methods retry
+    429/502/503/504 and transport errors, others only 429/503 and failures before the request was sent."""
+    method = method.upper()
+    max_retries = _default_retries() if retries is None else retries
+    client = get_client()
+    host = httpx.URL(url).host
+    options: Dict[str, Any] = {"params": params, "json": json, "content": content, "headers": headers}
+    if timeout is not None:
+        options["timeout"] = timeout
+    attempt = 0
+    while True:
+        try:
+            with _host_slot(host):
+                response = client.request(method, url, **options)
+        except httpx.HTTPError as exc:
+            if not _should_retry_error(exc, method, attempt, max_retries):
+                raise
+            delay = _backoff_seconds(attempt)
+            logger.warning("http_retry method=%s host=%s attempt=%s err=%s", method, host, attempt + 1, exc)
+        else:
+            if not _should_retry_status(response, method, attempt, max_retries):
+                return response
+            delay = _backoff_seconds(attempt, response)
+            logger.warning("http_retry method=%s host=%s attempt=%s status=%s", method, host, attempt + 1, response.status_code)
+        time.sleep(delay)
+        attempt += 1
+
+
+class _AsyncState:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.client = httpx.AsyncClient(**_client_options())
+        self.host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def host_slot(self, host: str) -> AsyncIterator[None]:
+        slot = self.host_slots.get(host)
+        if slot is None:
+            slot = self.host_slots[host] = asyncio.Semaphore(_per_host_limit())
+        # Same bound as the sync _host_slot: a caller must not queue silently behind long streams.
+        try:
+            await asyncio.wait_for(slot.acquire(), timeout=env_float("HTTP_CLIENT_HOST_WAIT_SECONDS", 30.0))
+        except asyncio.TimeoutError:
+            raise httpx.PoolTimeout(f"per-host limit reached for {host}") from None
+        try:
+            yield
+        finally:
+            slot.release()
+
+
+_async_state: Optional[_AsyncState] = None
+
+
+def _get_async_state() -> _AsyncState:
+    # Async connections belong to one event loop; the API has exactly one, scripts may start others.
+    global _async_state
+    loop = asyncio.get_running_loop()
+    if _async_state is None or _async_state.loop is not loop:
+        _async_state = _AsyncState(loop)
+    return _async_state
+
+
+def get_async_client() -> httpx.AsyncClient:
+    return _get_async_state().client
+
+
+async def arequest(
+    method: str,
+    url: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    json: Any = None,
+    content: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: TimeoutValue = None,
+    retries: Optional[int] = None,
+) -> httpx.Response:
+    """Async counterpart of request() with the same retry rules."""
+    method = method.upper()
+    max_retries = _default_retries() if retries is None else retries
+    state = _get_async_state()
+    host = httpx.URL(url).host
+    options: Dict[str, Any] = {"params": params, "json": json, "content": content, "headers": headers}
+    if timeout is not None:
+        options["timeout"] = timeout
+    attempt = 0
+    while True:
+        try:
+            async with state.host_slot(host):
+                response = await state.client.request(method, url, **options)
+        except httpx.HTTPError as exc:
+            if not _should_retry_error(exc, method, attempt, max_retries):
+                raise
+            delay = _backoff_seconds(attempt)
+            logger.warning("http_retry method=%s host=%s attempt=%s err=%s", method, host, attempt + 1, exc)
+        else:
+            if not _should_retry_status(response, method, attempt, max_retries):
+                return response
+            delay = _backoff_seconds(attempt, response)
+            logger.warning("http_retry method=%s host=%s attempt=%s status=%s", method, host, attempt + 1, response.status_code)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+@asynccontextmanager
+async def astream(
+    method: str,
+    url: str,
+    *,
+    content: Optional[bytes] = None,
+    json: Any = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: TimeoutValue = None,
+    retries: Optional[int] = None,
+) -> AsyncIterator[httpx.Response]:
+    """Streaming response on the shared async pool. Retries stop once the response is yielded: only
+    failures before the request was sent and 429/503 answers (read before any body) are retried."""
+    method = method.upper()
+    max_retries = _default_retries() if retries is None else retries
+    state = _get_async_state()
+    host = httpx.URL(url).host
+    options: Dict[str, Any] = {"content": content, "json": json, "headers": headers}
+    if timeout is not None:
+        options["timeout"] = timeout
+    async with state.host_slot(host):
+        attempt = 0
+        while True:
+            try:
+                response = await state.client.send(state.client.build_request(method, url, **options), stream=True)
+            except _NOT_SENT_ERRORS as exc:
+                if attempt >= max_retries:
+                    raise
+                delay = _backoff_seconds(attempt)
+                logger.warning("http_retry method=%s host=%s attempt=%s err=%s", method, host, attempt + 1, exc)
+            else:
+                if attempt >= max_retries or response.status_code not in _NOT_PROCESSED_STATUSES:
+                    break
+                # Drain the short error body so the connection goes back to the pool.
+                await response.aread()
+                await response.aclose()
+                delay = _backoff_seconds(attempt, response)
+                logger.warning("http_retry method=%s host=%s attempt=%s status=%s", method, host, attempt + 1, response.status_code)
+            await asyncio.sleep(delay)
+            attempt += 1
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+
+def close_clients() -> None:
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
+
+
+async def aclose_clients() -> None:
+    global _async_state
+    state, _async_state = _async_state, None
+    if state is not None and state.loop is asyncio.get_running_loop():
+        await state.client.aclose()
+    close_clients()
+
+
+__all__ = ["aclose_clients", "arequest", "astream", "close_clients", "get_async_client", "get_client", "request"]
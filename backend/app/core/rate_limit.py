@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import env_float
+from .logging import logger
+from .redis_client import get_redis
+
+# Token bucket kept in one Redis hash so every API and worker process shares the budget.
+# Returns "0" when a token was taken, otherwise the seconds until the next token.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RateLimitTimeout(RuntimeError):
+    pass
+
+
+class RateLimiter:
+    """Global token bucket (Redis) with a per-process fallback when Redis is unreachable.
+
+    per_minute_env = 0 disables the limiter.
+    """
+
+    def __init__(self, name: str, per_minute_env: str, default_per_minute: float, burst_env: str, default_burst: float) -> None:
+        self.name = name
+        self._per_minute_env = per_minute_env
+        self._default_per_minute = default_per_minute
+        self._burst_env = burst_env
+        self._default_burst = default_burst
+        self._lock = threading.Lock()
+        self._local_tokens: Optional[float] = None
+        self._local_ts = 0.0
+        self._redis_retry_at = 0.0
+
+    def _settings(self) -> tuple[float, float]:
+        per_minute = env_float(self._per_minute_env, self._default_per_minute)
+        burst = max(1.0, env_float(self._burst_env, self._default_burst))
+        return per_minute / 60.0, burst
+
+    def _try_local(self, rate: float, capacity: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens = capacity if self._local_tokens is None else self._local_tokens
+            tokens = min(capacity, tokens + max(0.0, now - self._local_ts) * rate)
+            self._local_ts = now
+            if tokens >= 1:
+                self._local_tokens = tokens - 1
+                return 0.0
+            self._local_tokens = tokens
+            return (1 - tokens) / rate
+
+    def try_acquire(self) -> float:
+        """Takes a token if one is available; returns 0.0 on success, else the seconds to wait."""
+        rate, capacity = self._settings()
+        if rate <= 0:
+            return 0.0
+        if time.monotonic() < self._redis_retry_at:
+            return self._try_local(rate, capacity)
+        try:
+            wait = get_redis().eval(_TOKEN_BUCKET_SCRIPT, 1, f"bi_amazon:rate_limit:{self.name}", rate, capacity, time.time())
+            return float(wait)
+        except Exception as exc:
+            # Skip Redis for a while instead of paying its connect timeout on every call.
+            self._redis_retry_at = time.monotonic() + 30
+            logger.warning("rate_limit_redis_unavailable name=%s err=%s (per-process limit for 30s)", self.name, exc)
+            return self._try_local(rate, capacity)
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"rate limit {self.name} exhausted")
+            time.sleep(wait)
+
+    async def aacquire(self, timeout: Optional[float] = None) -> None:
+        # try_acquire does a blocking Redis eval (up to its connect timeout when Redis is down), so keep it off the loop.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = await run_in_threadpool(self.try_acquire)
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"rate limit {self.name} exhausted")
+            await asyncio.sleep(wait)
+
+
+openrouter_rate_limiter = RateLimiter(
+    "openrouter",
+    per_minute_env="OPENROUTER_RATE_LIMIT_PER_MINUTE",
+    default_per_minute=30,
+    burst_env="OPENROUTER_RATE_LIMIT_BURST",
+    default_burst=5,
+)
+
+
+__all__ = ["RateLimitTimeout", "RateLimiter", "openrouter_rate_limiter"]
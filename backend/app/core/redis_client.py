@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from .celery_app import broker_url
+
+_lock = threading.Lock()
+_client: Optional[redis.Redis] = None
+_client_pid: Optional[int] = None
+_async_client: Optional[aioredis.Redis] = None
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def redis_url() -> str:
+    # Coordination state (rate limits, locks, job events) shares the broker's Redis unless told otherwise.
+    return str(os.getenv("APP_REDIS_URL", "") or "").strip() or broker_url
+
+
+def get_redis() -> redis.Redis:
+    """Process-wide client with its own connection pool; recreated after fork."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _client = redis.Redis.from_url(
+                redis_url(),
+                socket_timeout=2,
+                socket_connect_timeout=2,
+                health_check_interval=30,
+                decode_responses=True,
+            )
+            _client_pid = pid
+        return _client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Client bound to the running event loop, for pub/sub listeners inside the API."""
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_loop is not loop:
+        _async_client = aioredis.Redis.from_url(
+            redis_url(),
+            socket_connect_timeout=2,
+            health_check_interval=30,
+            decode_responses=True,
+        )
+        _async_loop = loop
+    return _async_client
+
+
+async def aclose_redis() -> None:
+    global _async_client, _async_loop
+    client, loop = _async_client, _async_loop
+    _async_client, _async_loop = None, None
+    if client is not None and loop is asyncio.get_running_loop():
+        await client.aclose()
+
+
+__all__ = ["aclose_redis", "get_async_redis", "get_redis", "redis_url"]
@@ -1,6 +1,12 @@
+import datetime as dt
 import os
+import tempfile
 import threading
+import time
+import uuid
 from contextlib import contextmanager
+from dataclasses import dataclass
+from decimal import Decimal
 from typing import Any, Dict, Iterable, List, Optional, Sequence
 from urllib.parse import quote_plus
 
@@ -9,28 +15,19 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 
-from .core.config import get_required_env
+from .core.config import env_bool, env_int, get_required_env
+from .core.logging import logger
 
 load_dotenv()
 _ENGINE: Optional[Engine] = None
 _ENGINE_LOCK = threading.Lock()
 
 
-def _env_int(name: str, default: int) -> int:
-    value = os.getenv(name)
-    if value is None or value == "":
-        return default
-    try:
-        return int(value)
-    except ValueError:
-        return default
-
-
 def _build_db_url() -> str:
     user = quote_plus(get_required_env("DB_USER"))
     password = quote_plus(get_required_env("DB_PASSWORD"))
     host = get_required_env("DB_HOST")
-    port = _env_int("DB_PORT", 3306)
+    port = env_int("DB_PORT", 3306)
     database = quote_plus(get_required_env("DB_NAME"))
     return f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4"
 
@@ -45,11 +42,12 @@ def _get_engine() -> Engine:
             return _ENGINE
         _ENGINE = create_engine(
             _build_db_url(),
-            pool_size=_env_int("DB_POOL_SIZE", 10),
-            max_overflow=_env_int("DB_MAX_OVERFLOW", 20),
-            pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
-            pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+            pool_size=env_int("DB_POOL_SIZE", 10),
+            max_overflow=env_int("DB_MAX_OVERFLOW", 20),
+            pool_timeout=env_int("DB_POOL_TIMEOUT", 30),
+            pool_recycle=env_int("DB_POOL_RECYCLE", 1800),
             pool_pre_ping=True,
+            connect_args={"local_infile": True} if env_bool("DB_LOCAL_INFILE", False) else {},
         )
     return _ENGINE
 
@@ -73,7 +71,7 @@ def get_db_config() -> dict:
     # Keep this for callers that need connection metadata.
     return {
         "host": get_required_env("DB_HOST"),
-        "port": _env_int("DB_PORT", 3306),
+        "port": env_int("DB_PORT", 3306),
         "user": get_required_env("DB_USER"),
         "password": get_required_env("DB_PASSWORD"),
         "database": get_required_env("DB_NAME"),
@@ -140,3 +138,135 @@ def execute_insert(sql: str, params: QueryParams = None) -> int:
             lastrowid = int(cursor.lastrowid)
         conn.commit()
     return lastrowid
+
+
+@dataclass
+class BulkWriteResult:
+    table: str
+    rows: int
+    statements: int
+    method: str
+    elapsed_ms: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / (self.elapsed_ms / 1000) if self.elapsed_ms > 0 else float(self.rows)
+
+
+def _upsert_clause(columns: Sequence[str], update_columns: Optional[Sequence[str]]) -> str:
+    targets = list(update_columns) if update_columns is not None else list(columns)
+    if not targets:
+        # Nothing to update: keep the existing row untouched.
+        return f"ON DUPLICATE KEY UPDATE {columns[0]} = {columns[0]}"
+    return "ON DUPLICATE KEY UPDATE " + ", ".join(f"{col} = VALUES({col})" for col in targets)
+
+
+def _insert_chunks(cursor, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]], upsert: str) -> int:
+    prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    suffix = f" {upsert}"
+    row_template = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    budget = max(64 * 1024, env_int("DB_BULK_MAX_STATEMENT_BYTES", 4 * 1024 * 1024))
+    statements = 0
+    chunk: List[str] = []
+    size = len(prefix) + len(suffix)
+    for row in rows:
+        literal = cursor.mogrify(row_template, tuple(row))
+        literal_size = len(literal.encode("utf-8")) + 1
+        if chunk and size + literal_size > budget:
+            cursor.execute(prefix + ",".join(chunk) + suffix)
+            statements += 1
+            chunk = []
+            size = len(prefix) + len(suffix)
+        chunk.append(literal)
+        size += literal_size
+    if chunk:
+        cursor.execute(prefix + ",".join(chunk) + suffix)
+        statements += 1
+    return statements
+
+
+def _tsv_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (dt.datetime, dt.date)):
+        return value.isoformat(sep=" ") if isinstance(value, dt.datetime) else value.isoformat()
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _load_data_merge(cursor, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]], upsert: str) -> int:
+    column_list = ", ".join(columns)
+    staging = f"tmp_bulk_{uuid.uuid4().hex[:12]}"
+    # No keys on the staging copy, so duplicate keys inside one batch still resolve last-wins in the merge.
+    cursor.execute(f"CREATE TEMPORARY TABLE {staging} SELECT {column_list} FROM {table} LIMIT 0")
+    try:
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".tsv", newline="", delete=False) as handle:
+            for row in rows:
+                handle.write("\t".join(_tsv_value(value) for value in row))
+                handle.write("\n")
+            path = handle.name
+        try:
+            cursor.execute(
+                f"""
+                LOAD DATA LOCAL INFILE %s INTO TABLE {staging}
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                LINES TERMINATED BY '\\n'
+                ({column_list})
+                """,
+                (path,),
+            )
+        finally:
+            os.unlink(path)
+        cursor.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} {upsert}")
+    finally:
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging}")
+    return 2
+
+
+def bulk_upsert(
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    update_columns: Optional[Sequence[str]] = None,
+    connection=None,
+) -> BulkWriteResult:
+    """Write `rows` with multi-row INSERT ... ON DUPLICATE KEY UPDATE statements capped at
+    DB_BULK_MAX_STATEMENT_BYTES, or via LOAD DATA LOCAL INFILE plus a set-based merge when
+    DB_LOCAL_INFILE is on and the batch has at least DB_BULK_LOAD_DATA_MIN_ROWS rows.
+
+    With an explicit `connection` the caller owns the transaction; otherwise one is opened and committed.
+    """
+    row_list = rows if isinstance(rows, list) else list(rows)
+    if not row_list:
+        return BulkWriteResult(table, 0, 0, "none", 0.0)
+    upsert = _upsert_clause(columns, update_columns)
+    use_load_data = env_bool("DB_LOCAL_INFILE", False) and len(row_list) >= env_int("DB_BULK_LOAD_DATA_MIN_ROWS", 5000)
+    method = "load_data" if use_load_data else "insert"
+
+    started = time.perf_counter()
+    if connection is None:
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                writer = _load_data_merge if use_load_data else _insert_chunks
+                statements = writer(cursor, table, columns, row_list, upsert)
+            conn.commit()
+    else:
+        with connection.cursor() as cursor:
+            writer = _load_data_merge if use_load_data else _insert_chunks
+            statements = writer(cursor, table, columns, row_list, upsert)
+    result = BulkWriteResult(table, len(row_list), statements, method, round((time.perf_counter() - started) * 1000, 1))
+    logger.info(
+        "bulk_upsert table=%s rows=%s statements=%s method=%s elapsed_ms=%s rows_per_sec=%.0f",
+        result.table,
+        result.rows,
+        result.statements,
+        result.method,
+        result.elapsed_ms,
+        result.rows_per_second,
+    )
+    return result
@@ -1,10 +1,13 @@
 import datetime as dt
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 import pandas as pd
 import pymysql
 
 from ..core.brand_rules import get_all_own_brands
+from ..db import BulkWriteResult, bulk_upsert
+from .readers import read_excel_sheet
 
 
 def series_or_default(df: pd.DataFrame, col_name: str, default: str = "") -> pd.Series:
@@ -45,44 +48,139 @@ def _extract_count_from_text(series: pd.Series) -> pd.Series:
     return pd.to_numeric(count, errors="coerce")
 
 
-def _read_csv_paths(csv_paths) -> pd.DataFrame:
-    if isinstance(csv_paths, (list, tuple, set)):
-        frames = [pd.read_csv(path) for path in csv_paths if path]
-        if not frames:
+EXPECTED_SELLER_ROWS = 100
+EXPECTED_JIMU_ROWS = 50
+
+ITEM_COLUMNS = [
+    "asin",
+    "site",
+    "parent_asin",
+    "title",
+    "image_url",
+    "product_url",
+    "brand",
+    "category",
+    "price",
+    "list_price",
+    "score",
+    "comment_count",
+    "bsr_rank",
+    "category_rank",
+    "variation_count",
+    "launch_date",
+    "conversion_rate",
+    "conversion_rate_period",
+    "organic_traffic_count",
+    "ad_traffic_count",
+    "sales_volume",
+    "sales",
+    "organic_search_terms",
+    "ad_search_terms",
+    "search_recommend_terms",
+    "tags",
+    "type",
+    "createtime",
+]
+ITEM_UPDATE_COLUMNS = [col for col in ITEM_COLUMNS if col not in {"asin", "site", "createtime"}]
+
+
+@dataclass
+class BsrBundle:
+    """Seller-sprite sheet and jimu CSVs of one daily import, each parsed exactly once."""
+
+    seller_df: pd.DataFrame
+    jimu_frames: List[pd.DataFrame] = field(default_factory=list)
+
+    @property
+    def jimu_df(self) -> pd.DataFrame:
+        if not self.jimu_frames:
             return pd.DataFrame()
-        return pd.concat(frames, ignore_index=True, sort=False)
-    return pd.read_csv(csv_paths)
+        return pd.concat(self.jimu_frames, ignore_index=True, sort=False)
+
+
+def _as_path_list(paths) -> list:
+    if isinstance(paths, (list, tuple, set)):
+        return [path for path in paths if path]
+    return [paths] if paths else []
 
 
 def _read_excel_paths(excel_paths, sheet_name: int) -> pd.DataFrame:
-    if isinstance(excel_paths, (list, tuple, set)):
-        frames = [pd.read_excel(path, sheet_name=sheet_name) for path in excel_paths if path]
-        if not frames:
-            return pd.DataFrame()
-        return pd.concat(frames, ignore_index=True, sort=False)
-    return pd.read_excel(excel_paths, sheet_name=sheet_name)
+    frames = [read_excel_sheet(path, sheet_name=sheet_name) for path in _as_path_list(excel_paths)]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True, sort=False) if len(frames) > 1 else frames[0]
 
 
-def count_excel_rows(path) -> int:
-    df = pd.read_excel(path, sheet_name=0)
+def read_bsr_bundle(bsr_excel_path, temp_csv_path) -> BsrBundle:
+    return BsrBundle(
+        seller_df=_read_excel_paths(bsr_excel_path, sheet_name=0),
+        jimu_frames=[pd.read_csv(path) for path in _as_path_list(temp_csv_path)],
+    )
+
+
+def _non_blank(series: pd.Series) -> pd.Series:
+    return series.notna() & series.astype(str).str.strip().ne("")
+
+
+def count_sheet_rows(df: pd.DataFrame) -> int:
     if "ASIN" in df.columns:
-        series = df["ASIN"]
-        mask = series.notna() & series.astype(str).str.strip().ne("")
-        return int(mask.sum())
+        return int(_non_blank(df["ASIN"]).sum())
     return int(df.dropna(how="all").shape[0])
 
 
-def count_csv_rows(path) -> int:
-    df = pd.read_csv(path)
+def count_jimu_rows(df: pd.DataFrame) -> int:
     if "zg-bdg-text" in df.columns:
-        series = df["zg-bdg-text"]
-        mask = series.notna() & series.astype(str).str.strip().ne("")
-        return int(mask.sum())
+        return int(_non_blank(df["zg-bdg-text"]).sum())
     return int(df.dropna(how="all").shape[0])
 
 
-def _build_temp_df(csv_paths) -> pd.DataFrame:
-    temp_df = _read_csv_paths(csv_paths)
+def count_excel_rows(path) -> int:
+    return count_sheet_rows(read_excel_sheet(path, sheet_name=0))
+
+
+def count_csv_rows(path) -> int:
+    return count_jimu_rows(pd.read_csv(path))
+
+
+def _normalize_jimu_asin(series: pd.Series) -> pd.Series:
+    return (
+        series.where(series.notna(), pd.NA)
+        .astype(str)
+        .str.replace(r"^ASIN:\s*", "", regex=True)
+        .str.strip()
+        .replace({"": pd.NA, "nan": pd.NA, "None": pd.NA})
+        .str.upper()
+    )
+
+
+def validate_bsr_bundle(bundle: BsrBundle) -> List[str]:
+    """Collect every row-count and structural problem across all files instead of stopping at the first."""
+    errors: List[str] = []
+    seller_df = bundle.seller_df
+    seller_count = count_sheet_rows(seller_df)
+    if seller_count != EXPECTED_SELLER_ROWS:
+        errors.append(f"卖家精灵明细第一张表数据量应为{EXPECTED_SELLER_ROWS}条，实际为{seller_count}条")
+    if "ASIN" not in seller_df.columns:
+        errors.append("卖家精灵明细缺少 ASIN 列")
+    if "小类目" not in seller_df.columns:
+        errors.append("卖家精灵明细缺少'小类目'列，无法导入类目字段")
+
+    for index, frame in enumerate(bundle.jimu_frames):
+        label = f"极木与西柚数据#{index * EXPECTED_JIMU_ROWS + 1}-{(index + 1) * EXPECTED_JIMU_ROWS}"
+        jimu_count = count_jimu_rows(frame)
+        if jimu_count != EXPECTED_JIMU_ROWS:
+            errors.append(f"{label}数据量应为{EXPECTED_JIMU_ROWS}条，实际为{jimu_count}条")
+        if "sc-iMTngq" not in frame.columns:
+            errors.append(f"{label}缺少 ASIN 列（sc-iMTngq 不存在）")
+            continue
+        ranked = _non_blank(frame["zg-bdg-text"]) if "zg-bdg-text" in frame.columns else pd.Series(True, index=frame.index)
+        blank_asin = ranked & _normalize_jimu_asin(frame["sc-iMTngq"]).isna()
+        if blank_asin.any():
+            errors.append(f"{label}存在空 ASIN（sc-iMTngq 为空），共{int(blank_asin.sum())}条")
+    return errors
+
+
+def _build_temp_df(temp_df: pd.DataFrame) -> pd.DataFrame:
     if "zg-bdg-text" in temp_df.columns:
         rank_text = temp_df["zg-bdg-text"].astype(str).str.strip()
         rank_text = rank_text.replace("", pd.NA)
@@ -96,15 +194,7 @@ def _build_temp_df(csv_paths) -> pd.DataFrame:
         temp_df.loc[temp_df["bsr_rank"] <= 0, "bsr_rank"] = None
     if "sc-iMTngq" not in temp_df.columns:
         raise ValueError("明细数据缺少 ASIN 列（sc-iMTngq 不存在）")
-    asin_series = (
-        temp_df["sc-iMTngq"]
-        .where(temp_df["sc-iMTngq"].notna(), pd.NA)
-        .astype(str)
-        .str.replace(r"^ASIN:\s*", "", regex=True)
-        .str.strip()
-        .replace({"": pd.NA, "nan": pd.NA, "None": pd.NA})
-        .str.upper()
-    )
+    asin_series = _normalize_jimu_asin(temp_df["sc-iMTngq"])
     if asin_series.isna().any():
         raise ValueError("明细数据存在空 ASIN（sc-iMTngq 为空）")
     # 统一用 sc-iMTngq 作为 ASIN 来源
@@ -159,10 +249,8 @@ def _debug_jimu_columns(temp_df: pd.DataFrame) -> None:
         print(f"  - {col}")
 
 
-def import_bsr_data(
-    bsr_excel_path,
-    temp_csv_path,
-    connection: pymysql.connections.Connection,
+def build_bsr_rows(
+    bundle: BsrBundle,
     site: Optional[str] = None,
     debug: bool = False,
     debug_stage: Optional[str] = None,
@@ -170,10 +258,10 @@ def import_bsr_data(
     site_value = (site or "").strip().upper()
     if not site_value:
         raise ValueError("缺少站点信息（site）")
-    bsr_df = _read_excel_paths(bsr_excel_path, sheet_name=0)
+    bsr_df = bundle.seller_df.copy()
     if "ASIN" in bsr_df.columns:
         bsr_df["ASIN"] = bsr_df["ASIN"].astype(str).str.strip().str.upper()
-    temp_df = _build_temp_df(temp_csv_path)
+    temp_df = _build_temp_df(bundle.jimu_df)
     if debug:
         if debug_stage == "jimu_columns":
             _debug_jimu_columns(temp_df)
@@ -233,90 +321,123 @@ def import_bsr_data(
     if "上架时间" in merged_df.columns:
         insert_df["launch_date"] = pd.to_datetime(insert_df["launch_date"], errors="coerce").dt.date
 
+    # An ASIN listed twice in the seller sheet, or in both jimu CSVs, yields several merged rows; the
+    # batch keeps one row per ASIN (the last, as the former upsert did) so the staged count matches.
+    insert_df = insert_df.drop_duplicates(subset=["asin"], keep="last").reset_index(drop=True)
     insert_df["createtime"] = dt.date.today().isoformat()
     insert_df = insert_df.astype(object).where(pd.notna(insert_df), None)
     if debug and debug_stage != "jimu_columns":
         null_rank = insert_df["bsr_rank"].isna().sum() if "bsr_rank" in insert_df.columns else "N/A"
         print(f"[bsr_import] insert_df bsr_rank nulls: {null_rank}")
         _debug_df("insert_df", insert_df)
+    return insert_df
 
-    if "bsr_rank" in insert_df.columns:
-        rank_series = pd.to_numeric(insert_df["bsr_rank"], errors="coerce")
-        invalid_mask = rank_series.isna() | (rank_series <= 0)
-        if invalid_mask.any():
-            invalid_count = int(invalid_mask.sum())
-            sample_asins = insert_df.loc[invalid_mask, "asin"].astype(str).head(5).tolist()
-            sample_text = ", ".join(sample_asins) if sample_asins else "-"
-            raise ValueError(f"BSR排名不能为空或为0，受影响ASIN示例: {sample_text}，共{invalid_count}条")
-
-    columns = [
-        "asin",
-        "site",
-        "parent_asin",
-        "title",
-        "image_url",
-        "product_url",
-        "brand",
-        "category",
-        "price",
-        "list_price",
-        "score",
-        "comment_count",
-        "bsr_rank",
-        "category_rank",
-        "variation_count",
-        "launch_date",
-        "conversion_rate",
-        "conversion_rate_period",
-        "organic_traffic_count",
-        "ad_traffic_count",
-        "sales_volume",
-        "sales",
-        "organic_search_terms",
-        "ad_search_terms",
-        "search_recommend_terms",
-        "tags",
-        "type",
-        "createtime",
-    ]
 
-    sql = f"""
-    INSERT INTO dim_bi_amazon_item ({','.join(columns)})
-    VALUES ({','.join(['%s'] * len(columns))})
-    ON DUPLICATE KEY UPDATE
-    parent_asin=VALUES(parent_asin),
-    title=VALUES(title),
-    image_url=VALUES(image_url),
-    product_url=VALUES(product_url),
-    brand=VALUES(brand),
-    category=VALUES(category),
-    price=VALUES(price),
-    list_price=VALUES(list_price),
-    score=VALUES(score),
-    comment_count=VALUES(comment_count),
-    bsr_rank=VALUES(bsr_rank),
-    category_rank=VALUES(category_rank),
-    variation_count=VALUES(variation_count),
-    launch_date=VALUES(launch_date),
-    conversion_rate=VALUES(conversion_rate),
-    conversion_rate_period=VALUES(conversion_rate_period),
-    organic_traffic_count=VALUES(organic_traffic_count),
-    ad_traffic_count=VALUES(ad_traffic_count),
-    sales_volume=VALUES(sales_volume),
-    sales=VALUES(sales),
-    organic_search_terms=VALUES(organic_search_terms),
-    ad_search_terms=VALUES(ad_search_terms),
-    search_recommend_terms=VALUES(search_recommend_terms),
-    tags=VALUES(tags),
-    type=VALUES(type)
-    """
-
-    data = [tuple(row) for row in insert_df[columns].itertuples(index=False, name=None)]
+def validate_bsr_rows(insert_df: pd.DataFrame) -> List[str]:
+    if "bsr_rank" not in insert_df.columns:
+        return []
+    rank_series = pd.to_numeric(insert_df["bsr_rank"], errors="coerce")
+    invalid_mask = rank_series.isna() | (rank_series <= 0)
+    if not invalid_mask.any():
+        return []
+    invalid_count = int(invalid_mask.sum())
+    sample_asins = insert_df.loc[invalid_mask, "asin"].astype(str).head(5).tolist()
+    sample_text = ", ".join(sample_asins) if sample_asins else "-"
+    return [f"BSR排名不能为空或为0，受影响ASIN示例: {sample_text}，共{invalid_count}条"]
+
+
+def write_bsr_rows(insert_df: pd.DataFrame, connection: pymysql.connections.Connection) -> BulkWriteResult:
+    data = [tuple(row) for row in insert_df[ITEM_COLUMNS].itertuples(index=False, name=None)]
+    result = bulk_upsert("dim_bi_amazon_item", ITEM_COLUMNS, data, ITEM_UPDATE_COLUMNS, connection=connection)
+    connection.commit()
+    return result
+
+
+STAGING_TABLE = "dim_bi_amazon_item_staging"
+
+
+def stage_bsr_rows(insert_df: pd.DataFrame, job_id: str, connection: pymysql.connections.Connection) -> BulkWriteResult:
+    """Load a batch into the staging table; it stays invisible to readers until `swap_staged_bsr_rows`."""
+    data = [(job_id, *row) for row in insert_df[ITEM_COLUMNS].itertuples(index=False, name=None)]
+    result = bulk_upsert(STAGING_TABLE, ["job_id", *ITEM_COLUMNS], data, ITEM_UPDATE_COLUMNS, connection=connection)
+    connection.commit()
+    return result
+
+
+def swap_staged_bsr_rows(
+    connection: pymysql.connections.Connection,
+    job_id: str,
+    site: str,
+    createtime: str,
+    expected_rows: int,
+) -> int:
+    """Replace the (site, createtime) slice of dim_bi_amazon_item with the staged batch in one transaction."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT COUNT(*) AS total, COALESCE(SUM(site = %s AND createtime = %s), 0) AS in_slice
+            FROM {STAGING_TABLE}
+            WHERE job_id = %s
+            """,
+            (site, createtime, job_id),
+        )
+        counts = cursor.fetchone() or {}
+    staged = int(counts.get("total") or 0)
+    if staged != expected_rows or int(counts.get("in_slice") or 0) != staged:
+        raise ValueError(f"暂存数据校验失败：预期{expected_rows}条，实际暂存{staged}条")
+
+    column_list = ", ".join(ITEM_COLUMNS)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM dim_bi_amazon_item WHERE site = %s AND createtime = %s", (site, createtime))
+            cursor.execute(
+                f"INSERT INTO dim_bi_amazon_item ({column_list}) SELECT {column_list} FROM {STAGING_TABLE} WHERE job_id = %s",
+                (job_id,),
+            )
+            inserted = cursor.rowcount
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    return inserted
+
+
+def clear_staged_bsr_rows(connection: pymysql.connections.Connection, job_id: str) -> None:
+    # Also sweep batches left behind by workers that died mid-import.
     with connection.cursor() as cursor:
-        cursor.executemany(sql, data)
+        cursor.execute(
+            f"DELETE FROM {STAGING_TABLE} WHERE job_id = %s OR staged_at < NOW() - INTERVAL 1 DAY",
+            (job_id,),
+        )
     connection.commit()
 
+
+def import_bsr_data(
+    bsr_excel_path,
+    temp_csv_path,
+    connection: pymysql.connections.Connection,
+    site: Optional[str] = None,
+    debug: bool = False,
+    debug_stage: Optional[str] = None,
+) -> pd.DataFrame:
+    bundle = read_bsr_bundle(bsr_excel_path, temp_csv_path)
+    insert_df = build_bsr_rows(bundle, site=site, debug=debug, debug_stage=debug_stage)
+    errors = validate_bsr_rows(insert_df)
+    if errors:
+        raise ValueError("；".join(errors))
+    write_bsr_rows(insert_df, connection)
     return insert_df
 
 
-__all__ = ["import_bsr_data"]
+__all__ = [
+    "BsrBundle",
+    "build_bsr_rows",
+    "clear_staged_bsr_rows",
+    "import_bsr_data",
+    "read_bsr_bundle",
+    "stage_bsr_rows",
+    "swap_staged_bsr_rows",
+    "validate_bsr_bundle",
+    "validate_bsr_rows",
+    "write_bsr_rows",
+]
@@ -1,10 +1,18 @@
 import datetime as dt
 import re
-from typing import Optional
+from typing import Dict, List, Optional
 
 import pandas as pd
 import pymysql
 
+from ..db import BulkWriteResult, bulk_upsert
+from .bsr_importer import EXPECTED_SELLER_ROWS, count_sheet_rows
+from .readers import read_excel_sheets
+from .timing import StageTimer
+
+MONTHLY_SHEETS = ("产品历史月销量", "历史月销售额", "子体历史月销量", "子体历史月销售额", "历史月价格")
+FIRST_SHEET_KEY = 0
+
 
 def _normalize_month_col(col) -> str:
     if isinstance(col, (pd.Timestamp, dt.date, dt.datetime)):
@@ -26,8 +34,40 @@ def _to_numeric(series: pd.Series) -> pd.Series:
     return pd.to_numeric(cleaned, errors="coerce")
 
 
-def _build_long_df(excel_path: str, sheet_name: str, value_col: str) -> pd.DataFrame:
-    df = pd.read_excel(excel_path, sheet_name=sheet_name)
+def read_monthly_workbook(excel_path: str) -> Dict[object, pd.DataFrame]:
+    """Open the workbook once and parse the first sheet plus every monthly sheet it contains.
+
+    The first sheet is also keyed by ``FIRST_SHEET_KEY`` so upload validation can reuse it.
+    """
+    def _select(sheet_names: List[str]) -> List[str]:
+        wanted = [name for name in sheet_names if name in MONTHLY_SHEETS]
+        if sheet_names and sheet_names[0] not in wanted:
+            wanted.insert(0, sheet_names[0])
+        return wanted
+
+    sheet_names, parsed = read_excel_sheets(excel_path, _select)
+    sheets: Dict[object, pd.DataFrame] = dict(parsed)
+    if sheet_names:
+        sheets[FIRST_SHEET_KEY] = sheets[sheet_names[0]]
+    return sheets
+
+
+def validate_monthly_sheets(sheets: Dict[object, pd.DataFrame]) -> List[str]:
+    errors: List[str] = []
+    first_sheet = sheets.get(FIRST_SHEET_KEY)
+    row_count = count_sheet_rows(first_sheet) if first_sheet is not None else 0
+    if row_count != EXPECTED_SELLER_ROWS:
+        errors.append(f"卖家精灵明细（销量、销售额）第一张表数据量应为{EXPECTED_SELLER_ROWS}条，实际为{row_count}条")
+    for sheet_name in MONTHLY_SHEETS[:2]:
+        if sheet_name not in sheets:
+            errors.append(f"卖家精灵明细（销量、销售额）缺少工作表：{sheet_name}")
+    return errors
+
+
+def _build_long_df(sheets: Dict[object, pd.DataFrame], sheet_name: str, value_col: str) -> pd.DataFrame:
+    df = sheets.get(sheet_name)
+    if df is None:
+        raise ValueError(f"缺少工作表：{sheet_name}")
     if "ASIN" not in df.columns:
         raise ValueError(f"{sheet_name} 缺少 ASIN 列")
 
@@ -43,9 +83,9 @@ def _build_long_df(excel_path: str, sheet_name: str, value_col: str) -> pd.DataF
     return long_df
 
 
-def _try_build_long_df(excel_path: str, sheet_name: str, value_col: str) -> pd.DataFrame:
+def _try_build_long_df(sheets: Dict[object, pd.DataFrame], sheet_name: str, value_col: str) -> pd.DataFrame:
     try:
-        return _build_long_df(excel_path, sheet_name, value_col)
+        return _build_long_df(sheets, sheet_name, value_col)
     except ValueError:
         return pd.DataFrame(columns=["ASIN", "month", value_col])
 
@@ -57,23 +97,12 @@ def _debug_df(label: str, df: pd.DataFrame, max_rows: int = 5) -> None:
         print(df.head(max_rows))
 
 
-def import_bsr_monthly(
-    excel_path: str,
-    site: str,
-    connection: Optional[pymysql.connections.Connection] = None,
-    debug: bool = False,
-) -> pd.DataFrame:
-    site_value = (site or "").strip().upper()
-    if not site_value:
-        raise ValueError("缺少站点信息（site）")
-    if connection is None:
-        raise ValueError("缺少数据库连接")
-
-    volume_df = _build_long_df(excel_path, "产品历史月销量", "sales_volume")
-    sales_df = _build_long_df(excel_path, "历史月销售额", "sales")
-    child_volume_df = _try_build_long_df(excel_path, "子体历史月销量", "sales_volume")
-    child_sales_df = _try_build_long_df(excel_path, "子体历史月销售额", "sales")
-    price_df = _try_build_long_df(excel_path, "历史月价格", "price")
+def build_monthly_rows(sheets: Dict[object, pd.DataFrame], site_value: str, debug: bool = False) -> pd.DataFrame:
+    volume_df = _build_long_df(sheets, "产品历史月销量", "sales_volume")
+    sales_df = _build_long_df(sheets, "历史月销售额", "sales")
+    child_volume_df = _try_build_long_df(sheets, "子体历史月销量", "sales_volume")
+    child_sales_df = _try_build_long_df(sheets, "子体历史月销售额", "sales")
+    price_df = _try_build_long_df(sheets, "历史月价格", "price")
     if debug:
         _debug_df("volume_df_raw", volume_df)
         _debug_df("sales_df_raw", sales_df)
@@ -125,25 +154,56 @@ def import_bsr_monthly(
     merged = merged.astype(object).where(pd.notna(merged), None)
     if debug:
         _debug_df("final_merged", merged)
+    return merged
 
-    columns = ["site", "asin", "month", "sales_volume", "sales", "is_child", "price"]
-    sql = """
-        INSERT INTO fact_bi_amazon_product_month (site, asin, month, sales_volume, sales, is_child, price)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            sales_volume = VALUES(sales_volume),
-            sales = VALUES(sales),
-            is_child = VALUES(is_child),
-            price = VALUES(price)
-    """
 
-    data = [tuple(row) for row in merged[columns].itertuples(index=False, name=None)]
+MONTHLY_COLUMNS = ["site", "asin", "month", "sales_volume", "sales", "is_child", "price"]
+
 
-    with connection.cursor() as cursor:
-        cursor.executemany(sql, data)
+def write_monthly_rows(merged: pd.DataFrame, connection: pymysql.connections.Connection) -> BulkWriteResult:
+    data = [tuple(row) for row in merged[MONTHLY_COLUMNS].itertuples(index=False, name=None)]
+    result = bulk_upsert(
+        "fact_bi_amazon_product_month",
+        MONTHLY_COLUMNS,
+        data,
+        ["sales_volume", "sales", "is_child", "price"],
+        connection=connection,
+    )
     connection.commit()
+    return result
+
+
+def import_bsr_monthly(
+    excel_path: str,
+    site: str,
+    connection: Optional[pymysql.connections.Connection] = None,
+    debug: bool = False,
+    sheets: Optional[Dict[object, pd.DataFrame]] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> pd.DataFrame:
+    site_value = (site or "").strip().upper()
+    if not site_value:
+        raise ValueError("缺少站点信息（site）")
+    if connection is None:
+        raise ValueError("缺少数据库连接")
+
+    timer = StageTimer(timings, prefix="monthly_")
+    if sheets is None:
+        with timer.stage("read"):
+            sheets = read_monthly_workbook(excel_path)
 
+    with timer.stage("transform"):
+        merged = build_monthly_rows(sheets, site_value, debug)
+    with timer.stage("write"):
+        write_monthly_rows(merged, connection)
     return merged
 
 
-__all__ = ["import_bsr_monthly"]
+__all__ = [
+    "MONTHLY_SHEETS",
+    "build_monthly_rows",
+    "import_bsr_monthly",
+    "read_monthly_workbook",
+    "validate_monthly_sheets",
+    "write_monthly_rows",
+]
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import multiprocessing
+import re
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+
+from ..repositories.bsr_repo import FACT_BSR_DAILY_COLUMNS, upsert_fact_bsr_daily_rows
+from .readers import read_excel_sheet
+
+# Written next to the exports; the exporter's own status.csv is left untouched.
+CHECKPOINT_FILE = "import_status.csv"
+CHECKPOINT_FIELDS = ["file", "asin", "rows", "status", "error", "imported_at"]
+
+_ASIN_FILE_PATTERN = re.compile(r"([A-Za-z0-9]{10})(?:_|\.|$)")
+_DATE_ALIASES = ("日期", "date", "Date", "Time", "时间")
+# Export header -> fact column. BSR sub-category columns look like "BSR[Reciprocating Saw Blades]".
+_VALUE_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "buybox_price": ("Buybox价格($)", "Buy Box", "buybox_price"),
+    "price": ("价格($)", "Amazon", "price"),
+    "prime_price": ("Prime价格($)", "prime_price"),
+    "coupon_price": ("Coupon价格($)", "coupon_price"),
+    "coupon_discount": ("Coupon折扣", "coupon_discount"),
+    "child_sales": ("子体销量", "child_sales"),
+    "sales_volume": ("日销量", "销量", "sales_volume"),
+    "fba_price": ("FBA价格($)", "New, 3rd Party FBA", "fba_price"),
+    "fbm_price": ("FBM价格($)", "New, 3rd Party FBM", "fbm_price"),
+    "strikethrough_price": ("划线价格($)", "List Price", "strikethrough_price"),
+    "bsr_rank": ("BSR排名", "Sales Rank", "bsr_rank"),
+    "rating": ("评分", "Rating", "rating"),
+    "rating_count": ("评分数", "Review Count", "rating_count"),
+    "seller_count": ("卖家数", "Count of New Offers", "seller_count"),
+}
+_SUB_CATEGORY_BSR = re.compile(r"^BSR\s*\[.+\]$")
+_INT_COLUMNS = {"child_sales", "sales_volume", "bsr_rank", "bsr_reciprocating_saw_blades", "rating_count", "seller_count"}
+
+
+def asin_from_filename(path: Path) -> Optional[str]:
+    match = _ASIN_FILE_PATTERN.match(path.name)
+    return match.group(1).upper() if match else None
+
+
+def list_export_workbooks(export_dir: Path, asin_tokens: Optional[Iterable[str]] = None) -> List[Path]:
+    wanted = {token.strip().upper() for token in asin_tokens or [] if token and token.strip()}
+    workbooks = []
+    for path in sorted(export_dir.glob("*.xlsx")):
+        if path.name.startswith("~$"):
+            continue
+        asin = asin_from_filename(path)
+        if not asin or (wanted and asin not in wanted):
+            continue
+        workbooks.append(path)
+    return workbooks
+
+
+def _to_numeric(series: pd.Series) -> pd.Series:
+    cleaned = series.astype(str).str.replace(",", "", regex=False).str.replace(r"[^\d\.-]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce")
+
+
+def _pick_column(df: pd.DataFrame, aliases: Sequence[str]) -> Optional[str]:
+    stripped = {str(col).strip(): col for col in df.columns}
+    for alias in aliases:
+        if alias in stripped:
+            return stripped[alias]
+    return None
+
+
+def parse_keepa_workbook(path: str, site: str) -> List[Tuple[Any, ...]]:
+    """Parse one export into fact_bi_amazon_product_day tuples (one per day, last observation wins)."""
+    workbook = Path(path)
+    asin = asin_from_filename(workbook)
+    if not asin:
+        raise ValueError(f"无法从文件名识别 ASIN: {workbook.name}")
+    df = read_excel_sheet(workbook, sheet_name=0)
+    date_col = _pick_column(df, _DATE_ALIASES)
+    if date_col is None:
+        raise ValueError(f"{workbook.name} 缺少日期列")
+
+    frame = pd.DataFrame({"date": pd.to_datetime(df[date_col], errors="coerce").dt.date})
+    for target, aliases in _VALUE_ALIASES.items():
+        column = _pick_column(df, aliases)
+        frame[target] = _to_numeric(df[column]) if column is not None else float("nan")
+    sub_category = next((col for col in df.columns if _SUB_CATEGORY_BSR.match(str(col).strip())), None)
+    frame["bsr_reciprocating_saw_blades"] = _to_numeric(df[sub_category]) if sub_category is not None else float("nan")
+
+    frame = frame[frame["date"].notna()]
+    if frame.empty:
+        return []
+    # Keepa records several points per day; keep the last non-empty value of each column per day.
+    frame = frame.sort_values("date", kind="stable").groupby("date", as_index=False).last()
+    for column in _INT_COLUMNS:
+        frame[column] = frame[column].round(0).astype("Int64")
+    frame.insert(0, "asin", asin)
+    frame.insert(0, "site", site)
+    frame = frame[FACT_BSR_DAILY_COLUMNS].astype(object).where(pd.notna(frame[FACT_BSR_DAILY_COLUMNS]), None)
+    return [tuple(row) for row in frame.itertuples(index=False, name=None)]
+
+
+def load_checkpoint(export_dir: Path) -> Set[str]:
+    path = export_dir / CHECKPOINT_FILE
+    if not path.exists():
+        return set()
+    with path.open("r", encoding="utf-8-sig", newline="") as handle:
+        return {row["file"] for row in csv.DictReader(handle) if row.get("status") == "done" and row.get("file")}
+
+
+def _append_checkpoint(export_dir: Path, entries: Sequence[Dict[str, Any]]) -> None:
+    if not entries:
+        return
+    path = export_dir / CHECKPOINT_FILE
+    new_file = not path.exists()
+    with path.open("a", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=CHECKPOINT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        stamp = dt.datetime.now().isoformat(timespec="seconds")
+        for entry in entries:
+            writer.writerow({**entry, "imported_at": stamp})
+
+
+def _make_executor(workers: int) -> Executor:
+    # Celery prefork children are daemonic and may not fork their own pool; fall back to threads there.
+    if workers > 1 and not multiprocessing.current_process().daemon:
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=max(1, workers))
+
+
+def import_keepa_exports(
+    export_dir: Path,
+    site: str,
+    asin_tokens: Optional[Iterable[str]] = None,
+    workers: Optional[int] = None,
+    chunk_rows: int = 20000,
+    resume: bool = True,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    site_value = (site or "").strip().upper()
+    if not site_value:
+        raise ValueError("缺少站点信息（site）")
+    export_dir = Path(export_dir)
+    workbooks = list_export_workbooks(export_dir, asin_tokens)
+    done = load_checkpoint(export_dir) if resume else set()
+    pending = [path for path in workbooks if path.name not in done]
+    worker_count = workers or min(8, multiprocessing.cpu_count())
+
+    imported_rows = 0
+    failed_files: List[str] = []
+    buffer: List[Tuple[Any, ...]] = []
+    buffered_files: List[Dict[str, Any]] = []
+    completed = 0
+
+    def _flush() -> None:
+        nonlocal imported_rows, buffer, buffered_files
+        if buffer:
+            imported_rows += upsert_fact_bsr_daily_rows(buffer)
+        # Checkpoint only after the rows are committed, so a crash re-parses at most one chunk.
+        _append_checkpoint(export_dir, buffered_files)
+        buffer = []
+        buffered_files = []
+
+    with _make_executor(worker_count) as executor:
+        futures: Dict[Future, Path] = {
+            executor.submit(parse_keepa_workbook, str(path), site_value): path for path in pending
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            completed += 1
+            try:
+                rows = future.result()
+            except Exception as exc:
+                failed_files.append(f"{path.name}: {exc}")
+                _append_checkpoint(
+                    export_dir,
+                    [{"file": path.name, "asin": asin_from_filename(path), "rows": 0, "status": "failed", "error": str(exc)[:500]}],
+                )
+                continue
+            buffer.extend(rows)
+            buffered_files.append(
+                {"file": path.name, "asin": asin_from_filename(path), "rows": len(rows), "status": "done", "error": ""}
+            )
+            if len(buffer) >= chunk_rows:
+                _flush()
+            if progress is not None:
+                progress({"completed": completed, "total": len(pending), "imported_rows": imported_rows})
+        _flush()
+
+    return {
+        "imported_rows": imported_rows,
+        "workbook_count": len(workbooks),
+        "processed_count": len(pending),
+        "skipped_count": len(workbooks) - len(pending),
+        "failed_files": failed_files,
+    }
+
+
+__all__ = [
+    "CHECKPOINT_FILE",
+    "import_keepa_exports",
+    "list_export_workbooks",
+    "load_checkpoint",
+    "parse_keepa_workbook",
+]
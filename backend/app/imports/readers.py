@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import importlib.util
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+import pandas as pd
+
+from ..core.config import env_str
+from ..core.logging import logger
+
+EXCEL_ENGINES = ("auto", "calamine", "openpyxl")
+
+T = TypeVar("T")
+
+
+def _calamine_available() -> bool:
+    return importlib.util.find_spec("python_calamine") is not None
+
+
+def resolve_excel_engine(engine: Optional[str] = None) -> Optional[str]:
+    """Map BSR_EXCEL_ENGINE (auto|calamine|openpyxl) to a pandas engine; None means pandas' own default."""
+    requested = (engine or env_str("BSR_EXCEL_ENGINE", "auto")).lower()
+    if requested not in EXCEL_ENGINES:
+        logger.warning("unknown BSR_EXCEL_ENGINE=%s, using auto", requested)
+        requested = "auto"
+    if requested == "openpyxl":
+        return None
+    if _calamine_available():
+        return "calamine"
+    if requested == "calamine":
+        logger.warning("BSR_EXCEL_ENGINE=calamine but python-calamine is not installed, using openpyxl")
+    return None
+
+
+def _with_fallback(path, engine: Optional[str], reader: Callable[[Optional[str]], T]) -> T:
+    resolved = resolve_excel_engine(engine)
+    try:
+        return reader(resolved)
+    except Exception:
+        if resolved is None:
+            raise
+        # calamine is stricter on a few malformed exports; pandas' default engine still reads them.
+        logger.warning("excel_reader_fallback engine=%s path=%s", resolved, path, exc_info=True)
+        return reader(None)
+
+
+def read_excel_sheet(path, sheet_name=0, engine: Optional[str] = None) -> pd.DataFrame:
+    return _with_fallback(path, engine, lambda resolved: pd.read_excel(path, sheet_name=sheet_name, engine=resolved))
+
+
+def read_excel_sheets(
+    path,
+    select: Callable[[List[str]], List[str]],
+    engine: Optional[str] = None,
+) -> Tuple[List[str], Dict[str, pd.DataFrame]]:
+    """Open the workbook once and parse the sheets chosen by `select(sheet_names)`."""
+
+    def _read(resolved: Optional[str]) -> Tuple[List[str], Dict[str, pd.DataFrame]]:
+        with pd.ExcelFile(path, engine=resolved) as workbook:
+            sheet_names = [str(name) for name in workbook.sheet_names]
+            return sheet_names, {name: workbook.parse(name) for name in select(sheet_names)}
+
+    return _with_fallback(path, engine, _read)
+
+
+__all__ = ["EXCEL_ENGINES", "read_excel_sheet", "read_excel_sheets", "resolve_excel_engine"]
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class StageTimer:
+    """Accumulates wall time per named stage, in milliseconds."""
+
+    def __init__(self, timings: Optional[Dict[str, float]] = None, prefix: str = "") -> None:
+        self.timings: Dict[str, float] = timings if timings is not None else {}
+        self._prefix = prefix
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            key = f"{self._prefix}{name}"
+            elapsed = (time.perf_counter() - started) * 1000
+            self.timings[key] = round(self.timings.get(key, 0.0) + elapsed, 1)
+
+
+__all__ = ["StageTimer"]
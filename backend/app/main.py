@@ -7,10 +7,15 @@ from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 
+from .core import http_client
+from .core.redis_client import aclose_redis
 from .core.config import get_auth_secret_or_raise
 from .core.handlers import http_exception_handler, unhandled_exception_handler, validation_exception_handler
 from .core.logging import request_logging_middleware
 from .routers import ai_insights, audit_logs, auth, bsr, categories, dev, health, products, strategy, users
+from .services.ai_insight_service import start_ai_job_reaper, stop_ai_job_reaper
+from .services.audit_writer import shutdown_audit_writer
+from .services.bsr_import_service import start_bsr_import_listener, stop_bsr_import_listener
 
 get_auth_secret_or_raise()
 
@@ -21,6 +26,13 @@ app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, unhandled_exception_handler)
 
 app.middleware("http")(request_logging_middleware)
+app.add_event_handler("startup", start_bsr_import_listener)
+app.add_event_handler("startup", start_ai_job_reaper)
+app.add_event_handler("shutdown", shutdown_audit_writer)
+app.add_event_handler("shutdown", stop_bsr_import_listener)
+app.add_event_handler("shutdown", stop_ai_job_reaper)
+app.add_event_handler("shutdown", http_client.aclose_clients)
+app.add_event_handler("shutdown", aclose_redis)
 
 app.include_router(dev.router)
 app.include_router(health.router)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from datetime import datetime
+import json
+from datetime import date, datetime
 from typing import Any, Dict, List, Optional
 
-from ..db import execute, fetch_all, fetch_one
+from ..db import execute, execute_many, fetch_all, fetch_one
 
 
 def insert_job(
@@ -11,18 +12,27 @@ def insert_job(
     asin: str,
     site: str,
     operator_userid: str,
+    status: str = "pending",
+    report_text: Optional[str] = None,
+    batch_id: Optional[str] = None,
+    range_days: Optional[int] = None,
+    leader_job_id: Optional[str] = None,
 ) -> None:
     sql = """
         INSERT INTO fact_bi_amzon_insight (
             job_id,
+            batch_id,
+            leader_job_id,
             asin,
             site,
+            range_days,
             status,
             operator_userid,
+            report_text,
             created_at
-        ) VALUES (%s, %s, %s, 'pending', %s, NOW())
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
     """
-    execute(sql, (job_id, asin, site, operator_userid))
+    execute(sql, (job_id, batch_id, leader_job_id, asin, site, range_days, status, operator_userid, report_text))
 
 
 def _set_job_status(job_id: str, status: str, report_text: Optional[str] = None) -> None:
@@ -59,12 +69,85 @@ def mark_job_success(job_id: str, report_text: str) -> None:
     _set_job_status(job_id, "success", report_text)
 
 
+def complete_follower_jobs(leader_job_id: str, status: str, report_text: Optional[str] = None) -> int:
+    """Copies a finished leader's outcome to the jobs deduplicated onto it; safe to call repeatedly."""
+    return execute(
+        """
+        UPDATE fact_bi_amzon_insight
+        SET status = %s,
+            report_text = COALESCE(%s, report_text)
+        WHERE leader_job_id = %s
+          AND status IN ('pending', 'running')
+        """,
+        (status, report_text, leader_job_id),
+    )
+
+
+def fail_inflight_job(job_id: str) -> int:
+    """Fails the job only if it is still pending/running, so a result that lands first is kept."""
+    return execute(
+        """
+        UPDATE fact_bi_amzon_insight
+        SET status = 'failed'
+        WHERE job_id = %s
+          AND status IN ('pending', 'running')
+        """,
+        (job_id,),
+    )
+
+
+def fetch_stale_jobs(stale_seconds: int, limit: int = 100) -> List[Dict[str, Any]]:
+    """Pending/running jobs outside any batch created more than stale_seconds ago; uses idx_ai_status_created."""
+    return fetch_all(
+        """
+        SELECT job_id, leader_job_id
+        FROM fact_bi_amzon_insight
+        WHERE status IN ('pending', 'running')
+          AND batch_id IS NULL
+          AND created_at < DATE_SUB(NOW(), INTERVAL %s SECOND)
+        ORDER BY created_at
+        LIMIT %s
+        """,
+        (stale_seconds, limit),
+    )
+
+
+def fetch_oldest_follower(leader_job_id: str) -> Optional[Dict[str, Any]]:
+    return fetch_one(
+        """
+        SELECT job_id, asin, site, range_days, operator_userid
+        FROM fact_bi_amzon_insight
+        WHERE leader_job_id = %s
+          AND status IN ('pending', 'running')
+        ORDER BY created_at, job_id
+        LIMIT 1
+        """,
+        (leader_job_id,),
+    )
+
+
+def reassign_followers(leader_job_id: str, new_leader_job_id: str) -> int:
+    """Moves the unfinished followers to new_leader_job_id, which itself stops being a follower."""
+    return execute(
+        """
+        UPDATE fact_bi_amzon_insight
+        SET leader_job_id = CASE WHEN job_id = %s THEN NULL ELSE %s END
+        WHERE leader_job_id = %s
+          AND status IN ('pending', 'running')
+        """,
+        (new_leader_job_id, new_leader_job_id, leader_job_id),
+    )
+
+
 def fetch_job(job_id: str) -> Optional[Dict[str, Any]]:
     sql = """
         SELECT
             job_id,
+            batch_id,
+            leader_job_id,
             asin,
             site,
+            range_days,
             status,
             operator_userid,
             created_at,
@@ -76,6 +159,39 @@ def fetch_job(job_id: str) -> Optional[Dict[str, Any]]:
     return fetch_one(sql, (job_id,))
 
 
+def fetch_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """Status only, without report_text; what job event listeners re-read on each transition."""
+    return fetch_one(
+        """
+        SELECT job_id, status, leader_job_id
+        FROM fact_bi_amzon_insight
+        WHERE job_id = %s
+        LIMIT 1
+        """,
+        (job_id,),
+    )
+
+
+def fetch_inflight_job(asin: str, site: str, range_days: int, window_seconds: int) -> Optional[Dict[str, Any]]:
+    """Newest pending/running leader (never a follower) for the same input; older ones are treated as stuck.
+    Uses idx_ai_inflight."""
+    return fetch_one(
+        """
+        SELECT job_id, status, created_at
+        FROM fact_bi_amzon_insight
+        WHERE asin = %s
+          AND site = %s
+          AND range_days = %s
+          AND status IN ('pending', 'running')
+          AND leader_job_id IS NULL
+          AND created_at >= DATE_SUB(NOW(), INTERVAL %s SECOND)
+        ORDER BY created_at DESC
+        LIMIT 1
+        """,
+        (asin, site, range_days, window_seconds),
+    )
+
+
 def fetch_jobs(
     limit: int,
     offset: int,
@@ -103,8 +219,11 @@ def fetch_jobs(
     sql = f"""
         SELECT
             j.job_id,
+            j.batch_id,
+            j.leader_job_id,
             j.asin,
             j.site,
+            j.range_days,
             j.status,
             j.operator_userid,
             j.created_at,
@@ -131,6 +250,210 @@ def delete_job(job_id: str, role: str, userid: str) -> int:
     return 0 if row else 1
 
 
+def fetch_cached_report(fingerprint: str) -> Optional[Dict[str, Any]]:
+    row = fetch_one(
+        """
+        SELECT fingerprint, report_text, summary, model, prompt_version, created_at
+        FROM fact_bi_amazon_ai_report_cache
+        WHERE fingerprint = %s
+        LIMIT 1
+        """,
+        (fingerprint,),
+    )
+    if row:
+        execute(
+            """
+            UPDATE fact_bi_amazon_ai_report_cache
+            SET hit_count = hit_count + 1,
+                last_hit_at = NOW()
+            WHERE fingerprint = %s
+            """,
+            (fingerprint,),
+        )
+    return row
+
+
+def store_cached_report(
+    fingerprint: str,
+    site: str,
+    asin: str,
+    range_days: int,
+    latest_date: Optional[date],
+    row_count: int,
+    content_hash: str,
+    model: str,
+    prompt_version: str,
+    summary: Dict[str, Any],
+    report_text: str,
+) -> None:
+    execute(
+        """
+        INSERT INTO fact_bi_amazon_ai_report_cache (
+            fingerprint, site, asin, range_days, latest_date, row_count, content_hash,
+            model, prompt_version, summary, report_text, created_at
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            summary = VALUES(summary),
+            report_text = VALUES(report_text),
+            created_at = VALUES(created_at)
+        """,
+        (
+            fingerprint,
+            site,
+            asin,
+            range_days,
+            latest_date,
+            row_count,
+            content_hash,
+            model,
+            prompt_version,
+            json.dumps(summary, ensure_ascii=False, default=str),
+            report_text,
+        ),
+    )
+
+
+def insert_batch(
+    batch_id: str,
+    site: str,
+    category: Optional[str],
+    batch_date: Optional[date],
+    range_days: int,
+    operator_userid: str,
+    jobs: List[Dict[str, Optional[str]]],
+) -> None:
+    """Parent row plus one pending child job per entry of jobs ({"job_id", "asin", "leader_job_id"});
+    a child with a leader is a follower that finishes with that job's result."""
+    execute(
+        """
+        INSERT INTO fact_bi_amazon_ai_batch (
+            batch_id, site, category, batch_date, range_days, total, status, operator_userid, created_at
+        ) VALUES (%s, %s, %s, %s, %s, %s, 'pending', %s, NOW())
+        """,
+        (batch_id, site, category, batch_date, range_days, len(jobs), operator_userid),
+    )
+    execute_many(
+        """
+        INSERT INTO fact_bi_amzon_insight (
+            job_id, batch_id, leader_job_id, asin, site, range_days, status, operator_userid, created_at
+        ) VALUES (%s, %s, %s, %s, %s, %s, 'pending', %s, NOW())
+        """,
+        [
+            (job["job_id"], batch_id, job.get("leader_job_id"), job["asin"], site, range_days, operator_userid)
+            for job in jobs
+        ],
+    )
+
+
+def _set_batch_status(batch_id: str, status: str, timestamp_column: str) -> None:
+    execute(
+        f"UPDATE fact_bi_amazon_ai_batch SET status = %s, {timestamp_column} = NOW() WHERE batch_id = %s",
+        (status, batch_id),
+    )
+
+
+def mark_batch_running(batch_id: str) -> None:
+    _set_batch_status(batch_id, "running", "started_at")
+
+
+def mark_batch_finished(batch_id: str, status: str = "done") -> int:
+    # Both the batch task and a status read may finish a batch whose last children were followers.
+    return execute(
+        "UPDATE fact_bi_amazon_ai_batch SET status = %s, finished_at = NOW() WHERE batch_id = %s AND finished_at IS NULL",
+        (status, batch_id),
+    )
+
+
+def fail_pending_batch_jobs(batch_id: str) -> int:
+    affected = execute(
+        "UPDATE fact_bi_amzon_insight SET status = 'failed' WHERE batch_id = %s AND status IN ('pending', 'running')",
+        (batch_id,),
+    )
+    # Jobs elsewhere that were deduplicated onto this batch's children would otherwise wait forever.
+    execute(
+        """
+        UPDATE fact_bi_amzon_insight f
+        JOIN fact_bi_amzon_insight l
+        ON l.job_id = f.leader_job_id
+        SET f.status = 'failed'
+        WHERE l.batch_id = %s
+          AND l.status = 'failed'
+          AND f.status IN ('pending', 'running')
+        """,
+        (batch_id,),
+    )
+    return affected
+
+
+def fetch_stale_batches(stale_seconds: int, limit: int = 20) -> List[Dict[str, Any]]:
+    """Unfinished batches that were queued or started more than stale_seconds ago; uses idx_ai_batch_unfinished."""
+    return fetch_all(
+        """
+        SELECT batch_id, total, status
+        FROM fact_bi_amazon_ai_batch
+        WHERE finished_at IS NULL
+          AND COALESCE(started_at, created_at) < DATE_SUB(NOW(), INTERVAL %s SECOND)
+        ORDER BY created_at
+        LIMIT %s
+        """,
+        (stale_seconds, limit),
+    )
+
+
+def fetch_batch(batch_id: str) -> Optional[Dict[str, Any]]:
+    return fetch_one(
+        """
+        SELECT
+            batch_id,
+            site,
+            category,
+            batch_date,
+            range_days,
+            total,
+            status,
+            operator_userid,
+            created_at,
+            started_at,
+            finished_at
+        FROM fact_bi_amazon_ai_batch
+        WHERE batch_id = %s
+        LIMIT 1
+        """,
+        (batch_id,),
+    )
+
+
+def fetch_batch_jobs(batch_id: str, status: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Children without report_text; the progress view only needs their status."""
+    params: List[Any] = [batch_id]
+    status_clause = ""
+    if status:
+        status_clause = "AND status = %s"
+        params.append(status)
+    return fetch_all(
+        f"""
+        SELECT job_id, leader_job_id, asin, site, status, operator_userid, created_at, CHAR_LENGTH(report_text) AS report_length
+        FROM fact_bi_amzon_insight
+        WHERE batch_id = %s {status_clause}
+        ORDER BY created_at ASC, job_id ASC
+        """,
+        params,
+    )
+
+
+def fetch_batch_progress(batch_id: str) -> Dict[str, int]:
+    rows = fetch_all(
+        """
+        SELECT status, COUNT(*) AS job_count
+        FROM fact_bi_amzon_insight
+        WHERE batch_id = %s
+        GROUP BY status
+        """,
+        (batch_id,),
+    )
+    return {str(row.get("status") or ""): int(row.get("job_count") or 0) for row in rows}
+
+
 def serialize_datetime(value: Any) -> Optional[str]:
     if isinstance(value, datetime):
         return value.isoformat()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List
+
+import pymysql
+
+from ..db import execute, fetch_all, fetch_one, get_connection
+
+AUDIT_LOG_TABLE = "dim_bi_amazon_log"
+AUDIT_LOG_COLUMNS = (
+    "id",
+    "module",
+    "action",
+    "target_id",
+    "operator_userid",
+    "operator_name",
+    "detail",
+    "created_at",
+)
+
+
+def fetch_log_partitions() -> List[Dict[str, Any]]:
+    return fetch_all(
+        """
+        SELECT
+            PARTITION_NAME AS name,
+            PARTITION_DESCRIPTION AS less_than,
+            TABLE_ROWS AS table_rows
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = %s
+          AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+        """,
+        (AUDIT_LOG_TABLE,),
+    )
+
+
+def fetch_log_created_range() -> Dict[str, Any]:
+    return fetch_one(f"SELECT MIN(created_at) AS min_created_at, MAX(created_at) AS max_created_at FROM {AUDIT_LOG_TABLE}") or {}
+
+
+def partition_log_table(partition_sql: str) -> None:
+    # Partitioned InnoDB tables cannot carry FULLTEXT indexes and need the partition column in the PK.
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT INDEX_NAME
+                FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE()
+                  AND TABLE_NAME = %s
+                  AND INDEX_TYPE = 'FULLTEXT'
+                GROUP BY INDEX_NAME
+                """,
+                (AUDIT_LOG_TABLE,),
+            )
+            fulltext_indexes = [row["INDEX_NAME"] for row in cursor.fetchall()]
+            alterations = [f"DROP INDEX `{name}`" for name in fulltext_indexes]
+            alterations += ["DROP PRIMARY KEY", "ADD PRIMARY KEY (`id`, `created_at`)"]
+            cursor.execute(f"ALTER TABLE {AUDIT_LOG_TABLE} {', '.join(alterations)}")
+            cursor.execute(f"ALTER TABLE {AUDIT_LOG_TABLE} {partition_sql}")
+        conn.commit()
+
+
+def reorganize_max_partition(partition_sql: str) -> None:
+    execute(f"ALTER TABLE {AUDIT_LOG_TABLE} REORGANIZE PARTITION pmax INTO ({partition_sql})")
+
+
+def iter_partition_rows(partition_name: str, batch_size: int = 5000) -> Iterator[Dict[str, Any]]:
+    columns = ", ".join(AUDIT_LOG_COLUMNS)
+    with get_connection() as conn:
+        with conn.cursor(pymysql.cursors.SSDictCursor) as cursor:
+            cursor.execute(f"SELECT {columns} FROM {AUDIT_LOG_TABLE} PARTITION (`{partition_name}`) ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+
+def drop_partition(partition_name: str) -> None:
+    execute(f"ALTER TABLE {AUDIT_LOG_TABLE} DROP PARTITION `{partition_name}`")
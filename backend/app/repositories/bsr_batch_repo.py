@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from ..db import fetch_all, fetch_one, get_connection
+
+_RANKED_CONDITION = "bsr_rank BETWEEN 1 AND 100 AND COALESCE(CAST(type AS CHAR), '0') <> '1'"
+
+# Previous batch of the same category, and the default compare batch as the BSR board picks it:
+# the newest batch at least 7 days older, falling back to the previous one.
+_PREV_BATCH_SQL = """
+    SELECT MAX(p.createtime)
+    FROM dim_bi_amazon_item p
+    WHERE p.site = r.site
+      AND (r.category = '' OR p.category = r.category)
+      AND p.createtime < r.batch_date
+"""
+_WEEK_OLD_BATCH_SQL = """
+    SELECT MAX(p.createtime)
+    FROM dim_bi_amazon_item p
+    WHERE p.site = r.site
+      AND (r.category = '' OR p.category = r.category)
+      AND p.createtime <= DATE_SUB(r.batch_date, INTERVAL 7 DAY)
+"""
+
+
+def refresh_batch_registry(site: str, batch_date: date, job_id: Optional[str] = None) -> int:
+    """Rebuild the registry rows of one batch from dim_bi_amazon_item; returns the number of categories."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM dim_bi_amazon_bsr_batch WHERE site = %s AND batch_date = %s",
+                (site, batch_date),
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO dim_bi_amazon_bsr_batch (
+                    site, batch_date, category, item_count, ranked_count, brand_count,
+                    sales, sales_volume, job_id, refreshed_at
+                )
+                SELECT
+                    site,
+                    createtime,
+                    category,
+                    COUNT(*),
+                    SUM(CASE WHEN {_RANKED_CONDITION} THEN 1 ELSE 0 END),
+                    COUNT(DISTINCT NULLIF(TRIM(brand), '')),
+                    SUM(COALESCE(sales, 0)),
+                    SUM(COALESCE(sales_volume, 0)),
+                    %s,
+                    NOW()
+                FROM dim_bi_amazon_item
+                WHERE site = %s
+                  AND createtime = %s
+                  AND category IS NOT NULL
+                  AND TRIM(category) <> ''
+                GROUP BY site, createtime, category
+                """,
+                (job_id, site, batch_date),
+            )
+            categories = cursor.rowcount
+            cursor.execute(
+                f"""
+                INSERT INTO dim_bi_amazon_bsr_batch (
+                    site, batch_date, category, item_count, ranked_count, brand_count,
+                    sales, sales_volume, job_id, refreshed_at
+                )
+                SELECT
+                    site,
+                    createtime,
+                    '',
+                    COUNT(*),
+                    SUM(CASE WHEN {_RANKED_CONDITION} THEN 1 ELSE 0 END),
+                    COUNT(DISTINCT NULLIF(TRIM(brand), '')),
+                    SUM(COALESCE(sales, 0)),
+                    SUM(COALESCE(sales_volume, 0)),
+                    %s,
+                    NOW()
+                FROM dim_bi_amazon_item
+                WHERE site = %s
+                  AND createtime = %s
+                GROUP BY site, createtime
+                """,
+                (job_id, site, batch_date),
+            )
+            # Later batches compare against this one too when an older batch is re-imported.
+            cursor.execute(
+                f"""
+                UPDATE dim_bi_amazon_bsr_batch r
+                SET r.prev_batch_date = ({_PREV_BATCH_SQL})
+                WHERE r.site = %s AND r.batch_date >= %s
+                """,
+                (site, batch_date),
+            )
+            cursor.execute(
+                f"""
+                UPDATE dim_bi_amazon_bsr_batch r
+                SET r.compare_date = COALESCE(({_WEEK_OLD_BATCH_SQL}), r.prev_batch_date)
+                WHERE r.site = %s AND r.batch_date >= %s
+                """,
+                (site, batch_date),
+            )
+        conn.commit()
+    return categories
+
+
+def fetch_latest_batch_date(site: str) -> Optional[date]:
+    row = fetch_one("SELECT MAX(batch_date) AS batch_date FROM dim_bi_amazon_bsr_batch WHERE site = %s", (site,))
+    value = row.get("batch_date") if row else None
+    return value if isinstance(value, date) else None
+
+
+def fetch_batch_registry(site: str, batch_date: date) -> List[Dict[str, Any]]:
+    return fetch_all(
+        """
+        SELECT
+            site,
+            batch_date,
+            category,
+            item_count,
+            ranked_count,
+            brand_count,
+            sales,
+            sales_volume,
+            prev_batch_date,
+            compare_date,
+            job_id,
+            refreshed_at
+        FROM dim_bi_amazon_bsr_batch
+        WHERE site = %s AND batch_date = %s
+        ORDER BY category ASC
+        """,
+        (site, batch_date),
+    )
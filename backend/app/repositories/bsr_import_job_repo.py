@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from ..db import execute, execute_many, fetch_all, fetch_one
+
+
+def insert_job(
+    job_id: str,
+    site: str,
+    operator_userid: str,
+    files: Dict[str, str],
+    stage_timings: Dict[str, float],
+    file_hashes: Optional[Dict[str, Any]] = None,
+    status: str = "queued",
+) -> None:
+    execute(
+        """
+        INSERT INTO fact_bi_amazon_import_job (
+            job_id, site, status, operator_userid, files, file_hashes, stage_timings, created_at, finished_at
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, NOW(), IF(%s = 'skipped', NOW(), NULL))
+        """,
+        (
+            job_id,
+            site,
+            status,
+            operator_userid,
+            json.dumps(files, ensure_ascii=False),
+            json.dumps(file_hashes or {}),
+            json.dumps(stage_timings),
+            status,
+        ),
+    )
+
+
+def mark_job_stage(job_id: str, status: str, stage_timings: Dict[str, float]) -> None:
+    execute(
+        """
+        UPDATE fact_bi_amazon_import_job
+        SET status = %s,
+            stage_timings = %s,
+            started_at = COALESCE(started_at, NOW())
+        WHERE job_id = %s
+        """,
+        (status, json.dumps(stage_timings), job_id),
+    )
+
+
+def mark_job_written(job_id: str, rows: int, monthly_rows: int, stage_timings: Dict[str, float]) -> None:
+    execute(
+        """
+        UPDATE fact_bi_amazon_import_job
+        SET status = 'post_processing',
+            rows_imported = %s,
+            monthly_rows_imported = %s,
+            stage_timings = %s,
+            written_at = NOW()
+        WHERE job_id = %s
+        """,
+        (rows, monthly_rows, json.dumps(stage_timings), job_id),
+    )
+
+
+def mark_job_done(
+    job_id: str,
+    rows: int,
+    monthly_rows: int,
+    stage_timings: Dict[str, float],
+    error_message: Optional[str] = None,
+) -> int:
+    """Only a job still in post_processing is finished, so the post-import task and the reaper never both do it."""
+    return execute(
+        """
+        UPDATE fact_bi_amazon_import_job
+        SET status = 'done',
+            rows_imported = %s,
+            monthly_rows_imported = %s,
+            stage_timings = %s,
+            error_message = %s,
+            finished_at = NOW()
+        WHERE job_id = %s
+          AND status = 'post_processing'
+        """,
+        (rows, monthly_rows, json.dumps(stage_timings), error_message[:1000] if error_message else None, job_id),
+    )
+
+
+def mark_job_failed(job_id: str, error_message: str, stage_timings: Optional[Dict[str, float]] = None) -> None:
+    execute(
+        """
+        UPDATE fact_bi_amazon_import_job
+        SET status = 'failed',
+            error_message = %s,
+            stage_timings = COALESCE(%s, stage_timings),
+            finished_at = NOW()
+        WHERE job_id = %s
+        """,
+        (error_message[:1000], json.dumps(stage_timings) if stage_timings is not None else None, job_id),
+    )
+
+
+def fetch_job(job_id: str) -> Optional[Dict[str, Any]]:
+    return fetch_one(
+        """
+        SELECT
+            job_id,
+            site,
+            status,
+            operator_userid,
+            files,
+            file_hashes,
+            rows_imported,
+            monthly_rows_imported,
+            stage_timings,
+            error_message,
+            created_at,
+            started_at,
+            written_at,
+            finished_at
+        FROM fact_bi_amazon_import_job
+        WHERE job_id = %s
+        LIMIT 1
+        """,
+        (job_id,),
+    )
+
+
+def fetch_stale_post_processing_jobs(stale_seconds: int, limit: int = 50) -> List[Dict[str, Any]]:
+    return fetch_all(
+        """
+        SELECT job_id, site, rows_imported, monthly_rows_imported, stage_timings
+        FROM fact_bi_amazon_import_job
+        WHERE status = 'post_processing'
+          AND COALESCE(written_at, started_at, created_at) < DATE_SUB(NOW(), INTERVAL %s SECOND)
+        ORDER BY created_at
+        LIMIT %s
+        """,
+        (stale_seconds, limit),
+    )
+
+
+def fetch_import_file_hashes(site: str, batch_date: date) -> Dict[str, str]:
+    rows = fetch_all(
+        """
+        SELECT file_role, content_hash
+        FROM dim_bi_amazon_import_file
+        WHERE site = %s AND batch_date = %s
+        """,
+        (site, batch_date),
+    )
+    return {str(row["file_role"]): str(row["content_hash"]) for row in rows}
+
+
+def record_import_file_hashes(site: str, batch_date: date, job_id: str, files: Dict[str, Dict[str, Any]]) -> None:
+    if not files:
+        return
+    execute_many(
+        """
+        INSERT INTO dim_bi_amazon_import_file (
+            site, batch_date, file_role, content_hash, size_bytes, job_id, updated_at
+        ) VALUES (%s, %s, %s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            content_hash = VALUES(content_hash),
+            size_bytes = VALUES(size_bytes),
+            job_id = VALUES(job_id),
+            updated_at = VALUES(updated_at)
+        """,
+        [
+            (site, batch_date, role, info.get("sha256"), int(info.get("size") or 0), job_id)
+            for role, info in files.items()
+        ],
+    )
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import date
 from typing import Any, Dict, List, Optional, Tuple
 
-from ..db import execute, execute_many, fetch_all, fetch_one, get_connection
+from ..db import bulk_upsert, execute, fetch_all, fetch_one, get_connection
 
 BSR_ITEM_SELECT_COLUMNS_FULL = """
                 b.asin,
@@ -417,6 +417,32 @@ def fetch_bsr_dates(site: str, limit: int, offset: int, category: Optional[str]
     return fetch_all(sql, (*params, limit, offset))
 
 
+def fetch_top_ranked_asins(site: str, category: str, createtime: Optional[date], limit: int) -> List[Dict[str, Any]]:
+    """Best-ranked ASINs of one category batch (latest batch of the category when createtime is None)."""
+    batch_condition = "b.createtime = %s"
+    params: List[Any] = [site, category]
+    if createtime is None:
+        batch_condition = (
+            "b.createtime = (SELECT MAX(t.createtime) FROM dim_bi_amazon_item t WHERE t.site = %s AND t.category = %s)"
+        )
+        params.extend([site, category])
+    else:
+        params.append(createtime)
+    sql = f"""
+        SELECT b.asin, b.bsr_rank, b.createtime
+        FROM dim_bi_amazon_item b
+        WHERE b.site = %s
+          AND b.category = %s
+          AND {batch_condition}
+          AND b.bsr_rank BETWEEN 1 AND 100
+          AND COALESCE(CAST(b.type AS CHAR), '0') <> '1'
+        ORDER BY b.bsr_rank ASC, b.asin ASC
+        LIMIT %s
+    """
+    params.append(limit)
+    return fetch_all(sql, params)
+
+
 def fetch_latest_bsr_product_urls(site: str, limit: int = 100) -> List[Dict[str, Any]]:
     sql = """
         SELECT
@@ -438,6 +464,28 @@ def fetch_latest_bsr_product_urls(site: str, limit: int = 100) -> List[Dict[str,
     return fetch_all(sql, (site, site, limit))
 
 
+FACT_BSR_DAILY_COLUMNS = [
+    "site",
+    "asin",
+    "date",
+    "buybox_price",
+    "price",
+    "prime_price",
+    "coupon_price",
+    "coupon_discount",
+    "child_sales",
+    "sales_volume",
+    "fba_price",
+    "fbm_price",
+    "strikethrough_price",
+    "bsr_rank",
+    "bsr_reciprocating_saw_blades",
+    "rating",
+    "rating_count",
+    "seller_count",
+]
+
+
 def upsert_fact_bsr_daily_rows(
     rows: List[Tuple[Any, ...]]
 ) -> int:
@@ -451,54 +499,10 @@ def upsert_fact_bsr_daily_rows(
         if len(row) != 18:
             raise ValueError(f"fact_bi_amazon_product_day row length expected 17/18, got {len(row)}")
         normalized_rows.append(row)
-    sql = """
-        INSERT INTO fact_bi_amazon_product_day (
-            site,
-            asin,
-            date,
-            buybox_price,
-            price,
-            prime_price,
-            coupon_price,
-            coupon_discount,
-            child_sales,
-            sales_volume,
-            fba_price,
-            fbm_price,
-            strikethrough_price,
-            bsr_rank,
-            bsr_reciprocating_saw_blades,
-            rating,
-            rating_count,
-            seller_count
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-        )
-        ON DUPLICATE KEY UPDATE
-            buybox_price = VALUES(buybox_price),
-            price = VALUES(price),
-            prime_price = VALUES(prime_price),
-            coupon_price = VALUES(coupon_price),
-            coupon_discount = VALUES(coupon_discount),
-            child_sales = VALUES(child_sales),
-            sales_volume = VALUES(sales_volume),
-            fba_price = VALUES(fba_price),
-            fbm_price = VALUES(fbm_price),
-            strikethrough_price = VALUES(strikethrough_price),
-            bsr_rank = VALUES(bsr_rank),
-            bsr_reciprocating_saw_blades = VALUES(bsr_reciprocating_saw_blades),
-            rating = VALUES(rating),
-            rating_count = VALUES(rating_count),
-            seller_count = VALUES(seller_count)
-    """
-    execute_many(sql, normalized_rows)
+    bulk_upsert("fact_bi_amazon_product_day", FACT_BSR_DAILY_COLUMNS, normalized_rows, FACT_BSR_DAILY_COLUMNS[3:])
     return len(normalized_rows)
 
 
-def delete_bsr_items_for_today(site: str) -> None:
-    execute("DELETE FROM dim_bi_amazon_item WHERE site = %s AND createtime = CURDATE()", (site,))
-
-
 def update_bsr_tags(
     asin: str,
     tag_string: str,
@@ -587,6 +591,119 @@ def update_bsr_mapping(
         conn.commit()
 
 
+def bulk_update_bsr_tags(
+    tag_strings: Dict[str, str],
+    target_site: str,
+    target_date: Optional[date],
+    role: str,
+    userid: str,
+) -> Dict[str, Any]:
+    asins = list(tag_strings)
+    placeholders = ", ".join(["%s"] * len(asins))
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            if role != "admin":
+                cursor.execute(
+                    f"""
+                    SELECT DISTINCT competitor_asin
+                    FROM dim_bi_amazon_mapping
+                    WHERE owner_userid = %s AND site = %s AND competitor_asin IN ({placeholders})
+                    """,
+                    (userid, target_site, *asins),
+                )
+                allowed = {row.get("competitor_asin") for row in cursor.fetchall()}
+                forbidden = [asin for asin in asins if asin not in allowed]
+                if forbidden:
+                    return {"forbidden": forbidden, "missing": [], "dates": {}, "updated": 0}
+
+            if target_date:
+                cursor.execute(
+                    f"""
+                    SELECT asin, createtime
+                    FROM dim_bi_amazon_item
+                    WHERE site = %s AND createtime = %s AND asin IN ({placeholders})
+                    """,
+                    (target_site, target_date, *asins),
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    SELECT asin, MAX(createtime) AS createtime
+                    FROM dim_bi_amazon_item
+                    WHERE site = %s AND asin IN ({placeholders})
+                    GROUP BY asin
+                    """,
+                    (target_site, *asins),
+                )
+            dates = {row.get("asin"): row.get("createtime") for row in cursor.fetchall() if row.get("createtime")}
+            missing = [asin for asin in asins if asin not in dates]
+            if missing:
+                return {"forbidden": [], "missing": missing, "dates": dates, "updated": 0}
+
+            cursor.executemany(
+                """
+                UPDATE dim_bi_amazon_item
+                SET tags = %s
+                WHERE asin = %s AND site = %s AND createtime = %s
+                """,
+                [(tag_strings[asin], asin, target_site, dates[asin]) for asin in asins],
+            )
+            updated = cursor.rowcount
+        conn.commit()
+    return {"forbidden": [], "missing": [], "dates": dates, "updated": updated}
+
+
+def bulk_update_bsr_mapping(
+    requested: Dict[str, List[str]],
+    target_site: str,
+    userid: str,
+) -> Dict[str, int]:
+    asins = list(requested)
+    placeholders = ", ".join(["%s"] * len(asins))
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT competitor_asin, yida_asin
+                FROM dim_bi_amazon_mapping
+                WHERE owner_userid = %s AND site = %s AND competitor_asin IN ({placeholders})
+                """,
+                (userid, target_site, *asins),
+            )
+            existing: Dict[str, set] = {}
+            for row in cursor.fetchall():
+                if row.get("yida_asin"):
+                    existing.setdefault(row.get("competitor_asin"), set()).add(row.get("yida_asin"))
+
+            to_delete: List[tuple] = []
+            to_insert: List[tuple] = []
+            for asin, yida_asins in requested.items():
+                current = existing.get(asin, set())
+                wanted = set(yida_asins)
+                to_delete.extend((asin, userid, target_site, val) for val in sorted(current - wanted))
+                to_insert.extend((asin, val, userid, target_site) for val in yida_asins if val not in current)
+
+            if to_delete:
+                cursor.executemany(
+                    """
+                    DELETE FROM dim_bi_amazon_mapping
+                    WHERE competitor_asin = %s AND owner_userid = %s AND site = %s AND yida_asin = %s
+                    """,
+                    to_delete,
+                )
+            if to_insert:
+                cursor.executemany(
+                    """
+                    INSERT INTO dim_bi_amazon_mapping (
+                        competitor_asin, yida_asin, owner_userid, site
+                    ) VALUES (%s, %s, %s, %s)
+                    """,
+                    to_insert,
+                )
+        conn.commit()
+    return {"deleted": len(to_delete), "inserted": len(to_insert)}
+
+
 def fetch_bsr_monthly(asin: str, site: str, is_child: Optional[int] = None) -> List[Dict[str, Any]]:
     filters = ["asin = %s", "site = %s"]
     params: List[Any] = [asin, site]
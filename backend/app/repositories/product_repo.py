@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any, Dict, List
 
 from ..db import execute, fetch_all, fetch_one, get_connection
+from ..search import PRODUCT_SEARCH, search
 from . import bsr_repo
 
 INSERT_PRODUCT_SQL = """
@@ -145,15 +146,11 @@ def fetch_products(
         """
         params.append(site)
     if keyword:
-        sql += """
-          AND (
-              UPPER(p.asin) LIKE UPPER(%s)
-              OR UPPER(COALESCE(p.product, '')) LIKE UPPER(%s)
-              OR UPPER(COALESCE(p.brand, '')) LIKE UPPER(%s)
-          )
+        keyword_sql, keyword_params = search(PRODUCT_SEARCH, keyword)
+        sql += f"""
+          AND {keyword_sql}
         """
-        keyword_like = f"%{keyword}%"
-        params.extend([keyword_like, keyword_like, keyword_like])
+        params.extend(keyword_params)
     if role != "admin" and product_scope == "restricted":
         sql += """
             AND (
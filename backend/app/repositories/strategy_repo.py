@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from ..db import execute, execute_insert, fetch_all, fetch_one
+from ..search import STRATEGY_SEARCH, search
 
 
 def fetch_strategies(
@@ -16,6 +17,7 @@ def fetch_strategies(
     competitor_asin: Optional[str],
     yida_asin: Optional[str],
     visible_userids: Optional[List[str]] = None,
+    keyword: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     sql = """
         SELECT
@@ -63,6 +65,10 @@ def fetch_strategies(
     if yida_asin:
         sql += " AND s.yida_asin = %s"
         params.append(yida_asin)
+    if keyword:
+        keyword_sql, keyword_params = search(STRATEGY_SEARCH, keyword)
+        sql += f" AND {keyword_sql}"
+        params.extend(keyword_params)
     if visible_userids is not None:
         if not visible_userids:
             sql += " AND 1 = 0"
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
 from ..core.logging import logger
 from ..db import execute, fetch_all, fetch_one, get_connection
+from ..search import AUDIT_LOG_SEARCH, USER_SEARCH, invalidate_search_index, search
 
 
 def fetch_users(
@@ -23,14 +24,10 @@ def fetch_users(
             u.status,
             u.product_scope,
             u.created_at,
-            l.last_active_at
+            a.last_active_at
         FROM dim_bi_amazon_user u
-        LEFT JOIN (
-            SELECT operator_userid, MAX(created_at) AS last_active_at
-            FROM dim_bi_amazon_log
-            GROUP BY operator_userid
-        ) l
-        ON l.operator_userid = u.dingtalk_userid
+        LEFT JOIN agg_bi_amazon_user_activity a
+        ON a.operator_userid = u.dingtalk_userid
         WHERE 1=1
     """
     params: List[Any] = []
@@ -41,9 +38,9 @@ def fetch_users(
         sql += " AND u.status = %s"
         params.append(status)
     if keyword:
-        sql += " AND (u.dingtalk_username LIKE %s OR u.dingtalk_userid LIKE %s)"
-        like = f"%{keyword}%"
-        params.extend([like, like])
+        keyword_sql, keyword_params = search(USER_SEARCH, keyword)
+        sql += f" AND {keyword_sql}"
+        params.extend(keyword_params)
     if visible_userids is not None:
         if not visible_userids:
             sql += " AND 1 = 0"
@@ -57,6 +54,22 @@ def fetch_users(
     return fetch_all(sql, params)
 
 
+def fetch_recently_active_users(days: int, limit: int) -> List[Dict[str, Any]]:
+    return fetch_all(
+        """
+        SELECT u.dingtalk_userid, u.role
+        FROM agg_bi_amazon_user_activity a
+        JOIN dim_bi_amazon_user u
+        ON u.dingtalk_userid = a.operator_userid
+        WHERE a.last_active_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
+          AND u.status <> 'disabled'
+        ORDER BY a.last_active_at DESC
+        LIMIT %s
+        """,
+        (days, limit),
+    )
+
+
 def fetch_user_by_userid(userid: str) -> Optional[Dict[str, Any]]:
     return fetch_one(
         """
@@ -82,6 +95,7 @@ def insert_user(
         VALUES (%s, %s, %s, %s, %s, %s)
     """
     execute(sql, (userid, username, avatar_url, role, status, product_scope))
+    invalidate_search_index(USER_SEARCH)
 
 
 def update_user(userid: str, role: Optional[str], status: Optional[str]) -> int:
@@ -102,7 +116,9 @@ def update_user(userid: str, role: Optional[str], status: Optional[str]) -> int:
 
 
 def delete_user(userid: str) -> int:
-    return execute("DELETE FROM dim_bi_amazon_user WHERE dingtalk_userid = %s", (userid,))
+    affected = execute("DELETE FROM dim_bi_amazon_user WHERE dingtalk_userid = %s", (userid,))
+    invalidate_search_index(USER_SEARCH)
+    return affected
 
 
 def fetch_user_product_visibility(userid: str) -> Optional[Dict[str, Any]]:
@@ -208,15 +224,16 @@ def query_audit_logs(
         sql += " AND operator_userid = %s"
         params.append(userid)
     if keyword:
-        like = f"%{keyword}%"
-        sql += " AND (operator_name LIKE %s OR target_id LIKE %s OR detail LIKE %s)"
-        params.extend([like, like, like])
+        keyword_sql, keyword_params = search(AUDIT_LOG_SEARCH, keyword)
+        sql += f" AND {keyword_sql}"
+        params.extend(keyword_params)
+    # Plain literal bounds on created_at let MySQL prune the monthly partitions.
     if date_from:
         sql += " AND created_at >= %s"
         params.append(date_from)
     if date_to:
-        sql += " AND created_at < DATE_ADD(%s, INTERVAL 1 DAY)"
-        params.append(date_to)
+        sql += " AND created_at < %s"
+        params.append(date_to + timedelta(days=1))
 
     sql += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
     params.extend([limit, offset])
@@ -224,6 +241,67 @@ def query_audit_logs(
     return fetch_all(sql, params)
 
 
+def _activity_rollup_rows(rows: List[tuple]) -> tuple[List[tuple], List[tuple]]:
+    activity: Dict[str, List[Any]] = {}
+    visit_days: Dict[tuple, int] = {}
+    for module, action, _, operator_userid, _, _, created_at in rows:
+        userid = str(operator_userid or "")
+        entry = activity.setdefault(userid, [created_at, 0])
+        entry[0] = max(entry[0], created_at)
+        if action != "visit":
+            continue
+        entry[1] += 1
+        key = (created_at.date(), userid, str(module or ""))
+        visit_days[key] = visit_days.get(key, 0) + 1
+    # Sorted so concurrent writers lock rollup rows in the same order.
+    activity_rows = [(userid, last, visits) for userid, (last, visits) in sorted(activity.items())]
+    visit_day_rows = [(*key, count) for key, count in sorted(visit_days.items())]
+    return activity_rows, visit_day_rows
+
+
+def insert_audit_logs(rows: List[tuple]) -> int:
+    if not rows:
+        return 0
+    activity_rows, visit_day_rows = _activity_rollup_rows(rows)
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            affected = cursor.executemany(
+                """
+                INSERT INTO dim_bi_amazon_log (
+                    module, action, target_id,
+                    operator_userid, operator_name,
+                    detail, created_at
+                ) VALUES (
+                    %s, %s, %s,
+                    %s, %s,
+                    %s, %s
+                )
+                """,
+                rows,
+            )
+            cursor.executemany(
+                """
+                INSERT INTO agg_bi_amazon_user_activity (operator_userid, last_active_at, total_visits)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    last_active_at = GREATEST(last_active_at, VALUES(last_active_at)),
+                    total_visits = total_visits + VALUES(total_visits)
+                """,
+                activity_rows,
+            )
+            if visit_day_rows:
+                cursor.executemany(
+                    """
+                    INSERT INTO agg_bi_amazon_visit_day (stat_date, operator_userid, module, visit_count)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE visit_count = visit_count + VALUES(visit_count)
+                    """,
+                    visit_day_rows,
+                )
+        conn.commit()
+    return affected
+
+
 def insert_audit_log(
     module: str,
     action: str,
@@ -233,28 +311,7 @@ def insert_audit_log(
     detail: Optional[str],
 ) -> None:
     try:
-        execute(
-            """
-            INSERT INTO dim_bi_amazon_log (
-                module, action, target_id,
-                operator_userid, operator_name,
-                detail, created_at
-            ) VALUES (
-                %s, %s, %s,
-                %s, %s,
-                %s, %s
-            )
-            """,
-            (
-                module,
-                action,
-                target_id,
-                operator_userid,
-                operator_name,
-                detail,
-                datetime.now(),
-            ),
-        )
+        insert_audit_logs([(module, action, target_id, operator_userid, operator_name, detail, datetime.now())])
     except Exception as exc:
         logger.warning(
             "audit_log_insert_failed code=AUDIT_LOG_INSERT_FAILED module=%s action=%s target_id=%s operator_userid=%s err=%s",
@@ -284,41 +341,41 @@ def fetch_permission_stats_aggregates() -> Dict[str, Any]:
             cursor.execute(
                 """
                 SELECT
-                    COUNT(*) AS total_visits,
-                    COUNT(DISTINCT CASE WHEN DATE(created_at) = CURDATE() THEN operator_userid END) AS active_today,
-                    COUNT(DISTINCT CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 6 DAY) THEN operator_userid END) AS active_week,
-                    SUM(CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 29 DAY) THEN 1 ELSE 0 END) AS visits_30d
-                FROM dim_bi_amazon_log
-                WHERE action = 'visit'
+                    (SELECT COALESCE(SUM(total_visits), 0) FROM agg_bi_amazon_user_activity) AS total_visits,
+                    COUNT(DISTINCT CASE WHEN stat_date = CURDATE() THEN operator_userid END) AS active_today,
+                    COUNT(DISTINCT CASE WHEN stat_date >= DATE_SUB(CURDATE(), INTERVAL 6 DAY) THEN operator_userid END) AS active_week,
+                    COALESCE(SUM(visit_count), 0) AS visits_30d
+                FROM agg_bi_amazon_visit_day
+                WHERE stat_date >= DATE_SUB(CURDATE(), INTERVAL 29 DAY)
                 """
             )
             summary_row = cursor.fetchone() or {}
 
             cursor.execute(
                 """
-                SELECT DATE(created_at) AS date_key, COUNT(*) AS count
-                FROM dim_bi_amazon_log
-                WHERE action = 'visit' AND created_at >= DATE_SUB(CURDATE(), INTERVAL 6 DAY)
-                GROUP BY DATE(created_at)
+                SELECT stat_date AS date_key, SUM(visit_count) AS count
+                FROM agg_bi_amazon_visit_day
+                WHERE stat_date >= DATE_SUB(CURDATE(), INTERVAL 6 DAY)
+                GROUP BY stat_date
                 """
             )
             weekly_rows = cursor.fetchall()
 
             cursor.execute(
                 """
-                SELECT DATE(created_at) AS date_key, COUNT(*) AS count
-                FROM dim_bi_amazon_log
-                WHERE action = 'visit' AND created_at >= DATE_SUB(CURDATE(), INTERVAL 29 DAY)
-                GROUP BY DATE(created_at)
+                SELECT stat_date AS date_key, SUM(visit_count) AS count
+                FROM agg_bi_amazon_visit_day
+                WHERE stat_date >= DATE_SUB(CURDATE(), INTERVAL 29 DAY)
+                GROUP BY stat_date
                 """
             )
             monthly_rows = cursor.fetchall()
 
             cursor.execute(
                 """
-                SELECT COALESCE(NULLIF(module, ''), 'unknown') AS module, COUNT(*) AS count
-                FROM dim_bi_amazon_log
-                WHERE action = 'visit' AND created_at >= DATE_SUB(CURDATE(), INTERVAL 29 DAY)
+                SELECT COALESCE(NULLIF(module, ''), 'unknown') AS module, SUM(visit_count) AS count
+                FROM agg_bi_amazon_visit_day
+                WHERE stat_date >= DATE_SUB(CURDATE(), INTERVAL 29 DAY)
                 GROUP BY COALESCE(NULLIF(module, ''), 'unknown')
                 """
             )
@@ -329,14 +386,22 @@ def fetch_permission_stats_aggregates() -> Dict[str, Any]:
                 SELECT
                     u.dingtalk_userid AS userid,
                     u.dingtalk_username AS username,
-                    SUM(CASE WHEN l.id IS NOT NULL THEN 1 ELSE 0 END) AS total_visits,
-                    SUM(CASE WHEN l.created_at >= DATE_SUB(CURDATE(), INTERVAL 6 DAY) THEN 1 ELSE 0 END) AS visits_7d,
-                    SUM(CASE WHEN l.created_at >= DATE_SUB(CURDATE(), INTERVAL 29 DAY) THEN 1 ELSE 0 END) AS visits_30d
+                    COALESCE(a.total_visits, 0) AS total_visits,
+                    COALESCE(d.visits_7d, 0) AS visits_7d,
+                    COALESCE(d.visits_30d, 0) AS visits_30d
                 FROM dim_bi_amazon_user u
-                LEFT JOIN dim_bi_amazon_log l
-                    ON l.operator_userid = u.dingtalk_userid
-                    AND l.action = 'visit'
-                GROUP BY u.dingtalk_userid, u.dingtalk_username
+                LEFT JOIN agg_bi_amazon_user_activity a
+                    ON a.operator_userid = u.dingtalk_userid
+                LEFT JOIN (
+                    SELECT
+                        operator_userid,
+                        SUM(CASE WHEN stat_date >= DATE_SUB(CURDATE(), INTERVAL 6 DAY) THEN visit_count ELSE 0 END) AS visits_7d,
+                        SUM(visit_count) AS visits_30d
+                    FROM agg_bi_amazon_visit_day
+                    WHERE stat_date >= DATE_SUB(CURDATE(), INTERVAL 29 DAY)
+                    GROUP BY operator_userid
+                ) d
+                    ON d.operator_userid = u.dingtalk_userid
                 ORDER BY visits_30d DESC, total_visits DESC, u.dingtalk_username ASC
                 """
             )
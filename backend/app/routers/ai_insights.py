@@ -3,10 +3,11 @@ from __future__ import annotations
 from typing import Any, Dict
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
 from ..auth import CurrentUser, get_current_user
 from ..core.responses import list_response, ok_response
-from ..schemas.ai_insight import AiInsightCreatePayload, AiInsightQueryPayload
+from ..schemas.ai_insight import AiInsightBatchCreatePayload, AiInsightCreatePayload, AiInsightQueryPayload
 from ..services import ai_insight_service, user_service
 
 router = APIRouter()
@@ -34,6 +35,43 @@ def submit_ai_insight_job(
     return ok_response({"item": item})
 
 
+@router.post("/api/ai-insights/batches")
+def submit_ai_insight_batch(
+    payload: AiInsightBatchCreatePayload,
+    current_user: CurrentUser = Depends(get_current_user),
+) -> Dict[str, Any]:
+    item = ai_insight_service.submit_batch(
+        payload.site or "US",
+        payload.category,
+        payload.batch_date,
+        payload.asins,
+        payload.range_days,
+        payload.limit,
+        current_user.userid,
+    )
+    user_service.log_audit(
+        module="ai_insight",
+        action="submit_batch",
+        target_id=item.get("batch_id"),
+        operator_userid=current_user.userid,
+        operator_name=current_user.username,
+        detail=(
+            f"site={item.get('site')}, category={item.get('category') or ''}, "
+            f"total={item.get('total')}, range_days={item.get('range_days')}"
+        ),
+    )
+    return ok_response({"item": item})
+
+
+@router.get("/api/ai-insights/batches/{batch_id}")
+def get_ai_insight_batch(
+    batch_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+) -> Dict[str, Any]:
+    item = ai_insight_service.get_batch(batch_id, current_user.role, current_user.userid)
+    return ok_response({"item": item})
+
+
 @router.get("/api/ai-insights/jobs/{job_id}")
 def get_ai_insight_job(
     job_id: str,
@@ -43,6 +81,19 @@ def get_ai_insight_job(
     return ok_response({"item": item})
 
 
+@router.get("/api/ai-insights/jobs/{job_id}/events")
+async def stream_ai_insight_job_events(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+) -> StreamingResponse:
+    events = await ai_insight_service.open_job_event_stream(job_id, current_user.role, current_user.userid)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/api/ai-insights/jobs/query")
 def query_ai_insight_jobs(
     payload: AiInsightQueryPayload,
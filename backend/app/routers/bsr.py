@@ -4,6 +4,7 @@ from datetime import date
 from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, File, Form, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
 from ..auth import CurrentUser, get_current_user
 from ..core.responses import list_response, ok_response
@@ -11,12 +12,15 @@ from ..schemas.bsr import (
     BsrAiInsightPayload,
     BsrDailyPayload,
     BsrDatesPayload,
+    BsrFeaturesPayload,
     BsrLookupPayload,
     BsrMonthlyBatchPayload,
     BsrMonthlyPayload,
     BsrOverviewQueryPayload,
     BsrQueryPayload,
+    MappingBulkUpdatePayload,
     MappingUpdatePayload,
+    TagBulkUpdatePayload,
     TagUpdatePayload,
 )
 from ..services import bsr_service, user_service
@@ -159,16 +163,36 @@ def import_bsr_files(
     jimu_file: Optional[UploadFile] = File(None),
     jimu_file_51_100: Optional[UploadFile] = File(None),
     site: str = Form("US"),
+    force: bool = Form(False),
     current_user: CurrentUser = Depends(get_current_user),
 ) -> Dict[str, Any]:
-    result = bsr_service.import_bsr_files(
+    item = bsr_service.submit_bsr_import(
         seller_file,
         seller_file_detail,
         jimu_file,
         jimu_file_51_100,
         site,
+        current_user.userid,
+        force=force,
     )
-    return ok_response(result)
+    user_service.log_audit(
+        module="bsr",
+        action="import",
+        target_id=item.get("job_id"),
+        operator_userid=current_user.userid,
+        operator_name=current_user.username,
+        detail=f"site={item.get('site')}, status={item.get('status')}, force={force}",
+    )
+    return ok_response({"item": item})
+
+
+@router.get("/api/bsr/import/jobs/{job_id}")
+def get_bsr_import_job(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+) -> Dict[str, Any]:
+    item = bsr_service.get_bsr_import_job(job_id, current_user.role, current_user.userid)
+    return ok_response({"item": item})
 
 
 @router.post("/api/bsr/monthly")
@@ -207,6 +231,60 @@ def get_bsr_ai_insight(
     return ok_response(result)
 
 
+@router.post("/api/bsr/ai-insight/stream")
+async def stream_bsr_ai_insight(
+    payload: BsrAiInsightPayload,
+    current_user: CurrentUser = Depends(get_current_user),
+) -> StreamingResponse:
+    events = await bsr_service.open_bsr_ai_insight_stream(
+        payload.asin, payload.site or "US", payload.range_days, current_user.userid
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/api/bsr/features")
+def get_bsr_features(
+    payload: BsrFeaturesPayload,
+    current_user: CurrentUser = Depends(get_current_user),
+) -> Dict[str, Any]:
+    result = bsr_service.get_bsr_features(payload.asin, payload.site or "US", payload.range_days)
+    return ok_response(result)
+
+
+@router.put("/api/bsr/tags/bulk")
+def bulk_update_bsr_tags(
+    payload: TagBulkUpdatePayload,
+    current_user: CurrentUser = Depends(get_current_user),
+) -> Dict[str, Any]:
+    result = bsr_service.bulk_update_bsr_tags(
+        payload.items,
+        payload.createtime,
+        payload.site or "US",
+        current_user.role,
+        current_user.userid,
+        current_user.username,
+    )
+    return ok_response(result)
+
+
+@router.put("/api/bsr/mapping/bulk")
+def bulk_update_bsr_mapping(
+    payload: MappingBulkUpdatePayload,
+    current_user: CurrentUser = Depends(get_current_user),
+) -> Dict[str, Any]:
+    result = bsr_service.bulk_update_bsr_mapping(
+        payload.items,
+        payload.site or "US",
+        current_user.userid,
+        current_user.username,
+    )
+    return ok_response(result)
+
+
 @router.put("/api/bsr/{asin}/tags")
 def update_bsr_tags(
     asin: str,
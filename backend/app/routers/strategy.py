@@ -22,6 +22,7 @@ def get_strategy_list(
     state: Optional[str] = None,
     competitor_asin: Optional[str] = None,
     yida_asin: Optional[str] = None,
+    keyword: Optional[str] = None,
     current_user: CurrentUser = Depends(get_current_user),
 ) -> Dict[str, Any]:
     items = strategy_service.list_strategies(
@@ -35,6 +36,7 @@ def get_strategy_list(
         yida_asin,
         current_user.role,
         current_user.userid,
+        keyword=keyword,
     )
     user_service.log_audit(
         module="strategy",
@@ -65,6 +67,7 @@ def query_strategy_list(
         payload.yida_asin,
         current_user.role,
         current_user.userid,
+        keyword=payload.keyword,
     )
     user_service.log_audit(
         module="strategy",
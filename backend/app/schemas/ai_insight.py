@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Optional
+from datetime import date
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class AiInsightCreatePayload(BaseModel):
@@ -17,3 +18,12 @@ class AiInsightQueryPayload(BaseModel):
     asin: Optional[str] = None
     site: Optional[str] = None
     status: Optional[str] = None
+
+
+class AiInsightBatchCreatePayload(BaseModel):
+    site: Optional[str] = "US"
+    category: Optional[str] = None
+    batch_date: Optional[date] = None
+    asins: List[str] = Field(default_factory=list)
+    range_days: int = 90
+    limit: int = 100
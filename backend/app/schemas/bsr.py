@@ -82,6 +82,14 @@ class BsrAiInsightPayload(BaseModel):
     range_days: Literal[7, 30, 90, 180] = 90
 
 
+class BsrFeaturesPayload(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    asin: AsinCode
+    site: Optional[SiteCode] = "US"
+    range_days: Literal[7, 30, 90, 180] = 90
+
+
 class BsrDatesPayload(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True)
 
@@ -116,6 +124,35 @@ class MappingUpdatePayload(BaseModel):
     site: Optional[SiteCode] = None
 
 
+class TagBulkItem(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    asin: AsinCode
+    tags: List[TagText] = Field(default_factory=list, max_length=50)
+
+
+class TagBulkUpdatePayload(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    items: List[TagBulkItem] = Field(min_length=1, max_length=500)
+    createtime: Optional[date] = None
+    site: Optional[SiteCode] = None
+
+
+class MappingBulkItem(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    asin: AsinCode
+    yida_asin: Optional[AsinMappingText] = None
+
+
+class MappingBulkUpdatePayload(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    items: List[MappingBulkItem] = Field(min_length=1, max_length=500)
+    site: Optional[SiteCode] = None
+
+
 class BsrPayload(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True)
 
@@ -73,3 +73,4 @@ class StrategyQueryPayload(BaseModel):
     state: Optional[StrategyState] = None
     competitor_asin: Optional[AsinCode] = None
     yida_asin: Optional[AsinCode] = None
+    keyword: Optional[ShortText] = None
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .core.config import env_bool, env_int
+from .db import fetch_all
+
+# MySQL `ngram_token_size` defaults to 2; keywords shorter than this cannot hit the index.
+NGRAM_TOKEN_SIZE = 2
+_BOOLEAN_OPERATOR_CHARS = re.compile(r'[+\-<>()~*"@]+')
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+    name: str
+    columns: Tuple[str, ...]
+    backend: str = "fulltext"
+    id_column: Optional[str] = None
+    loader: Optional[Callable[[], List[Dict[str, Any]]]] = None
+    id_field: Optional[str] = None
+    text_fields: Tuple[str, ...] = ()
+
+
+def normalize_search_text(value: Any) -> str:
+    text = unicodedata.normalize("NFKC", str(value or ""))
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def ngram_tokens(text: str, size: int = NGRAM_TOKEN_SIZE) -> Set[str]:
+    compact = text.replace(" ", "")
+    if len(compact) < size:
+        return {compact} if compact else set()
+    return {compact[i : i + size] for i in range(len(compact) - size + 1)}
+
+
+class InvertedIndex:
+    def __init__(self, spec: SearchSpec, ttl_seconds: int) -> None:
+        self._spec = spec
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._expires_at = 0.0
+        self._documents: Dict[str, str] = {}
+        self._postings: Dict[str, Set[str]] = {}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._expires_at = 0.0
+
+    def _rebuild(self) -> None:
+        loader = self._spec.loader
+        id_field = self._spec.id_field
+        if loader is None or not id_field:
+            raise RuntimeError(f"search spec {self._spec.name} has no loader")
+        documents: Dict[str, str] = {}
+        postings: Dict[str, Set[str]] = {}
+        for row in loader():
+            doc_id = str(row.get(id_field) or "").strip()
+            if not doc_id:
+                continue
+            text = " ".join(normalize_search_text(row.get(field)) for field in self._spec.text_fields)
+            documents[doc_id] = text
+            for token in ngram_tokens(text):
+                postings.setdefault(token, set()).add(doc_id)
+        self._documents = documents
+        self._postings = postings
+        self._expires_at = time.time() + self._ttl_seconds
+
+    def lookup(self, keyword: str) -> List[str]:
+        needle = normalize_search_text(keyword)
+        if not needle:
+            return []
+        with self._lock:
+            if self._expires_at <= time.time():
+                self._rebuild()
+            documents = self._documents
+            postings = self._postings
+        tokens = ngram_tokens(needle)
+        if len(needle.replace(" ", "")) < NGRAM_TOKEN_SIZE:
+            candidates: Set[str] = set(documents)
+        else:
+            candidates = set()
+            for index, token in enumerate(sorted(tokens, key=lambda t: len(postings.get(t, ())))):
+                matched = postings.get(token)
+                if not matched:
+                    return []
+                candidates = set(matched) if index == 0 else candidates & matched
+                if not candidates:
+                    return []
+        # Bigram intersection can over-match; confirm the substring on the stored text.
+        return sorted(doc_id for doc_id in candidates if needle in documents.get(doc_id, ""))
+
+
+_INDEXES: Dict[str, InvertedIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def _get_index(spec: SearchSpec) -> InvertedIndex:
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(spec.name)
+        if index is None:
+            index = InvertedIndex(spec, env_int("SEARCH_MEMORY_INDEX_TTL_SECONDS", 60))
+            _INDEXES[spec.name] = index
+        return index
+
+
+def invalidate_search_index(spec: SearchSpec) -> None:
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(spec.name)
+    if index is not None:
+        index.invalidate()
+
+
+def _like_predicate(spec: SearchSpec, keyword: str) -> Tuple[str, List[Any]]:
+    like = f"%{keyword}%"
+    conditions = [f"UPPER(COALESCE({column}, '')) LIKE UPPER(%s)" for column in spec.columns]
+    return f"({' OR '.join(conditions)})", [like] * len(spec.columns)
+
+
+def _fulltext_terms(keyword: str) -> str:
+    return _WHITESPACE.sub(" ", _BOOLEAN_OPERATOR_CHARS.sub(" ", keyword)).strip()
+
+
+def search(spec: SearchSpec, keyword: str) -> Tuple[str, List[Any]]:
+    """Build a WHERE predicate (without leading AND) matching `keyword` against `spec`."""
+    text = str(keyword or "").strip()
+    if not text:
+        return "1 = 1", []
+
+    if spec.backend == "memory":
+        if not spec.id_column:
+            raise RuntimeError(f"search spec {spec.name} has no id_column")
+        ids = _get_index(spec).lookup(text)
+        if not ids:
+            return "1 = 0", []
+        placeholders = ",".join(["%s"] * len(ids))
+        return f"{spec.id_column} IN ({placeholders})", list(ids)
+
+    if spec.backend == "like":
+        return _like_predicate(spec, text)
+
+    terms = _fulltext_terms(text)
+    if not env_bool("SEARCH_FULLTEXT_ENABLED", True) or len(terms.replace(" ", "")) < NGRAM_TOKEN_SIZE:
+        return _like_predicate(spec, text)
+    # Boolean-mode phrase search: the ngram parser turns "abc" into the phrase "ab bc".
+    columns = ", ".join(spec.columns)
+    return f"MATCH({columns}) AGAINST (%s IN BOOLEAN MODE)", [f'"{terms}"']
+
+
+def _load_user_documents() -> List[Dict[str, Any]]:
+    return fetch_all("SELECT dingtalk_userid, dingtalk_username FROM dim_bi_amazon_user")
+
+
+PRODUCT_SEARCH = SearchSpec(name="product", columns=("p.asin", "p.product", "p.brand"))
+STRATEGY_SEARCH = SearchSpec(
+    name="strategy",
+    columns=("s.title", "s.detail", "s.competitor_asin", "s.yida_asin"),
+)
+# dim_bi_amazon_log is range-partitioned by month, and partitioned InnoDB tables cannot have
+# FULLTEXT indexes; the date filter prunes partitions before the LIKE scan instead.
+AUDIT_LOG_SEARCH = SearchSpec(name="audit_log", columns=("operator_name", "target_id", "detail"), backend="like")
+USER_SEARCH = SearchSpec(
+    name="user",
+    columns=("u.dingtalk_username", "u.dingtalk_userid"),
+    backend="memory",
+    id_column="u.dingtalk_userid",
+    loader=_load_user_documents,
+    id_field="dingtalk_userid",
+    text_fields=("dingtalk_userid", "dingtalk_username"),
+)
@@ -1,16 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+import re
+import threading
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 
 from ..core.celery_app import celery_app
-from ..core.config import normalize_site
+from ..core.config import env_int, normalize_site
+from ..core.logging import logger
+from ..core.redis_client import get_redis
 from ..repositories import ai_insight_repo, bsr_repo
-from . import bsr_ai_service
+from . import ai_job_events, bsr_ai_service, bsr_common_service
 
 _AI_INSIGHT_TASK_NAME = "bi_amazon.ai_insight.run"
+_AI_INSIGHT_BATCH_TASK_NAME = "bi_amazon.ai_insight.run_batch"
+_ASIN_PATTERN = re.compile(r"^[A-Z0-9]{10}$")
+_INFLIGHT_STATUSES = {"pending", "running"}
+
+_reaper_lock = threading.Lock()
+_reaper_thread: Optional[threading.Thread] = None
+_reaper_stop = threading.Event()
 
 
 def _normalize_range_days(value: int) -> int:
@@ -21,8 +37,11 @@ def _to_job_item(row: Dict[str, Any]) -> Dict[str, Any]:
     report_text = str(row.get("report_text") or "")
     return {
         "job_id": row.get("job_id"),
+        "batch_id": row.get("batch_id"),
+        "leader_job_id": row.get("leader_job_id"),
         "asin": row.get("asin"),
         "site": row.get("site"),
+        "range_days": row.get("range_days"),
         "status": row.get("status"),
         "operator_userid": row.get("operator_userid"),
         "created_at": ai_insight_repo.serialize_datetime(row.get("created_at")),
@@ -31,6 +50,16 @@ def _to_job_item(row: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _finish_job(job_id: str, status: str, report_text: Optional[str] = None) -> None:
+    if status == "success":
+        ai_insight_repo.mark_job_success(job_id, report_text or "")
+    else:
+        ai_insight_repo.mark_job_failed(job_id)
+    ai_insight_repo.complete_follower_jobs(job_id, status, report_text)
+    # Followers' listeners subscribe to the leader too, so one event covers them.
+    ai_job_events.publish_job_status(job_id, status)
+
+
 def run_ai_insight_job(
     job_id: str,
     asin: str,
@@ -39,17 +68,234 @@ def run_ai_insight_job(
     operator_userid: str,
 ) -> None:
     ai_insight_repo.mark_job_running(job_id)
+    ai_job_events.publish_job_status(job_id, "running")
     try:
         rows = bsr_repo.fetch_bsr_daily_window(asin, site, range_days)
         if not rows:
             raise HTTPException(status_code=404, detail="该 ASIN 在 fact_bi_amazon_product_day 暂无可分析数据")
         summary = bsr_ai_service._build_bsr_ai_summary(rows)
-        report_text = bsr_ai_service._call_openrouter_bsr_ai_insight(asin, site, range_days, rows, summary)
-        ai_insight_repo.mark_job_success(job_id, report_text)
+        report_text, _ = bsr_ai_service.generate_bsr_ai_report(asin, site, range_days, rows, summary)
+        _finish_job(job_id, "success", report_text)
     except HTTPException:
-        ai_insight_repo.mark_job_failed(job_id)
+        _finish_job(job_id, "failed")
     except Exception:
+        _finish_job(job_id, "failed")
+
+
+def hand_off_abandoned_job(job_id: str) -> Optional[str]:
+    """A streamed job whose client went away: it is failed, but jobs deduplicated onto it were not
+    abandoned, so the oldest follower becomes the leader and is queued. Returns the new leader's id."""
+    follower = ai_insight_repo.fetch_oldest_follower(job_id)
+    if follower is None:
         ai_insight_repo.mark_job_failed(job_id)
+        ai_job_events.publish_job_status(job_id, "failed")
+        return None
+    new_leader_id = str(follower["job_id"])
+    ai_insight_repo.reassign_followers(job_id, new_leader_id)
+    # Followers' listeners re-read their row on this event and switch to the new leader's channel.
+    ai_insight_repo.mark_job_failed(job_id)
+    ai_job_events.publish_job_status(job_id, "failed")
+    # Submissions that attached to the old leader while it was being failed.
+    ai_insight_repo.reassign_followers(job_id, new_leader_id)
+    try:
+        celery_app.send_task(
+            _AI_INSIGHT_TASK_NAME,
+            args=[
+                new_leader_id,
+                str(follower.get("asin") or ""),
+                str(follower.get("site") or ""),
+                _normalize_range_days(int(follower.get("range_days") or 90)),
+                str(follower.get("operator_userid") or ""),
+            ],
+        )
+    except Exception:
+        logger.exception("ai_insight_handoff_enqueue_failed job_id=%s new_leader=%s", job_id, new_leader_id)
+        _finish_job(new_leader_id, "failed")
+        return None
+    logger.info("ai_insight_handoff job_id=%s new_leader=%s", job_id, new_leader_id)
+    return new_leader_id
+
+
+def _inflight_key(asin: str, site: str, range_days: int) -> str:
+    return f"bi_amazon:ai_insight:inflight:{site}:{asin}:{range_days}"
+
+
+def _claim_inflight(key: str, job_id: str, window_seconds: int) -> Optional[str]:
+    """SET NX on the input key: None when this submission owns it, else the job id already holding it."""
+    try:
+        client = get_redis()
+        if client.set(key, job_id, nx=True, ex=window_seconds):
+            return None
+        holder = client.get(key)
+        if holder is None:
+            # Expired between the two calls; take it over.
+            client.set(key, job_id, ex=window_seconds)
+        return holder
+    except Exception as exc:
+        # Without Redis the indexed lookup alone still catches everything but simultaneous submits.
+        logger.warning("ai_insight_inflight_lock_unavailable key=%s err=%s", key, exc)
+        return None
+
+
+def _release_inflight(key: str) -> None:
+    try:
+        get_redis().delete(key)
+    except Exception:
+        pass
+
+
+def _fetch_inflight_holder(holder_id: str) -> Optional[Dict[str, Any]]:
+    # The holder sets the key just before inserting its row, so give the insert a moment to land.
+    for _ in range(10):
+        row = ai_insight_repo.fetch_job(holder_id)
+        if row is not None:
+            return row
+        time.sleep(0.1)
+    return None
+
+
+def _find_inflight_leader(
+    asin: str,
+    site: str,
+    range_days: int,
+    job_id: str,
+) -> Optional[Dict[str, Any]]:
+    """Running job for identical input, or None after this submission has claimed the input key."""
+    window_seconds = env_int("AI_INSIGHT_DEDUP_WINDOW_SECONDS", 600)
+    if window_seconds <= 0:
+        return None
+    leader = ai_insight_repo.fetch_inflight_job(asin, site, range_days, window_seconds)
+    if leader is not None:
+        return ai_insight_repo.fetch_job(str(leader["job_id"])) or leader
+    key = _inflight_key(asin, site, range_days)
+    holder_id = _claim_inflight(key, job_id, window_seconds)
+    if holder_id is None:
+        return None
+    holder = _fetch_inflight_holder(holder_id)
+    if holder is not None and str(holder.get("status") or "") in _INFLIGHT_STATUSES:
+        return holder
+    # Stale key: the holder finished (or never got inserted).
+    try:
+        get_redis().set(key, job_id, ex=window_seconds)
+    except Exception:
+        pass
+    return None
+
+
+def _complete_if_leader_finished(leader_id: str) -> str:
+    latest = ai_insight_repo.fetch_job(leader_id)
+    latest_status = str((latest or {}).get("status") or "failed")
+    if latest_status not in _INFLIGHT_STATUSES:
+        # The leader finished while its follower was being inserted.
+        ai_insight_repo.complete_follower_jobs(leader_id, latest_status, (latest or {}).get("report_text"))
+    return latest_status
+
+
+def reap_stale_jobs() -> int:
+    """Fails jobs whose task was lost (worker crash, API process gone mid-stream) so their followers
+    and listeners stop waiting. Batch children are left to their batch."""
+    stale_seconds = max(60, env_int("AI_INSIGHT_STALE_SECONDS", 1800))
+    reaped: List[str] = []
+    for row in ai_insight_repo.fetch_stale_jobs(stale_seconds):
+        job_id = str(row.get("job_id") or "")
+        leader_id = str(row.get("leader_job_id") or "")
+        if leader_id:
+            if leader_id in reaped:
+                continue
+            leader = ai_insight_repo.fetch_job_status(leader_id)
+            if leader is not None and str(leader.get("status") or "") in _INFLIGHT_STATUSES:
+                # Finishes with its leader, which is reaped in turn once it is stuck.
+                continue
+            # The leader finished or was deleted without completing this follower.
+            ai_job_events.publish_job_status(job_id, _complete_if_leader_finished(leader_id))
+        else:
+            if not ai_insight_repo.fail_inflight_job(job_id):
+                continue
+            ai_insight_repo.complete_follower_jobs(job_id, "failed")
+            ai_job_events.publish_job_status(job_id, "failed")
+        logger.warning("ai_insight_job_reaped job_id=%s leader_job_id=%s", job_id, leader_id or "-")
+        reaped.append(job_id)
+    return len(reaped)
+
+
+def reap_stale_batches() -> int:
+    """Closes batches whose task was lost or that still wait on children long after starting:
+    the unfinished children (and jobs deduplicated onto them) are failed, then the batch is finished."""
+    stale_seconds = max(60, env_int("AI_BATCH_STALE_SECONDS", 7200))
+    reaped = 0
+    for batch in ai_insight_repo.fetch_stale_batches(stale_seconds):
+        batch_id = str(batch.get("batch_id") or "")
+        progress = ai_insight_repo.fetch_batch_progress(batch_id)
+        if _finish_batch_if_settled(batch_id, batch, progress):
+            # Only the closing status read never came.
+            continue
+        stuck = [job for job in ai_insight_repo.fetch_batch_jobs(batch_id) if job.get("status") in _INFLIGHT_STATUSES]
+        ai_insight_repo.fail_pending_batch_jobs(batch_id)
+        for job in stuck:
+            ai_job_events.publish_job_status(str(job["job_id"]), "failed")
+        _finish_batch_if_settled(batch_id, batch, ai_insight_repo.fetch_batch_progress(batch_id))
+        logger.warning("ai_insight_batch_reaped batch_id=%s stuck_jobs=%s", batch_id, len(stuck))
+        reaped += 1
+    return reaped
+
+
+def _reap_loop(interval_seconds: float) -> None:
+    while not _reaper_stop.wait(interval_seconds):
+        for reap in (reap_stale_jobs, reap_stale_batches):
+            try:
+                reap()
+            except Exception:
+                logger.exception("ai_insight_reap_failed step=%s", reap.__name__)
+
+
+def start_ai_job_reaper() -> None:
+    """API startup: one daemon thread per process; the conditional updates make concurrent reapers safe."""
+    global _reaper_thread
+    with _reaper_lock:
+        if _reaper_thread is not None and _reaper_thread.is_alive():
+            return
+        _reaper_stop.clear()
+        _reaper_thread = threading.Thread(
+            target=_reap_loop,
+            args=(max(10, env_int("AI_INSIGHT_REAP_INTERVAL_SECONDS", 300)),),
+            name="ai-insight-reaper",
+            daemon=True,
+        )
+        _reaper_thread.start()
+
+
+def stop_ai_job_reaper() -> None:
+    global _reaper_thread
+    with _reaper_lock:
+        thread, _reaper_thread = _reaper_thread, None
+        _reaper_stop.set()
+    if thread is not None:
+        thread.join(timeout=5)
+
+
+def _follow_leader(
+    leader: Dict[str, Any],
+    job_id: str,
+    asin: str,
+    site: str,
+    range_days: int,
+    operator_userid: str,
+) -> Dict[str, Any]:
+    leader_id = str(leader["job_id"])
+    if str(leader.get("operator_userid") or "") == str(operator_userid or ""):
+        # Double click or a second tab: hand back the job already running.
+        return leader
+    # Another operator gets a job of their own that finishes with the leader's result.
+    ai_insight_repo.insert_job(
+        job_id=job_id,
+        asin=asin,
+        site=site,
+        operator_userid=operator_userid,
+        range_days=range_days,
+        leader_job_id=leader_id,
+    )
+    _complete_if_leader_finished(leader_id)
+    return ai_insight_repo.fetch_job(job_id) or {}
 
 
 def submit_job(
@@ -65,25 +311,52 @@ def submit_job(
     target_range_days = _normalize_range_days(range_days)
 
     job_id = uuid.uuid4().hex
-    ai_insight_repo.insert_job(
-        job_id=job_id,
-        asin=target_asin,
-        site=target_site,
-        operator_userid=operator_userid,
-    )
-    try:
-        celery_app.send_task(
-            _AI_INSIGHT_TASK_NAME,
-            args=[job_id, target_asin, target_site, target_range_days, operator_userid],
+    rows = bsr_repo.fetch_bsr_daily_window(target_asin, target_site, target_range_days)
+    cached_report = None
+    if rows:
+        fingerprint = bsr_ai_service.build_bsr_ai_fingerprint(target_asin, target_site, target_range_days, rows)
+        cached_report = bsr_ai_service.find_cached_bsr_ai_report(fingerprint)
+    if cached_report is not None:
+        # Same data, model and prompt as an earlier report: finish the job without a worker round trip.
+        ai_insight_repo.insert_job(
+            job_id=job_id,
+            asin=target_asin,
+            site=target_site,
+            operator_userid=operator_userid,
+            status="success",
+            report_text=cached_report,
+            range_days=target_range_days,
         )
-    except Exception as exc:
-        ai_insight_repo.mark_job_failed(job_id)
-        raise HTTPException(status_code=502, detail=f"任务入队失败: {exc}") from exc
+    else:
+        leader = _find_inflight_leader(target_asin, target_site, target_range_days, job_id)
+        if leader is not None:
+            item = _to_job_item(_follow_leader(leader, job_id, target_asin, target_site, target_range_days, operator_userid))
+            item["deduplicated"] = True
+            return item
+        ai_insight_repo.insert_job(
+            job_id=job_id,
+            asin=target_asin,
+            site=target_site,
+            operator_userid=operator_userid,
+            range_days=target_range_days,
+        )
+        try:
+            celery_app.send_task(
+                _AI_INSIGHT_TASK_NAME,
+                args=[job_id, target_asin, target_site, target_range_days, operator_userid],
+            )
+        except Exception as exc:
+            ai_insight_repo.mark_job_failed(job_id)
+            ai_job_events.publish_job_status(job_id, "failed")
+            _release_inflight(_inflight_key(target_asin, target_site, target_range_days))
+            raise HTTPException(status_code=502, detail=f"任务入队失败: {exc}") from exc
 
     row = ai_insight_repo.fetch_job(job_id)
     if not row:
         raise HTTPException(status_code=500, detail="任务创建失败")
-    return _to_job_item(row)
+    item = _to_job_item(row)
+    item["deduplicated"] = False
+    return item
 
 
 def get_job(job_id: str, role: str, userid: str) -> Dict[str, Any]:
@@ -95,6 +368,79 @@ def get_job(job_id: str, role: str, userid: str) -> Dict[str, Any]:
     return _to_job_item(row)
 
 
+async def _relay_job_events(item: Dict[str, Any]) -> AsyncIterator[str]:
+    job_id = str(item["job_id"])
+    status = str(item.get("status") or "")
+    if status not in _INFLIGHT_STATUSES:
+        yield bsr_ai_service._sse_event("done", {"item": item})
+        return
+    yield bsr_ai_service._sse_event("status", {"job_id": job_id, "status": status})
+    leader_id = str(item.get("leader_job_id") or "")
+    pubsub = await ai_job_events.subscribe_job_events(*([job_id, leader_id] if leader_id else [job_id]))
+    # Events only say "look again"; the table stays the source of truth, and a slow re-read
+    # catches transitions that were never published (Redis down, bulk batch failures).
+    poll_seconds = env_int("AI_JOB_EVENTS_POLL_SECONDS", 20)
+    fallback_poll_seconds = env_int("AI_JOB_EVENTS_FALLBACK_POLL_SECONDS", 3)
+    keepalive_seconds = 15
+    deadline = time.monotonic() + env_int("AI_JOB_EVENTS_MAX_SECONDS", 900)
+    # Re-read once right away: the job may have moved between get_job and subscribing.
+    next_check = time.monotonic()
+    last_sent = time.monotonic()
+    try:
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                # The client reconnects or falls back to polling.
+                yield bsr_ai_service._sse_event("timeout", {"job_id": job_id, "status": status})
+                return
+            should_check = now >= next_check
+            if not should_check:
+                wait = max(0.0, min(next_check, last_sent + keepalive_seconds, deadline) - now)
+                if pubsub is None:
+                    await asyncio.sleep(wait)
+                else:
+                    try:
+                        should_check = await ai_job_events.next_job_event(pubsub, wait) is not None
+                    except Exception as exc:
+                        logger.warning("ai_job_event_listen_failed job_id=%s err=%s", job_id, exc)
+                        await ai_job_events.close_subscription(pubsub)
+                        pubsub = None
+                        should_check = True
+            if should_check:
+                next_check = time.monotonic() + (poll_seconds if pubsub is not None else fallback_poll_seconds)
+                row = await run_in_threadpool(ai_insight_repo.fetch_job_status, job_id)
+                if row is None:
+                    yield bsr_ai_service._sse_event("error", {"job_id": job_id, "message": "任务不存在"})
+                    return
+                latest = str(row.get("status") or "")
+                latest_leader_id = str(row.get("leader_job_id") or "")
+                if latest_leader_id != leader_id:
+                    # Handed off to a new leader (the old one's stream client went away).
+                    leader_id = latest_leader_id
+                    if pubsub is not None and leader_id:
+                        await ai_job_events.add_subscription(pubsub, leader_id)
+                if latest not in _INFLIGHT_STATUSES:
+                    final = await run_in_threadpool(ai_insight_repo.fetch_job, job_id)
+                    yield bsr_ai_service._sse_event("done", {"item": _to_job_item(final or row)})
+                    return
+                if latest != status:
+                    status = latest
+                    yield bsr_ai_service._sse_event("status", {"job_id": job_id, "status": status})
+                    last_sent = time.monotonic()
+            if time.monotonic() - last_sent >= keepalive_seconds:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+    finally:
+        if pubsub is not None:
+            await ai_job_events.close_subscription(pubsub)
+
+
+async def open_job_event_stream(job_id: str, role: str, userid: str) -> AsyncIterator[str]:
+    """Checks access up front (so 403/404 are plain responses), then streams status/done events."""
+    item = await run_in_threadpool(get_job, job_id, role, userid)
+    return _relay_job_events(item)
+
+
 def list_jobs(
     limit: int,
     offset: int,
@@ -109,3 +455,167 @@ def list_jobs(
     target_status = str(status or "").strip().lower() or None
     rows = ai_insight_repo.fetch_jobs(limit, offset, target_asin, target_site, target_status, role, userid)
     return [_to_job_item(row) for row in rows]
+
+
+def _to_batch_item(row: Dict[str, Any], progress: Dict[str, int]) -> Dict[str, Any]:
+    total = int(row.get("total") or 0)
+    finished = progress.get("success", 0) + progress.get("failed", 0)
+    batch_date = row.get("batch_date")
+    return {
+        "batch_id": row.get("batch_id"),
+        "site": row.get("site"),
+        "category": row.get("category"),
+        "batch_date": batch_date.isoformat() if isinstance(batch_date, date) else None,
+        "range_days": row.get("range_days"),
+        "status": row.get("status"),
+        "operator_userid": row.get("operator_userid"),
+        "created_at": ai_insight_repo.serialize_datetime(row.get("created_at")),
+        "started_at": ai_insight_repo.serialize_datetime(row.get("started_at")),
+        "finished_at": ai_insight_repo.serialize_datetime(row.get("finished_at")),
+        "total": total,
+        "pending": progress.get("pending", 0),
+        "running": progress.get("running", 0),
+        "success": progress.get("success", 0),
+        "failed": progress.get("failed", 0),
+        "progress": round(finished / total * 100, 1) if total else 100.0,
+    }
+
+
+def _resolve_batch_asins(
+    site: str,
+    category: Optional[str],
+    batch_date: Optional[date],
+    asins: Optional[List[str]],
+    limit: int,
+) -> List[str]:
+    max_asins = env_int("AI_BATCH_MAX_ASINS", 200)
+    if asins:
+        targets = bsr_common_service.unique_asins([str(asin or "").strip().upper() for asin in asins if str(asin or "").strip()])
+        invalid = [asin for asin in targets if not _ASIN_PATTERN.match(asin)]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"ASIN 格式不正确: {', '.join(invalid[:5])}")
+        if len(targets) > max_asins:
+            raise HTTPException(status_code=400, detail=f"单个批次最多 {max_asins} 个 ASIN")
+        return targets
+    target_category = str(category or "").strip()
+    if not target_category:
+        raise HTTPException(status_code=400, detail="请提供 ASIN 列表或类目")
+    top_n = max(1, min(int(limit or 100), max_asins))
+    rows = bsr_repo.fetch_top_ranked_asins(site, target_category, batch_date, top_n)
+    targets = bsr_common_service.unique_asins([str(row.get("asin") or "").strip().upper() for row in rows if row.get("asin")])
+    if not targets:
+        raise HTTPException(status_code=404, detail="该类目在所选批次暂无排名数据")
+    return targets
+
+
+def submit_batch(
+    site: Optional[str],
+    category: Optional[str],
+    batch_date: Optional[date],
+    asins: Optional[List[str]],
+    range_days: int,
+    limit: int,
+    operator_userid: str,
+) -> Dict[str, Any]:
+    target_site = normalize_site(site)
+    target_range_days = _normalize_range_days(range_days)
+    targets = _resolve_batch_asins(target_site, category, batch_date, asins, limit)
+    target_category = None if asins else str(category or "").strip()
+
+    batch_id = uuid.uuid4().hex
+    jobs: List[Dict[str, Optional[str]]] = []
+    for asin in targets:
+        job_id = uuid.uuid4().hex
+        # A child whose input is already being analysed follows that job instead of calling the model again.
+        leader = _find_inflight_leader(asin, target_site, target_range_days, job_id)
+        jobs.append({"job_id": job_id, "asin": asin, "leader_job_id": str(leader["job_id"]) if leader else None})
+    ai_insight_repo.insert_batch(
+        batch_id,
+        target_site,
+        target_category,
+        None if asins else batch_date,
+        target_range_days,
+        operator_userid,
+        jobs,
+    )
+    for leader_id in {job["leader_job_id"] for job in jobs if job["leader_job_id"]}:
+        _complete_if_leader_finished(leader_id)
+    try:
+        celery_app.send_task(_AI_INSIGHT_BATCH_TASK_NAME, args=[batch_id])
+    except Exception as exc:
+        ai_insight_repo.fail_pending_batch_jobs(batch_id)
+        ai_insight_repo.mark_batch_finished(batch_id, "failed")
+        raise HTTPException(status_code=502, detail=f"任务入队失败: {exc}") from exc
+
+    row = ai_insight_repo.fetch_batch(batch_id)
+    if not row:
+        raise HTTPException(status_code=500, detail="任务创建失败")
+    return _to_batch_item(row, ai_insight_repo.fetch_batch_progress(batch_id))
+
+
+def run_ai_insight_batch(batch_id: str) -> None:
+    """Runs the pending children on a thread pool: each child is I/O bound (one OpenRouter call),
+    so one worker slot drives many of them; the shared rate limiter in bsr_ai_service keeps the
+    total request rate toward OpenRouter bounded, and cached reports finish without a call."""
+    batch = ai_insight_repo.fetch_batch(batch_id)
+    if not batch:
+        logger.warning("ai_insight_batch_missing batch_id=%s", batch_id)
+        return
+    ai_insight_repo.mark_batch_running(batch_id)
+    site = str(batch.get("site") or "")
+    range_days = _normalize_range_days(int(batch.get("range_days") or 90))
+    operator_userid = str(batch.get("operator_userid") or "")
+    # Followers finish with their leader's result (another user's job, batch or stream).
+    jobs = [job for job in ai_insight_repo.fetch_batch_jobs(batch_id, status="pending") if not job.get("leader_job_id")]
+    workers = max(1, min(env_int("AI_BATCH_CONCURRENCY", 8), len(jobs) or 1))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-batch") as executor:
+            futures = [
+                executor.submit(run_ai_insight_job, str(job["job_id"]), str(job["asin"]), site, range_days, operator_userid)
+                for job in jobs
+            ]
+            for future in futures:
+                future.result()
+    except Exception:
+        logger.exception("ai_insight_batch_failed batch_id=%s", batch_id)
+        ai_insight_repo.fail_pending_batch_jobs(batch_id)
+        ai_insight_repo.mark_batch_finished(batch_id, "failed")
+        return
+    progress = ai_insight_repo.fetch_batch_progress(batch_id)
+    if _finish_batch_if_settled(batch_id, batch, progress):
+        logger.info("ai_insight_batch_done batch_id=%s progress=%s", batch_id, progress)
+    else:
+        # Not worth a worker slot to wait; the first status read after the leaders finish closes it.
+        logger.info("ai_insight_batch_waiting_on_leaders batch_id=%s progress=%s", batch_id, progress)
+
+
+def _finish_batch_if_settled(batch_id: str, batch: Dict[str, Any], progress: Dict[str, int]) -> bool:
+    if progress.get("pending", 0) or progress.get("running", 0):
+        return False
+    all_failed = progress.get("failed", 0) >= int(batch.get("total") or 0) > 0
+    ai_insight_repo.mark_batch_finished(batch_id, "failed" if all_failed else "done")
+    return True
+
+
+def get_batch(batch_id: str, role: str, userid: str, include_jobs: bool = True) -> Dict[str, Any]:
+    row = ai_insight_repo.fetch_batch(batch_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    if role != "admin" and str(row.get("operator_userid") or "") != str(userid or ""):
+        raise HTTPException(status_code=403, detail="无权访问该任务")
+    progress = ai_insight_repo.fetch_batch_progress(batch_id)
+    if row.get("status") == "running" and _finish_batch_if_settled(batch_id, row, progress):
+        row = ai_insight_repo.fetch_batch(batch_id) or row
+    item = _to_batch_item(row, progress)
+    if include_jobs:
+        item["jobs"] = [
+            {
+                "job_id": job.get("job_id"),
+                "leader_job_id": job.get("leader_job_id"),
+                "asin": job.get("asin"),
+                "status": job.get("status"),
+                "report_length": int(job.get("report_length") or 0),
+            }
+            for job in ai_insight_repo.fetch_batch_jobs(batch_id)
+        ]
+    return item
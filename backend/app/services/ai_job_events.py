@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Dict, Optional
+
+from ..core.logging import logger
+from ..core.redis_client import get_async_redis, get_redis
+
+_CHANNEL_PREFIX = "bi_amazon:ai_insight:job:"
+# After a failed publish, skip Redis for a while instead of paying its connect timeout per transition.
+_PUBLISH_RETRY_SECONDS = 30.0
+_publish_retry_at = 0.0
+
+
+def job_channel(job_id: str) -> str:
+    return f"{_CHANNEL_PREFIX}{job_id}"
+
+
+def publish_job_status(job_id: str, status: str) -> None:
+    """Fire-and-forget status transition; listeners fall back to reading the table if it is lost.
+    Call after the row is updated so a listener re-reading it sees the new status."""
+    global _publish_retry_at
+    if time.monotonic() < _publish_retry_at:
+        return
+    message = json.dumps({"job_id": job_id, "status": status})
+    try:
+        get_redis().publish(job_channel(job_id), message)
+    except Exception as exc:
+        _publish_retry_at = time.monotonic() + _PUBLISH_RETRY_SECONDS
+        logger.warning("ai_job_event_publish_failed job_id=%s status=%s err=%s", job_id, status, exc)
+
+
+async def subscribe_job_events(*job_ids: str) -> Optional[Any]:
+    """Async pub/sub subscribed to the given jobs, or None when Redis is unreachable."""
+    pubsub = get_async_redis().pubsub(ignore_subscribe_messages=True)
+    try:
+        await pubsub.subscribe(*[job_channel(job_id) for job_id in job_ids])
+    except Exception as exc:
+        logger.warning("ai_job_event_subscribe_failed job_ids=%s err=%s", ",".join(job_ids), exc)
+        await close_subscription(pubsub)
+        return None
+    return pubsub
+
+
+async def add_subscription(pubsub: Any, job_id: str) -> None:
+    await pubsub.subscribe(job_channel(job_id))
+
+
+async def next_job_event(pubsub: Any, timeout: float) -> Optional[Dict[str, Any]]:
+    """Next published transition, or None when nothing arrived within timeout seconds."""
+    message = await pubsub.get_message(timeout=timeout)
+    if not message or message.get("type") != "message":
+        return None
+    try:
+        data = json.loads(message.get("data") or "{}")
+    except (TypeError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def close_subscription(pubsub: Any) -> None:
+    try:
+        await pubsub.aclose()
+    except Exception:
+        pass
+
+
+__all__ = [
+    "add_subscription",
+    "close_subscription",
+    "job_channel",
+    "next_job_event",
+    "publish_job_status",
+    "subscribe_job_events",
+]
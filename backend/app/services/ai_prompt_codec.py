@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+# Column order of the compact table; matches the v1 row objects minus "date".
+DAILY_FIELDS = (
+    "buybox_price",
+    "price",
+    "prime_price",
+    "coupon_price",
+    "coupon_discount",
+    "child_sales",
+    "sales_volume",
+    "fba_price",
+    "fbm_price",
+    "strikethrough_price",
+    "bsr_rank",
+    "bsr_reciprocating_saw_blades",
+    "rating",
+    "rating_count",
+    "seller_count",
+)
+
+
+def _plain(value: Any) -> Any:
+    # Missing stays null: an absent FBA price means out of stock, a zero does not.
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        number = float(value)
+        return int(number) if number.is_integer() else round(number, 2)
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else round(value, 2)
+    return value
+
+
+def _to_date(value: Any) -> Optional[date]:
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def run_length_encode(values: Sequence[Any]) -> List[Any]:
+    """A scalar is a single day; [value, n] repeats value for n consecutive days."""
+    encoded: List[Any] = []
+    index = 0
+    while index < len(values):
+        value = values[index]
+        run = 1
+        while index + run < len(values) and values[index + run] == value:
+            run += 1
+        encoded.append([value, run] if run > 1 else value)
+        index += run
+    return encoded
+
+
+def _date_runs(dates: Sequence[Optional[date]]) -> List[List[Any]]:
+    runs: List[List[Any]] = []
+    previous: Optional[date] = None
+    for day in dates:
+        if runs and previous is not None and day is not None and day == previous + timedelta(days=1):
+            runs[-1][1] += 1
+        else:
+            runs.append([day.isoformat() if day else None, 1])
+        previous = day
+    return runs
+
+
+def encode_daily_rows_compact(rows: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Columnar, run-length encoded form of fetch_bsr_daily_window rows (ascending by date)."""
+    dates = [_to_date(row.get("date")) for row in rows]
+    return {
+        "dates": _date_runs(dates),
+        "columns": {field: run_length_encode([_plain(row.get(field)) for row in rows]) for field in DAILY_FIELDS},
+    }
+
+
+__all__ = ["DAILY_FIELDS", "encode_daily_rows_compact", "run_length_encode"]
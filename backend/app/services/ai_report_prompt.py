@@ -2,7 +2,17 @@ from __future__ import annotations
 
 import json
 from datetime import datetime
-from typing import Any, Dict, List
+import os
+from typing import Any, Dict, List, Optional
+
+# v1 sends every daily row as a JSON object; v2 sends the compact columnar encoding
+# (ai_prompt_codec) plus the rule-defined metrics precomputed by bsr_feature_service. The values are part of the AI report cache key:
+# bump one whenever its prompt changes meaningfully.
+KEEPA_REPORT_PROMPT_VERSIONS = {
+    "v1": "keepa-report-v1",
+    "v2": "keepa-report-v2.1-compact",
+}
+DEFAULT_KEEPA_REPORT_PROMPT_VERSION = "v2"
 
 # Gemini system prompt for Keepa-style deep report.
 KEEPA_REPORT_SYSTEM_PROMPT = """你是资深 Amazon 运营数据分析师，擅长 Keepa 时序数据、价格策略、BSR 归因、库存断货影响、评论增长异常识别与生命周期判断。
@@ -21,16 +31,63 @@ KEEPA_REPORT_SYSTEM_PROMPT = """你是资深 Amazon 运营数据分析师，擅
 """
 
 
+def resolve_keepa_prompt_version() -> str:
+    value = str(os.getenv("AI_REPORT_PROMPT_VERSION", "") or "").strip().lower()
+    return value if value in KEEPA_REPORT_PROMPT_VERSIONS else DEFAULT_KEEPA_REPORT_PROMPT_VERSION
+
+
+def _rows_data_section(rows_payload: List[Dict[str, Any]]) -> str:
+    rows_json = json.dumps(rows_payload, ensure_ascii=False)
+    return f"""字段说明：
+- date, buybox_price, price, prime_price, coupon_price, coupon_discount
+- child_sales, sales_volume, fba_price, fbm_price, strikethrough_price
+- bsr_rank, bsr_reciprocating_saw_blades, rating, rating_count, seller_count
+
+原始数据（按日期升序，JSON数组）：
+{rows_json}"""
+
+
+def _compact_data_section(compact_payload: Dict[str, Any]) -> str:
+    compact_json = json.dumps(compact_payload, ensure_ascii=False, separators=(",", ":"))
+    return f"""数据编码说明（列式 + 游程编码）：
+- dates：[起始日期, 连续天数] 列表，依次展开即为每一行的日期（按日期升序）
+- columns：每个字段一列，与 dates 展开后的行一一对应；标量表示单日取值，[值, n] 表示连续 n 天取值相同
+- null 表示当日无数据（如 fba_price 为 null 即 FBA 无报价），0 是真实取值，二者不可混同
+
+数据（JSON）：
+{compact_json}"""
+
+
+def _features_section(features: Dict[str, Any]) -> str:
+    features_json = json.dumps(features, ensure_ascii=False, separators=(",", ":"))
+    return f"""预计算特征（JSON，已按“额外分析规则”从上面的数据确定性计算）：
+- first_listed_date / first_bsr_date / first_review_date：最早在售、首次有排名、首次有评论的日期
+- stockout_runs：fba_price 连续为 null 的断货区间，附断货前后排名
+- rating_jumps：评分数日增量 >= max(20, 近30天日增量P95×2) 的异常点，threshold 为实际阈值
+- price_change_events：单日价格变动 >= 5% 的事件，附变动前排名与7天后排名
+- seller：跟卖天数、最长连续跟卖天数、最大卖家数
+以上结论直接引用，不要重新推算；如与原始数据矛盾，以原始数据为准并指出。
+{features_json}"""
+
+
 def build_keepa_report_user_prompt(
     asin: str,
     site: str,
     range_days: int,
     summary: Dict[str, Any],
-    rows_payload: List[Dict[str, Any]],
+    rows_payload: Optional[List[Dict[str, Any]]] = None,
+    compact_payload: Optional[Dict[str, Any]] = None,
+    features: Optional[Dict[str, Any]] = None,
 ) -> str:
+    """Pass rows_payload for the v1 prompt or compact_payload (and features) for v2."""
     today = datetime.now().strftime("%Y-%m-%d")
     summary_json = json.dumps(summary, ensure_ascii=False)
-    rows_json = json.dumps(rows_payload, ensure_ascii=False)
+    if compact_payload is not None:
+        data_section = _compact_data_section(compact_payload)
+    else:
+        data_section = _rows_data_section(rows_payload or [])
+    if features:
+        data_section = f"{data_section}\n\n{_features_section(features)}"
     return f"""请基于以下数据生成《Keepa数据深度解析报告 - ASIN: {asin}》。
 
 基础信息：
@@ -41,13 +98,7 @@ def build_keepa_report_user_prompt(
 - 观察窗口: 最近{range_days}天
 - 数据来源: fact_bi_amazon_product_day
 
-字段说明：
-- date, buybox_price, price, prime_price, coupon_price, coupon_discount
-- child_sales, sales_volume, fba_price, fbm_price, strikethrough_price
-- bsr_rank, bsr_reciprocating_saw_blades, rating, rating_count, seller_count
-
-原始数据（按日期升序，JSON数组）：
-{rows_json}
+{data_section}
 
 汇总数据（JSON）：
 {summary_json}
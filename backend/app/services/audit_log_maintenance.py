@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..core.config import env_int
+from ..core.logging import logger
+from ..repositories import audit_log_repo
+
+MAX_PARTITION = "pmax"
+
+
+def _default_archive_dir() -> Path:
+    raw = str(os.getenv("AUDIT_LOG_ARCHIVE_DIR", "") or "").strip()
+    if raw:
+        return Path(raw)
+    return Path(__file__).resolve().parents[2] / "files" / "audit_archive"
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def _partition_clause(month: date) -> str:
+    return f"PARTITION {_partition_name(month)} VALUES LESS THAN ('{_add_months(month, 1):%Y-%m-%d}')"
+
+
+def _max_partition_clause() -> str:
+    return f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)"
+
+
+def _partition_upper_bound(row: Dict[str, Any]) -> Optional[date]:
+    raw = str(row.get("less_than") or "").strip().strip("'")
+    if not raw or raw.upper() == "MAXVALUE":
+        return None
+    return datetime.strptime(raw[:10], "%Y-%m-%d").date()
+
+
+def _months_between(first: date, last: date) -> List[date]:
+    months: List[date] = []
+    current = first
+    while current <= last:
+        months.append(current)
+        current = _add_months(current, 1)
+    return months
+
+
+def list_partitions() -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": row.get("name"),
+            "less_than": _partition_upper_bound(row),
+            "rows": int(row.get("table_rows") or 0),
+        }
+        for row in audit_log_repo.fetch_log_partitions()
+    ]
+
+
+def ensure_partitions(months_ahead: Optional[int] = None) -> List[str]:
+    ahead = env_int("AUDIT_LOG_PARTITIONS_AHEAD", 3) if months_ahead is None else months_ahead
+    last_month = _add_months(_month_start(date.today()), max(0, ahead))
+    partitions = audit_log_repo.fetch_log_partitions()
+
+    if not partitions:
+        created_range = audit_log_repo.fetch_log_created_range()
+        oldest = created_range.get("min_created_at")
+        first_month = _month_start(oldest.date() if isinstance(oldest, datetime) else date.today())
+        months = _months_between(first_month, last_month)
+        clauses = [_partition_clause(month) for month in months] + [_max_partition_clause()]
+        audit_log_repo.partition_log_table(f"PARTITION BY RANGE COLUMNS(created_at) ({', '.join(clauses)})")
+        names = [_partition_name(month) for month in months]
+        logger.info("audit_log_partitioned partitions=%s", len(names))
+        return names
+
+    bounds = [bound for bound in (_partition_upper_bound(row) for row in partitions) if bound is not None]
+    next_month = max(bounds) if bounds else _month_start(date.today())
+    months = _months_between(next_month, last_month)
+    if not months:
+        return []
+    clauses = [_partition_clause(month) for month in months] + [_max_partition_clause()]
+    audit_log_repo.reorganize_max_partition(", ".join(clauses))
+    names = [_partition_name(month) for month in months]
+    logger.info("audit_log_partitions_added partitions=%s", ",".join(names))
+    return names
+
+
+def _export_partition(name: str, target: Path) -> int:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_name(target.name + ".tmp")
+    count = 0
+    with gzip.open(temp_path, "wt", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(audit_log_repo.AUDIT_LOG_COLUMNS)
+        for row in audit_log_repo.iter_partition_rows(name):
+            writer.writerow([row.get(column) for column in audit_log_repo.AUDIT_LOG_COLUMNS])
+            count += 1
+    os.replace(temp_path, target)
+    return count
+
+
+def archive_partitions(
+    retain_months: Optional[int] = None,
+    archive_dir: Optional[Path] = None,
+    dry_run: bool = False,
+) -> List[Dict[str, Any]]:
+    retain = env_int("AUDIT_LOG_RETAIN_MONTHS", 6) if retain_months is None else retain_months
+    cutoff = _add_months(_month_start(date.today()), -max(1, retain))
+    root = archive_dir or _default_archive_dir()
+    archived: List[Dict[str, Any]] = []
+    for partition in list_partitions():
+        bound = partition["less_than"]
+        if bound is None or bound > cutoff:
+            continue
+        name = str(partition["name"])
+        target = root / f"{audit_log_repo.AUDIT_LOG_TABLE}_{name}.csv.gz"
+        if dry_run:
+            archived.append({"partition": name, "rows": partition["rows"], "file": str(target), "dropped": False})
+            continue
+        # Drop only after the archive file is complete; a failed export leaves the partition in place.
+        rows = _export_partition(name, target)
+        audit_log_repo.drop_partition(name)
+        logger.info("audit_log_partition_archived partition=%s rows=%s file=%s", name, rows, target)
+        archived.append({"partition": name, "rows": rows, "file": str(target), "dropped": True})
+    return archived
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import env_bool, env_int
+from ..core.logging import logger
+from ..repositories import user_repo
+
+AuditRow = Tuple[str, str, Optional[str], Optional[str], Optional[str], Optional[str], datetime]
+_STOP = object()
+
+
+def _visit_key(row: AuditRow) -> Optional[Tuple[Optional[str], str, datetime]]:
+    module, action, _, operator_userid, _, _, created_at = row
+    if action != "visit":
+        return None
+    return operator_userid, module, created_at.replace(second=0, microsecond=0)
+
+
+class AuditLogWriter:
+    def __init__(self, maxsize: int, flush_interval_ms: int, batch_size: int) -> None:
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, maxsize))
+        self._flush_interval = max(10, flush_interval_ms) / 1000.0
+        self._batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        # Visits already written for the current minute, so repeats across batches are coalesced too.
+        self._recent_visits: Dict[Tuple[Optional[str], str, datetime], None] = {}
+        self._dropped = 0
+
+    def _ensure_started(self) -> None:
+        pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+            if self._pid != pid:
+                # Forked child (e.g. Celery prefork): the parent's queue and thread are not ours.
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._recent_visits = {}
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, row: AuditRow) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            return False
+
+    def note_dropped(self) -> None:
+        with self._lock:
+            self._dropped += 1
+
+    def _collect(self) -> Tuple[List[AuditRow], bool]:
+        rows: List[AuditRow] = []
+        stopping = False
+        deadline = time.monotonic() + self._flush_interval
+        while len(rows) < self._batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stopping = True
+                break
+            rows.append(item)
+        if stopping:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    rows.append(item)
+        return rows, stopping
+
+    def _coalesce(self, rows: List[AuditRow]) -> List[AuditRow]:
+        current_minute = datetime.now().replace(second=0, microsecond=0)
+        self._recent_visits = {key: None for key in self._recent_visits if key[2] >= current_minute}
+        merged: List[AuditRow] = []
+        for row in rows:
+            key = _visit_key(row)
+            if key is not None:
+                if key in self._recent_visits:
+                    continue
+                self._recent_visits[key] = None
+            merged.append(row)
+        return merged
+
+    def _flush(self, rows: List[AuditRow]) -> None:
+        merged = self._coalesce(rows)
+        if not merged:
+            return
+        try:
+            user_repo.insert_audit_logs(merged)
+        except Exception as exc:
+            logger.warning(
+                "audit_log_flush_failed code=AUDIT_LOG_FLUSH_FAILED rows=%s err=%s",
+                len(merged),
+                exc,
+            )
+        with self._lock:
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            logger.warning("audit_log_queue_full code=AUDIT_LOG_QUEUE_FULL dropped_visits=%s", dropped)
+
+    def _run(self) -> None:
+        while True:
+            rows, stopping = self._collect()
+            if rows:
+                self._flush(rows)
+            if stopping:
+                return
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("audit_log_shutdown_queue_full code=AUDIT_LOG_SHUTDOWN_QUEUE_FULL")
+        thread.join(timeout)
+
+
+_WRITER = AuditLogWriter(
+    maxsize=env_int("AUDIT_QUEUE_MAXSIZE", 10000),
+    flush_interval_ms=env_int("AUDIT_FLUSH_INTERVAL_MS", 500),
+    batch_size=env_int("AUDIT_FLUSH_BATCH_SIZE", 200),
+)
+
+
+def enqueue_audit_log(
+    module: str,
+    action: str,
+    target_id: Optional[str],
+    operator_userid: Optional[str],
+    operator_name: Optional[str],
+    detail: Optional[str],
+) -> None:
+    if not env_bool("AUDIT_WRITER_ENABLED", True):
+        user_repo.insert_audit_log(module, action, target_id, operator_userid, operator_name, detail)
+        return
+    if _WRITER.submit((module, action, target_id, operator_userid, operator_name, detail, datetime.now())):
+        return
+    if action == "visit":
+        _WRITER.note_dropped()
+        return
+    # Edits are never dropped: fall back to a direct write when the queue is saturated.
+    user_repo.insert_audit_log(module, action, target_id, operator_userid, operator_name, detail)
+
+
+def shutdown_audit_writer(timeout: float = 5.0) -> None:
+    _WRITER.shutdown(timeout)
+
+
+atexit.register(shutdown_audit_writer)
@@ -1,19 +1,37 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
 import json
 import os
-import urllib.error
-import urllib.request
+import uuid
 
+import httpx
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 
-from ..core.config import normalize_site
-from ..repositories import bsr_repo
-from .ai_report_prompt import KEEPA_REPORT_SYSTEM_PROMPT, build_keepa_report_user_prompt
+from ..core import http_client
+from ..core.config import env_bool, env_int, normalize_site
+from ..core.rate_limit import RateLimitTimeout, openrouter_rate_limiter
+from ..core.logging import logger
+from ..repositories import ai_insight_repo, bsr_repo
+from . import ai_job_events
+from .ai_prompt_codec import encode_daily_rows_compact
+from .ai_report_prompt import (
+    KEEPA_REPORT_PROMPT_VERSIONS,
+    KEEPA_REPORT_SYSTEM_PROMPT,
+    build_keepa_report_user_prompt,
+    resolve_keepa_prompt_version,
+)
 from .bsr_common_service import _tail_text, to_float, to_int
+from .bsr_feature_service import extract_bsr_features
 
 _OPENROUTER_API_BASE = "https://openrouter.ai/api/v1/chat/completions"
+# When streaming, the read timeout applies between chunks, not to the whole report.
+_OPENROUTER_TIMEOUT = httpx.Timeout(90.0, connect=10.0)
+# How long a caller waits for the shared OpenRouter rate limit; streams answer a waiting browser.
+_STREAM_RATE_LIMIT_WAIT_SECONDS = 30
 
 
 def _parse_openrouter_text(response_json: Dict[str, Any]) -> str:
@@ -99,78 +117,117 @@ def _build_bsr_ai_summary(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
     }
 
 
-def _call_openrouter_bsr_ai_insight(
+def _rows_payload(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "date": str(row.get("date") or ""),
+            "buybox_price": to_float(row.get("buybox_price"), 0.0),
+            "price": to_float(row.get("price"), 0.0),
+            "prime_price": to_float(row.get("prime_price"), 0.0),
+            "coupon_price": to_float(row.get("coupon_price"), 0.0),
+            "coupon_discount": to_float(row.get("coupon_discount"), 0.0),
+            "child_sales": to_int(row.get("child_sales"), 0),
+            "sales_volume": to_int(row.get("sales_volume"), 0),
+            "fba_price": to_float(row.get("fba_price"), 0.0),
+            "fbm_price": to_float(row.get("fbm_price"), 0.0),
+            "strikethrough_price": to_float(row.get("strikethrough_price"), 0.0),
+            "bsr_rank": to_int(row.get("bsr_rank"), 0),
+            "bsr_reciprocating_saw_blades": to_int(row.get("bsr_reciprocating_saw_blades"), 0),
+            "rating": to_float(row.get("rating"), 0.0),
+            "rating_count": to_int(row.get("rating_count"), 0),
+            "seller_count": to_int(row.get("seller_count"), 0),
+        }
+        for row in rows
+    ]
+
+
+def build_bsr_ai_user_prompt(
     asin: str,
     site: str,
     range_days: int,
     rows: List[Dict[str, Any]],
     summary: Dict[str, Any],
+    prompt_version: Optional[str] = None,
 ) -> str:
+    version = prompt_version or resolve_keepa_prompt_version()
+    if version == "v1":
+        return build_keepa_report_user_prompt(asin, site, range_days, summary, rows_payload=_rows_payload(rows))
+    return build_keepa_report_user_prompt(
+        asin,
+        site,
+        range_days,
+        summary,
+        compact_payload=encode_daily_rows_compact(rows),
+        features=extract_bsr_features(rows),
+    )
+
+
+def _openrouter_api_url() -> str:
+    return str(os.getenv("OPENROUTER_API_URL", "")).strip() or _OPENROUTER_API_BASE
+
+
+def _resolve_openrouter_api_key() -> str:
     api_key = (
         str(os.getenv("OPENROUTER_API_KEY", "")).strip()
         or str(os.getenv("OPEN_ROUTER_API_KEY", "")).strip()
     )
     if not api_key:
         raise HTTPException(status_code=500, detail="OPENROUTER_API_KEY 未配置")
+    return api_key
 
-    model = _resolve_openrouter_model()
 
-    rows_payload = []
-    for row in rows:
-        rows_payload.append(
-            {
-                "date": str(row.get("date") or ""),
-                "buybox_price": to_float(row.get("buybox_price"), 0.0),
-                "price": to_float(row.get("price"), 0.0),
-                "prime_price": to_float(row.get("prime_price"), 0.0),
-                "coupon_price": to_float(row.get("coupon_price"), 0.0),
-                "coupon_discount": to_float(row.get("coupon_discount"), 0.0),
-                "child_sales": to_int(row.get("child_sales"), 0),
-                "sales_volume": to_int(row.get("sales_volume"), 0),
-                "fba_price": to_float(row.get("fba_price"), 0.0),
-                "fbm_price": to_float(row.get("fbm_price"), 0.0),
-                "strikethrough_price": to_float(row.get("strikethrough_price"), 0.0),
-                "bsr_rank": to_int(row.get("bsr_rank"), 0),
-                "bsr_reciprocating_saw_blades": to_int(row.get("bsr_reciprocating_saw_blades"), 0),
-                "rating": to_float(row.get("rating"), 0.0),
-                "rating_count": to_int(row.get("rating_count"), 0),
-                "seller_count": to_int(row.get("seller_count"), 0),
-            }
-        )
-    prompt = build_keepa_report_user_prompt(
-        asin=asin,
-        site=site,
-        range_days=range_days,
-        summary=summary,
-        rows_payload=rows_payload,
-    )
-    payload = {
-        "model": model,
+def _build_openrouter_payload(
+    asin: str,
+    site: str,
+    range_days: int,
+    rows: List[Dict[str, Any]],
+    summary: Dict[str, Any],
+    stream: bool = False,
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "model": _resolve_openrouter_model(),
         "messages": [
             {"role": "system", "content": KEEPA_REPORT_SYSTEM_PROMPT},
-            {"role": "user", "content": prompt},
+            {"role": "user", "content": build_bsr_ai_user_prompt(asin, site, range_days, rows, summary)},
         ],
         "temperature": 0.2,
         "top_p": 0.9,
         "max_tokens": 3072,
     }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def _call_openrouter_bsr_ai_insight(
+    asin: str,
+    site: str,
+    range_days: int,
+    rows: List[Dict[str, Any]],
+    summary: Dict[str, Any],
+) -> str:
+    api_key = _resolve_openrouter_api_key()
+    payload = _build_openrouter_payload(asin, site, range_days, rows, summary)
     raw_payload = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    req = urllib.request.Request(
-        _OPENROUTER_API_BASE,
-        data=raw_payload,
-        method="POST",
-        headers=_build_openrouter_headers(api_key),
-    )
     try:
-        with urllib.request.urlopen(req, timeout=90) as resp:
-            raw = resp.read().decode("utf-8", errors="ignore")
-    except urllib.error.HTTPError as exc:
-        body = exc.read().decode("utf-8", errors="ignore")
-        raise HTTPException(status_code=502, detail=f"OpenRouter 调用失败: {exc.code} {_tail_text(body, 500)}")
-    except urllib.error.URLError as exc:
-        raise HTTPException(status_code=502, detail=f"OpenRouter 网络错误: {exc.reason}")
+        openrouter_rate_limiter.acquire(timeout=env_int("OPENROUTER_RATE_LIMIT_WAIT_SECONDS", 300))
+    except RateLimitTimeout:
+        raise HTTPException(status_code=429, detail="OpenRouter 调用频率已达上限，请稍后重试")
+    try:
+        resp = http_client.request(
+            "POST",
+            _openrouter_api_url(),
+            content=raw_payload,
+            headers=_build_openrouter_headers(api_key),
+            timeout=_OPENROUTER_TIMEOUT,
+        )
+    except httpx.TransportError as exc:
+        raise HTTPException(status_code=502, detail=f"OpenRouter 网络错误: {exc}")
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"OpenRouter 调用异常: {exc}")
+    raw = resp.text
+    if resp.status_code >= 400:
+        raise HTTPException(status_code=502, detail=f"OpenRouter 调用失败: {resp.status_code} {_tail_text(raw, 500)}")
 
     try:
         response_json = json.loads(raw)
@@ -193,6 +250,85 @@ def _call_gemini_bsr_ai_insight(
     return _call_openrouter_bsr_ai_insight(asin, site, range_days, rows, summary)
 
 
+def build_bsr_ai_fingerprint(asin: str, site: str, range_days: int, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Cache key of a report: the daily window's latest date, row count and content, plus model and prompt version."""
+    content = json.dumps(rows, sort_keys=True, default=str, ensure_ascii=False)
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    latest_date = rows[-1].get("date") if rows else None
+    model = _resolve_openrouter_model()
+    prompt_version = KEEPA_REPORT_PROMPT_VERSIONS[resolve_keepa_prompt_version()]
+    key = json.dumps(
+        [asin, site, range_days, str(latest_date or ""), len(rows), content_hash, model, prompt_version],
+        ensure_ascii=False,
+    )
+    return {
+        "fingerprint": hashlib.sha256(key.encode("utf-8")).hexdigest(),
+        "latest_date": latest_date,
+        "row_count": len(rows),
+        "content_hash": content_hash,
+        "model": model,
+        "prompt_version": prompt_version,
+    }
+
+
+def find_cached_bsr_ai_report(fingerprint: Dict[str, Any]) -> Optional[str]:
+    if not env_bool("AI_REPORT_CACHE_ENABLED", True):
+        return None
+    try:
+        row = ai_insight_repo.fetch_cached_report(fingerprint["fingerprint"])
+    except Exception:
+        # A cache outage must not block reports; fall through to the model call.
+        logger.exception("ai_report_cache_lookup_failed")
+        return None
+    report_text = str((row or {}).get("report_text") or "")
+    return report_text or None
+
+
+def _store_bsr_ai_report(
+    fingerprint: Dict[str, Any],
+    asin: str,
+    site: str,
+    range_days: int,
+    summary: Dict[str, Any],
+    report_text: str,
+) -> None:
+    if not env_bool("AI_REPORT_CACHE_ENABLED", True):
+        return
+    try:
+        ai_insight_repo.store_cached_report(
+            fingerprint["fingerprint"],
+            site,
+            asin,
+            range_days,
+            fingerprint["latest_date"],
+            fingerprint["row_count"],
+            fingerprint["content_hash"],
+            fingerprint["model"],
+            fingerprint["prompt_version"],
+            summary,
+            report_text,
+        )
+    except Exception:
+        logger.exception("ai_report_cache_store_failed asin=%s site=%s", asin, site)
+
+
+def generate_bsr_ai_report(
+    asin: str,
+    site: str,
+    range_days: int,
+    rows: List[Dict[str, Any]],
+    summary: Dict[str, Any],
+) -> Tuple[str, bool]:
+    """Returns (report, cached); the model is only called when no report exists for identical input."""
+    fingerprint = build_bsr_ai_fingerprint(asin, site, range_days, rows)
+    cached = find_cached_bsr_ai_report(fingerprint)
+    if cached is not None:
+        return cached, True
+    report = _call_openrouter_bsr_ai_insight(asin, site, range_days, rows, summary)
+    _store_bsr_ai_report(fingerprint, asin, site, range_days, summary, report)
+    return report, False
+
+
 def get_bsr_ai_insight(asin: str, site: str, range_days: int) -> Dict[str, Any]:
     target_asin = str(asin or "").strip().upper()
     if not target_asin:
@@ -203,11 +339,233 @@ def get_bsr_ai_insight(asin: str, site: str, range_days: int) -> Dict[str, Any]:
     if not rows:
         raise HTTPException(status_code=404, detail="该 ASIN 在 fact_bi_amazon_product_day 暂无可分析数据")
     summary = _build_bsr_ai_summary(rows)
-    report = _call_openrouter_bsr_ai_insight(target_asin, normalized_site, safe_range_days, rows, summary)
+    report, cached = generate_bsr_ai_report(target_asin, normalized_site, safe_range_days, rows, summary)
     return {
         "asin": target_asin,
         "site": normalized_site,
         "range_days": safe_range_days,
         "summary": summary,
         "report": report,
+        "cached": cached,
     }
+
+
+def _parse_openrouter_delta(chunk: Dict[str, Any]) -> str:
+    choices = chunk.get("choices")
+    if not isinstance(choices, list):
+        return ""
+    fragments: List[str] = []
+    for choice in choices:
+        delta = choice.get("delta") if isinstance(choice, dict) else None
+        content = delta.get("content") if isinstance(delta, dict) else None
+        if isinstance(content, str):
+            fragments.append(content)
+    return "".join(fragments)
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _stream_openrouter_bsr_ai_insight(
+    api_key: str,
+    payload: Dict[str, Any],
+) -> AsyncIterator[Optional[str]]:
+    """Yields text deltas; None marks an upstream keep-alive comment."""
+    async with http_client.astream(
+        "POST",
+        _openrouter_api_url(),
+        content=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+        headers=_build_openrouter_headers(api_key),
+        timeout=_OPENROUTER_TIMEOUT,
+    ) as resp:
+        if resp.status_code != 200:
+            body = (await resp.aread()).decode("utf-8", errors="ignore")
+            raise HTTPException(status_code=502, detail=f"OpenRouter 调用失败: {resp.status_code} {_tail_text(body, 500)}")
+        async for line in resp.aiter_lines():
+            if line.startswith(":"):
+                yield None
+                continue
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                return
+            try:
+                chunk = json.loads(data)
+            except json.JSONDecodeError:
+                continue
+            error = chunk.get("error")
+            if isinstance(error, dict):
+                raise HTTPException(status_code=502, detail=f"OpenRouter 调用失败: {error.get('message') or error}")
+            text = _parse_openrouter_delta(chunk)
+            if text:
+                yield text
+
+
+def _fail_streamed_job(job_id: str) -> None:
+    ai_insight_repo.mark_job_failed(job_id)
+    ai_insight_repo.complete_follower_jobs(job_id, "failed")
+    ai_job_events.publish_job_status(job_id, "failed")
+
+
+def _abandon_streamed_job(job_id: str) -> None:
+    # Imported here: ai_insight_service builds on this module.
+    from .ai_insight_service import hand_off_abandoned_job
+
+    hand_off_abandoned_job(job_id)
+
+
+def _finish_streamed_job(
+    job_id: str,
+    report_text: str,
+    fingerprint: Optional[Dict[str, Any]],
+    asin: str,
+    site: str,
+    range_days: int,
+    summary: Dict[str, Any],
+) -> None:
+    if not report_text:
+        _fail_streamed_job(job_id)
+        return
+    ai_insight_repo.mark_job_success(job_id, report_text)
+    # Jobs submitted for the same input while this stream ran were deduplicated onto it.
+    ai_insight_repo.complete_follower_jobs(job_id, "success", report_text)
+    ai_job_events.publish_job_status(job_id, "success")
+    if fingerprint is not None:
+        _store_bsr_ai_report(fingerprint, asin, site, range_days, summary, report_text)
+
+
+async def _relay_bsr_ai_stream(
+    job_id: str,
+    asin: str,
+    site: str,
+    range_days: int,
+    summary: Dict[str, Any],
+    fingerprint: Dict[str, Any],
+    api_key: str,
+    payload: Dict[str, Any],
+) -> AsyncIterator[str]:
+    fragments: List[str] = []
+    finished = False
+    try:
+        async for text in _stream_openrouter_bsr_ai_insight(api_key, payload):
+            if text is None:
+                yield ": keep-alive\n\n"
+                continue
+            fragments.append(text)
+            yield _sse_event("delta", {"text": text})
+        report_text = "".join(fragments).strip()
+        await run_in_threadpool(_finish_streamed_job, job_id, report_text, fingerprint, asin, site, range_days, summary)
+        finished = True
+        if not report_text:
+            yield _sse_event("error", {"job_id": job_id, "message": "OpenRouter 未返回可用文本"})
+            return
+        yield _sse_event("done", {"job_id": job_id, "cached": False, "length": len(report_text)})
+    except HTTPException as exc:
+        await run_in_threadpool(_fail_streamed_job, job_id)
+        finished = True
+        yield _sse_event("error", {"job_id": job_id, "message": str(exc.detail)})
+    except httpx.HTTPError as exc:
+        await run_in_threadpool(_fail_streamed_job, job_id)
+        finished = True
+        yield _sse_event("error", {"job_id": job_id, "message": f"OpenRouter 网络错误: {exc}"})
+    finally:
+        if not finished:
+            # Client went away (the task is being cancelled): record the job off the event loop without awaiting.
+            logger.info("bsr_ai_stream_aborted job_id=%s chars=%s", job_id, sum(len(item) for item in fragments))
+            # Closing a tab is not a model failure: teammates' jobs deduplicated onto this one are handed off.
+            asyncio.get_running_loop().run_in_executor(None, _abandon_streamed_job, job_id)
+
+
+async def _replay_cached_bsr_ai_report(job_id: str, report_text: str) -> AsyncIterator[str]:
+    yield _sse_event("delta", {"text": report_text})
+    yield _sse_event("done", {"job_id": job_id, "cached": True, "length": len(report_text)})
+
+
+async def open_bsr_ai_insight_stream(
+    asin: str,
+    site: str,
+    range_days: int,
+    operator_userid: str,
+) -> AsyncIterator[str]:
+    """Validates the request before any byte is sent, so input errors stay plain HTTP errors; a cache miss
+    records its running job only when the stream is first read, so a response that is never sent leaves no row."""
+    target_asin = str(asin or "").strip().upper()
+    if not target_asin:
+        raise HTTPException(status_code=400, detail="asin 不能为空")
+    normalized_site = normalize_site(site)
+    safe_range_days = range_days if range_days in {7, 30, 90, 180} else 90
+    rows = await run_in_threadpool(bsr_repo.fetch_bsr_daily_window, target_asin, normalized_site, safe_range_days)
+    if not rows:
+        raise HTTPException(status_code=404, detail="该 ASIN 在 fact_bi_amazon_product_day 暂无可分析数据")
+    summary = _build_bsr_ai_summary(rows)
+    fingerprint = build_bsr_ai_fingerprint(target_asin, normalized_site, safe_range_days, rows)
+    cached = await run_in_threadpool(find_cached_bsr_ai_report, fingerprint)
+    job_id = uuid.uuid4().hex
+    meta = {
+        "job_id": job_id,
+        "asin": target_asin,
+        "site": normalized_site,
+        "range_days": safe_range_days,
+        "summary": summary,
+        "cached": cached is not None,
+    }
+    if cached is not None:
+        await run_in_threadpool(
+            ai_insight_repo.insert_job,
+            job_id,
+            target_asin,
+            normalized_site,
+            operator_userid,
+            status="success",
+            report_text=cached,
+            range_days=safe_range_days,
+        )
+        body = _replay_cached_bsr_ai_report(job_id, cached)
+    else:
+        api_key = _resolve_openrouter_api_key()
+        try:
+            await openrouter_rate_limiter.aacquire(timeout=_STREAM_RATE_LIMIT_WAIT_SECONDS)
+        except RateLimitTimeout:
+            raise HTTPException(status_code=429, detail="OpenRouter 调用频率已达上限，请稍后重试")
+        # The prompt is built here, off the event loop, since the feature extraction is CPU work.
+        payload = await run_in_threadpool(
+            _build_openrouter_payload, target_asin, normalized_site, safe_range_days, rows, summary, True
+        )
+        body = _relay_bsr_ai_stream(
+            job_id, target_asin, normalized_site, safe_range_days, summary, fingerprint, api_key, payload
+        )
+
+    async def _events() -> AsyncIterator[str]:
+        if cached is not None:
+            yield _sse_event("meta", meta)
+            async for event in body:
+                yield event
+            return
+        # The running row is only inserted once the response is being read, and from then on
+        # something always finishes it: this finally until the relay starts, the relay's own after.
+        await run_in_threadpool(
+            ai_insight_repo.insert_job,
+            job_id,
+            target_asin,
+            normalized_site,
+            operator_userid,
+            status="running",
+            range_days=safe_range_days,
+        )
+        relaying = False
+        try:
+            yield _sse_event("meta", meta)
+            relaying = True
+            async for event in body:
+                yield event
+        finally:
+            if relaying:
+                # Runs the relay's own cleanup now rather than whenever the generator is collected.
+                await body.aclose()
+            else:
+                logger.info("bsr_ai_stream_aborted_before_relay job_id=%s", job_id)
+                asyncio.get_running_loop().run_in_executor(None, _abandon_streamed_job, job_id)
+
+    return _events()
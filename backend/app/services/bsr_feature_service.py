@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from ..core.config import normalize_site
+from ..repositories import bsr_repo
+
+# Numeric columns of fetch_bsr_daily_window; NULL becomes NaN so "no data" never reads as 0.
+DAILY_NUMERIC_COLUMNS = (
+    "buybox_price",
+    "price",
+    "prime_price",
+    "coupon_price",
+    "coupon_discount",
+    "child_sales",
+    "sales_volume",
+    "fba_price",
+    "fbm_price",
+    "strikethrough_price",
+    "bsr_rank",
+    "bsr_reciprocating_saw_blades",
+    "rating",
+    "rating_count",
+    "seller_count",
+)
+_LISTING_PRICE_COLUMNS = ["price", "buybox_price", "fba_price", "fbm_price"]
+# Rule 4 of the report prompt: increment >= max(20, P95 of the last 30 daily increments x 2).
+RATING_JUMP_FLOOR = 20.0
+RATING_JUMP_WINDOW = 30
+RATING_JUMP_FACTOR = 2.0
+PRICE_EVENT_MIN_PCT = 5.0
+RANK_LAG_DAYS = 7
+MAX_PRICE_EVENTS = 20
+
+
+def build_daily_frame(rows: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(list(rows), columns=["date", *DAILY_NUMERIC_COLUMNS])
+    frame["date"] = pd.to_datetime(frame["date"], errors="coerce")
+    frame = frame[frame["date"].notna()].sort_values("date", kind="stable").reset_index(drop=True)
+    for column in DAILY_NUMERIC_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("float64")
+    return frame
+
+
+def _number(value: Any, digits: int = 2) -> Optional[float]:
+    if value is None or pd.isna(value):
+        return None
+    number = round(float(value), digits)
+    return int(number) if number.is_integer() else number
+
+
+def _iso(value: Any) -> Optional[str]:
+    return None if value is None or pd.isna(value) else pd.Timestamp(value).date().isoformat()
+
+
+def _runs(mask: np.ndarray) -> List[tuple[int, int]]:
+    """(start, end) positions of every run of True in mask."""
+    if not mask.any():
+        return []
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _first_date(dates: pd.Series, mask: pd.Series) -> Optional[str]:
+    positions = np.flatnonzero(mask.to_numpy())
+    return _iso(dates.iloc[positions[0]]) if positions.size else None
+
+
+def _stockout_runs(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    ranks = frame["bsr_rank"].to_numpy()
+    dates = frame["date"]
+    runs = []
+    for start, end in _runs(frame["fba_price"].isna().to_numpy()):
+        runs.append(
+            {
+                "start": _iso(dates.iloc[start]),
+                "end": _iso(dates.iloc[end]),
+                "days": int(end - start + 1),
+                "bsr_before": _number(ranks[start - 1]) if start > 0 else None,
+                "bsr_after": _number(ranks[end + 1]) if end + 1 < len(ranks) else None,
+            }
+        )
+    return runs
+
+
+def _rating_jumps(frame: pd.DataFrame) -> Dict[str, Any]:
+    counts = frame["rating_count"].dropna()
+    increments = counts.diff().dropna()
+    recent = increments.tail(RATING_JUMP_WINDOW).to_numpy()
+    p95 = float(np.percentile(recent, 95)) if recent.size else 0.0
+    threshold = max(RATING_JUMP_FLOOR, p95 * RATING_JUMP_FACTOR)
+    jumps = increments[increments >= threshold]
+    return {
+        "threshold": _number(threshold, 1),
+        "recent_p95": _number(p95, 1),
+        "events": [
+            {"date": _iso(frame.at[index, "date"]), "increment": _number(value)}
+            for index, value in jumps.items()
+        ],
+    }
+
+
+def _price_events(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    priced = frame["price"].dropna()
+    previous = priced.shift(1)
+    change_pct = (priced - previous) / previous.where(previous != 0) * 100
+    changed = change_pct[change_pct.abs() >= PRICE_EVENT_MIN_PCT]
+    if changed.empty:
+        return []
+    # Keep the largest moves, then list them chronologically.
+    changed = changed.reindex(changed.abs().sort_values(ascending=False).index[:MAX_PRICE_EVENTS]).sort_index()
+    ranks = frame["bsr_rank"].to_numpy()
+    previous_index = pd.Series(priced.index, index=priced.index).shift(1)
+    events = []
+    for index, pct in changed.items():
+        before_index = int(previous_index[index])
+        lag_index = min(index + RANK_LAG_DAYS, len(ranks) - 1)
+        events.append(
+            {
+                "date": _iso(frame.at[index, "date"]),
+                "from": _number(priced[before_index]),
+                "to": _number(priced[index]),
+                "change_pct": _number(pct, 1),
+                "bsr_before": _number(ranks[before_index]),
+                f"bsr_after_{RANK_LAG_DAYS}d": _number(ranks[lag_index]),
+            }
+        )
+    return events
+
+
+def _seller_risk(frame: pd.DataFrame) -> Dict[str, Any]:
+    sellers = frame["seller_count"]
+    hijacked = (sellers > 1).to_numpy()
+    runs = _runs(hijacked)
+    longest = max((end - start + 1 for start, end in runs), default=0)
+    return {
+        "max_seller_count": _number(sellers.max()),
+        "hijack_days": int(hijacked.sum()),
+        "hijack_runs": len(runs),
+        "longest_hijack_days": int(longest),
+        "latest_seller_count": _number(sellers.dropna().iloc[-1]) if sellers.notna().any() else None,
+        "risk": bool(hijacked.any()),
+    }
+
+
+def _rank_summary(frame: pd.DataFrame) -> Dict[str, Any]:
+    ranks = frame["bsr_rank"].dropna()
+    if ranks.empty:
+        return {"best": None, "worst": None, "first": None, "latest": None, "best_date": None}
+    return {
+        "best": _number(ranks.min()),
+        "worst": _number(ranks.max()),
+        "first": _number(ranks.iloc[0]),
+        "latest": _number(ranks.iloc[-1]),
+        "best_date": _iso(frame.at[ranks.idxmin(), "date"]),
+    }
+
+
+def extract_bsr_features(rows: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Deterministic answers to the rule-defined questions of the Keepa report prompt."""
+    frame = build_daily_frame(rows)
+    if frame.empty:
+        return {"days": 0}
+    dates = frame["date"]
+    stockouts = _stockout_runs(frame)
+    prices = frame["price"].dropna()
+    coupon_days = int((frame["coupon_price"] > 0).sum())
+    return {
+        "days": int(len(frame)),
+        "date_start": _iso(dates.iloc[0]),
+        "date_end": _iso(dates.iloc[-1]),
+        "first_listed_date": _first_date(dates, frame[_LISTING_PRICE_COLUMNS].notna().any(axis=1)),
+        "first_bsr_date": _first_date(dates, frame["bsr_rank"] > 0),
+        "first_review_date": _first_date(dates, frame["rating_count"] > 0),
+        "stockout_runs": stockouts,
+        "stockout_days": int(sum(run["days"] for run in stockouts)),
+        "rating_jumps": _rating_jumps(frame),
+        "price_change_events": _price_events(frame),
+        "price": {
+            "min": _number(prices.min()) if not prices.empty else None,
+            "max": _number(prices.max()) if not prices.empty else None,
+            "latest": _number(prices.iloc[-1]) if not prices.empty else None,
+            "coupon_days": coupon_days,
+        },
+        "bsr_rank": _rank_summary(frame),
+        "seller": _seller_risk(frame),
+    }
+
+
+def get_bsr_features(asin: str, site: str, range_days: int) -> Dict[str, Any]:
+    target_asin = str(asin or "").strip().upper()
+    if not target_asin:
+        raise HTTPException(status_code=400, detail="asin 不能为空")
+    normalized_site = normalize_site(site)
+    safe_range_days = range_days if range_days in {7, 30, 90, 180} else 90
+    rows = bsr_repo.fetch_bsr_daily_window(target_asin, normalized_site, safe_range_days)
+    if not rows:
+        raise HTTPException(status_code=404, detail="该 ASIN 在 fact_bi_amazon_product_day 暂无可分析数据")
+    return {
+        "asin": target_asin,
+        "site": normalized_site,
+        "range_days": safe_range_days,
+        "features": extract_bsr_features(rows),
+    }
+
+
+__all__ = ["DAILY_NUMERIC_COLUMNS", "build_daily_frame", "extract_bsr_features", "get_bsr_features"]
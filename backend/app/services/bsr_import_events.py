@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from ..core.logging import logger
+from ..core.redis_client import get_redis
+
+_CHANNEL = "bi_amazon:bsr_import:finished"
+_RECONNECT_SECONDS = 30.0
+
+_listener_lock = threading.Lock()
+_listener_thread: Optional[threading.Thread] = None
+_listener_stop = threading.Event()
+
+
+def publish_import_finished(job_id: str, site: str, rows_imported: int) -> bool:
+    """Tells every API process that a site's batch changed; each one drops and re-warms its own caches."""
+    message = json.dumps({"job_id": job_id, "site": site, "rows_imported": rows_imported})
+    try:
+        get_redis().publish(_CHANNEL, message)
+        return True
+    except Exception as exc:
+        # API processes still refresh when the job is next polled.
+        logger.warning("bsr_import_event_publish_failed job_id=%s err=%s", job_id, exc)
+        return False
+
+
+def _dispatch(handler: Callable[[Dict[str, Any]], None], message: Optional[Dict[str, Any]]) -> None:
+    if not message or message.get("type") != "message":
+        return
+    try:
+        event = json.loads(message.get("data") or "{}")
+        if isinstance(event, dict):
+            handler(event)
+    except Exception:
+        logger.exception("bsr_import_event_handler_failed")
+
+
+def _listen(
+    handler: Callable[[Dict[str, Any]], None],
+    on_idle: Callable[[], None],
+    idle_seconds: float,
+) -> None:
+    next_idle = time.monotonic() + idle_seconds
+    redis_ok = True
+
+    def run_idle() -> None:
+        nonlocal next_idle
+        if time.monotonic() < next_idle:
+            return
+        next_idle = time.monotonic() + idle_seconds
+        try:
+            on_idle()
+        except Exception:
+            logger.exception("bsr_import_event_idle_failed")
+
+    while not _listener_stop.is_set():
+        pubsub = None
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_CHANNEL)
+            redis_ok = True
+            while not _listener_stop.is_set():
+                _dispatch(handler, pubsub.get_message(timeout=1.0))
+                run_idle()
+        except Exception as exc:
+            if redis_ok:
+                logger.warning("bsr_import_event_listener_unavailable err=%s (retrying every %ss)", exc, _RECONNECT_SECONDS)
+            redis_ok = False
+            # Keep the idle work (the stale-job reaper) running while Redis is away.
+            deadline = time.monotonic() + _RECONNECT_SECONDS
+            while not _listener_stop.wait(1.0) and time.monotonic() < deadline:
+                run_idle()
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def start_import_listener(
+    handler: Callable[[Dict[str, Any]], None],
+    on_idle: Callable[[], None],
+    idle_seconds: float,
+) -> None:
+    """One daemon thread per process; on_idle runs every idle_seconds whether or not Redis is reachable."""
+    global _listener_thread
+    with _listener_lock:
+        if _listener_thread is not None and _listener_thread.is_alive():
+            return
+        _listener_stop.clear()
+        _listener_thread = threading.Thread(
+            target=_listen,
+            args=(handler, on_idle, idle_seconds),
+            name="bsr-import-events",
+            daemon=True,
+        )
+        _listener_thread.start()
+
+
+def stop_import_listener() -> None:
+    global _listener_thread
+    with _listener_lock:
+        thread, _listener_thread = _listener_thread, None
+        _listener_stop.set()
+    if thread is not None:
+        thread.join(timeout=5)
+
+
+__all__ = ["publish_import_finished", "start_import_listener", "stop_import_listener"]
@@ -1,28 +1,119 @@
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
 import shutil
-import tempfile
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
+from celery import chain
 from fastapi import HTTPException, UploadFile
 
-from ..core.config import normalize_site
+from ..core.celery_app import celery_app
+from ..core.config import env_int, normalize_site
+from ..core.logging import logger
 from ..db import get_connection
-from ..imports.bsr_importer import import_bsr_data
-from ..imports.bsr_monthly_importer import import_bsr_monthly
-from ..repositories import bsr_repo
+from ..imports.bsr_importer import (
+    BsrBundle,
+    build_bsr_rows,
+    clear_staged_bsr_rows,
+    read_bsr_bundle,
+    stage_bsr_rows,
+    swap_staged_bsr_rows,
+    validate_bsr_bundle,
+    validate_bsr_rows,
+)
+from ..imports.bsr_monthly_importer import (
+    build_monthly_rows,
+    read_monthly_workbook,
+    validate_monthly_sheets,
+    write_monthly_rows,
+)
+from ..imports.timing import StageTimer
+from ..repositories import bsr_batch_repo, bsr_import_job_repo
+from . import bsr_import_events
+from .bsr_query_service import invalidate_bsr_site_cache, warm_bsr_site_cache
+
+_BSR_IMPORT_TASK_NAME = "bi_amazon.bsr_import.run"
+_BSR_POST_IMPORT_TASK_NAME = "bi_amazon.bsr_import.post_process"
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
+_XLSX_MAGIC = b"PK\x03\x04"
+_XLS_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+# Files that are imported together; a group is skipped only when every file in it is unchanged.
+_FILE_GROUPS = {
+    "bundle": ("seller_file", "jimu_file", "jimu_file_51_100"),
+    "detail": ("seller_file_detail",),
+}
+# Jobs whose caches this process already refreshed; only recent ones can still be polled or re-announced.
+_INVALIDATED_JOB_IDS: OrderedDict[str, None] = OrderedDict()
+_INVALIDATED_JOB_IDS_LOCK = threading.Lock()
+_INVALIDATED_JOB_IDS_MAX = 512
+
+
+def _upload_limits() -> tuple[int, int]:
+    per_file = max(1, env_int("BSR_IMPORT_MAX_FILE_MB", 50)) * 1024 * 1024
+    total = max(1, env_int("BSR_IMPORT_MAX_TOTAL_MB", 150)) * 1024 * 1024
+    return per_file, total
+
+
+def _import_upload_root() -> Path:
+    # Must be shared between the API and the worker (docker-compose mounts ./files in both).
+    raw = str(os.getenv("BSR_IMPORT_UPLOAD_ROOT", "") or "").strip()
+    if raw:
+        return Path(raw)
+    return Path(__file__).resolve().parents[2] / "files" / "imports"
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
 
 
-def import_bsr_files(
+def _load_json(value: Any) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        return value
+    if not value:
+        return {}
+    try:
+        loaded = json.loads(value)
+    except (TypeError, ValueError):
+        return {}
+    return loaded if isinstance(loaded, dict) else {}
+
+
+def _serialize_datetime(value: Any) -> Optional[str]:
+    return value.isoformat() if hasattr(value, "isoformat") else None
+
+
+def _to_job_item(row: Dict[str, Any]) -> Dict[str, Any]:
+    hashed_files = _load_json(row.get("file_hashes")).get("files") or {}
+    return {
+        "job_id": row.get("job_id"),
+        "site": row.get("site"),
+        "status": row.get("status"),
+        "operator_userid": row.get("operator_userid"),
+        "rows": int(row.get("rows_imported") or 0),
+        "monthly_rows": int(row.get("monthly_rows_imported") or 0),
+        "stage_timings": _load_json(row.get("stage_timings")),
+        "skipped_files": sorted(role for role, info in hashed_files.items() if (info or {}).get("skipped")),
+        "error_message": row.get("error_message") or "",
+        "created_at": _serialize_datetime(row.get("created_at")),
+        "started_at": _serialize_datetime(row.get("started_at")),
+        "finished_at": _serialize_datetime(row.get("finished_at")),
+    }
+
+
+def _validate_import_uploads(
     seller_file: Optional[UploadFile],
     seller_file_detail: Optional[UploadFile],
     jimu_file: Optional[UploadFile],
     jimu_file_51_100: Optional[UploadFile],
-    site: str,
-) -> Dict[str, Any]:
-    normalized_site = normalize_site(site)
+) -> None:
     has_detail = seller_file_detail is not None
     has_bundle = any([seller_file, jimu_file, jimu_file_51_100])
     if not has_detail and not has_bundle:
@@ -33,9 +124,98 @@ def import_bsr_files(
             detail="卖家精灵明细 + 极木与西柚#1-50 + 极木与西柚#51-100 必须一起上传",
         )
 
-    tmp_dir = Path(tempfile.mkdtemp(prefix="bsr-import-"))
+    for key, upload in (
+        ("seller_file", seller_file),
+        ("seller_file_detail", seller_file_detail),
+        ("jimu_file", jimu_file),
+        ("jimu_file_51_100", jimu_file_51_100),
+    ):
+        if upload is None:
+            continue
+        suffix = Path(upload.filename or "").suffix.lower()
+        if not suffix:
+            raise HTTPException(status_code=400, detail="文件缺少扩展名")
+        if key == "seller_file" and suffix not in {".xls", ".xlsx"}:
+            raise HTTPException(status_code=400, detail="卖家精灵文件需为 Excel（.xls/.xlsx）")
+        if key == "seller_file_detail" and suffix not in {".xls", ".xlsx"}:
+            raise HTTPException(status_code=400, detail="卖家精灵明细需为 Excel（.xls/.xlsx）")
+        if key in {"jimu_file", "jimu_file_51_100"} and suffix != ".csv":
+            raise HTTPException(status_code=400, detail="极木与西柚文件需为 CSV（.csv）")
+
+
+def _check_magic(key: str, suffix: str, head: bytes) -> None:
+    if suffix == ".xlsx":
+        valid = head.startswith(_XLSX_MAGIC)
+    elif suffix == ".xls":
+        # Some tools save xlsx content under .xls; pandas reads either.
+        valid = head.startswith(_XLS_MAGIC) or head.startswith(_XLSX_MAGIC)
+    else:
+        valid = not head.startswith((_XLSX_MAGIC, _XLS_MAGIC)) and b"\x00" not in head
+    if not valid:
+        raise HTTPException(status_code=400, detail=f"文件内容与扩展名不符（{key}{suffix}）")
+
+
+def _save_upload(key: str, upload: UploadFile, target: Path, remaining_total: int) -> Dict[str, Any]:
+    """Stream one upload to disk, hashing as it goes; reject it as soon as a limit or the type check fails."""
+    per_file_limit, total_limit = _upload_limits()
+    limit = min(per_file_limit, remaining_total)
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"上传文件过大（{key}），单个文件上限 {per_file_limit // (1024 * 1024)}MB，"
+        f"总计上限 {total_limit // (1024 * 1024)}MB",
+    )
+    if upload.size is not None and upload.size > limit:
+        raise too_large
+    digest = hashlib.sha256()
+    size = 0
+    with target.open("wb") as handle:
+        while True:
+            chunk = upload.file.read(_UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            if size == 0:
+                _check_magic(key, target.suffix, chunk[:512])
+            size += len(chunk)
+            if size > limit:
+                raise too_large
+            digest.update(chunk)
+            handle.write(chunk)
+    if size == 0:
+        raise HTTPException(status_code=400, detail="上传文件为空")
+    return {"sha256": digest.hexdigest(), "size": size}
+
+
+def _mark_unchanged_groups(site: str, batch_date: date, hashed_files: Dict[str, Dict[str, Any]]) -> None:
+    recorded = bsr_import_job_repo.fetch_import_file_hashes(site, batch_date)
+    for roles in _FILE_GROUPS.values():
+        present = [role for role in roles if role in hashed_files]
+        if not present:
+            continue
+        if all(recorded.get(role) == hashed_files[role]["sha256"] for role in present):
+            for role in present:
+                hashed_files[role]["skipped"] = True
+
+
+def submit_bsr_import(
+    seller_file: Optional[UploadFile],
+    seller_file_detail: Optional[UploadFile],
+    jimu_file: Optional[UploadFile],
+    jimu_file_51_100: Optional[UploadFile],
+    site: str,
+    operator_userid: str,
+    force: bool = False,
+) -> Dict[str, Any]:
+    normalized_site = normalize_site(site)
+    _validate_import_uploads(seller_file, seller_file_detail, jimu_file, jimu_file_51_100)
+
+    job_id = uuid.uuid4().hex
+    job_dir = _import_upload_root() / job_id
+    job_dir.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    saved: Dict[str, str] = {}
+    hashed_files: Dict[str, Dict[str, Any]] = {}
+    remaining_total = _upload_limits()[1]
     try:
-        saved: Dict[str, Path] = {}
         for key, upload in (
             ("seller_file", seller_file),
             ("seller_file_detail", seller_file_detail),
@@ -44,86 +224,247 @@ def import_bsr_files(
         ):
             if upload is None:
                 continue
-            filename = upload.filename or ""
-            suffix = Path(filename).suffix.lower()
-            if not suffix:
-                raise HTTPException(status_code=400, detail="文件缺少扩展名")
-            target = tmp_dir / f"{uuid.uuid4().hex}{suffix}"
-            content = upload.file.read()
-            if not content:
-                raise HTTPException(status_code=400, detail="上传文件为空")
-            target.write_bytes(content)
-            saved[key] = target
-
-        seller_excel_path = saved.get("seller_file")
-        seller_detail_path = saved.get("seller_file_detail")
-        jimu_csv_path = saved.get("jimu_file")
-        jimu_csv_next_path = saved.get("jimu_file_51_100")
-
-        if has_bundle:
-            if seller_excel_path is None or jimu_csv_path is None or jimu_csv_next_path is None:
-                raise HTTPException(status_code=400, detail="明细导入缺少文件")
-            if seller_excel_path.suffix.lower() not in {".xls", ".xlsx"}:
-                raise HTTPException(status_code=400, detail="卖家精灵文件需为 Excel（.xls/.xlsx）")
-            if jimu_csv_path.suffix.lower() != ".csv" or jimu_csv_next_path.suffix.lower() != ".csv":
-                raise HTTPException(status_code=400, detail="极木与西柚文件需为 CSV（.csv）")
-
-            from ..imports.bsr_importer import count_excel_rows, count_csv_rows
-
-            seller_count = count_excel_rows(seller_excel_path)
-            if seller_count != 100:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"卖家精灵明细第一张表数据量应为100条，实际为{seller_count}条",
-                )
-            jimu_count = count_csv_rows(jimu_csv_path)
-            if jimu_count != 50:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"极木与西柚数据#1-50数据量应为50条，实际为{jimu_count}条",
-                )
-            jimu_next_count = count_csv_rows(jimu_csv_next_path)
-            if jimu_next_count != 50:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"极木与西柚数据#51-100数据量应为50条，实际为{jimu_next_count}条",
-                )
-
-        if has_detail:
-            if seller_detail_path is None:
-                raise HTTPException(status_code=400, detail="卖家精灵明细（销量、销售额）缺少文件")
-            if seller_detail_path.suffix.lower() not in {".xls", ".xlsx"}:
-                raise HTTPException(status_code=400, detail="卖家精灵明细需为 Excel（.xls/.xlsx）")
-            from ..imports.bsr_importer import count_excel_rows
-
-            seller_detail_count = count_excel_rows(seller_detail_path)
-            if seller_detail_count != 100:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"卖家精灵明细（销量、销售额）第一张表数据量应为100条，实际为{seller_detail_count}条",
-                )
+            target = job_dir / f"{key}{Path(upload.filename or '').suffix.lower()}"
+            hashed_files[key] = _save_upload(key, upload, target, remaining_total)
+            remaining_total -= hashed_files[key]["size"]
+            saved[key] = str(target)
+    except Exception:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+    timings = {"upload": _elapsed_ms(started)}
+
+    batch_date = date.today()
+    if not force:
+        _mark_unchanged_groups(normalized_site, batch_date, hashed_files)
+    for role, info in hashed_files.items():
+        if info.get("skipped"):
+            Path(saved.pop(role)).unlink(missing_ok=True)
+    file_hashes = {"batch_date": batch_date.isoformat(), "files": hashed_files}
+
+    if not saved:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        bsr_import_job_repo.insert_job(
+            job_id, normalized_site, operator_userid, {}, timings, file_hashes, status="skipped"
+        )
+    else:
+        bsr_import_job_repo.insert_job(job_id, normalized_site, operator_userid, saved, timings, file_hashes)
+        try:
+            # The post-import task receives the import task's result and finishes the job.
+            chain(
+                celery_app.signature(_BSR_IMPORT_TASK_NAME, args=[job_id]),
+                celery_app.signature(_BSR_POST_IMPORT_TASK_NAME),
+            ).apply_async()
+        except Exception as exc:
+            bsr_import_job_repo.mark_job_failed(job_id, f"任务入队失败: {exc}")
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise HTTPException(status_code=502, detail=f"任务入队失败: {exc}") from exc
+
+    row = bsr_import_job_repo.fetch_job(job_id)
+    if not row:
+        raise HTTPException(status_code=500, detail="任务创建失败")
+    return _to_job_item(row)
+
+
+def _record_imported_hashes(job_id: str, site: str, row: Dict[str, Any]) -> None:
+    file_hashes = _load_json(row.get("file_hashes"))
+    imported = {role: info for role, info in (file_hashes.get("files") or {}).items() if not (info or {}).get("skipped")}
+    batch_date = file_hashes.get("batch_date")
+    if not imported or not batch_date:
+        return
+    try:
+        bsr_import_job_repo.record_import_file_hashes(site, date.fromisoformat(batch_date), job_id, imported)
+    except Exception:
+        # Losing the hash only means the next identical upload is imported again.
+        logger.exception("bsr_import_hash_record_failed job_id=%s", job_id)
+
+
+def _has_bundle(files: Dict[str, str]) -> bool:
+    return bool(files.get("seller_file") and files.get("jimu_file") and files.get("jimu_file_51_100"))
+
+
+def run_bsr_import_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Import the job's files; returns the payload for the post-import task, or None when the job failed."""
+    row = bsr_import_job_repo.fetch_job(job_id)
+    if not row:
+        logger.warning("bsr_import_job_missing job_id=%s", job_id)
+        return None
+    site = normalize_site(row.get("site"))
+    files = {key: str(value) for key, value in _load_json(row.get("files")).items() if value}
+    timings: Dict[str, float] = dict(_load_json(row.get("stage_timings")))
+    timer = StageTimer(timings)
+    try:
+        # Every file is parsed exactly once; the same frames are validated, transformed and written.
+        bsr_import_job_repo.mark_job_stage(job_id, "parsing", timings)
+        bundle: Optional[BsrBundle] = None
+        monthly_sheets = None
+        with timer.stage("read"):
+            if _has_bundle(files):
+                bundle = read_bsr_bundle(files["seller_file"], [files["jimu_file"], files["jimu_file_51_100"]])
+            if files.get("seller_file_detail"):
+                monthly_sheets = read_monthly_workbook(files["seller_file_detail"])
+
+        errors: List[str] = []
+        with timer.stage("validate"):
+            if bundle is not None:
+                errors.extend(validate_bsr_bundle(bundle))
+            if monthly_sheets is not None:
+                errors.extend(validate_monthly_sheets(monthly_sheets))
 
         insert_df = None
         monthly_df = None
-        with get_connection() as conn:
-            if has_bundle and seller_excel_path and jimu_csv_path and jimu_csv_next_path:
-                bsr_repo.delete_bsr_items_for_today(normalized_site)
-                insert_df = import_bsr_data(
-                    str(seller_excel_path),
-                    [str(jimu_csv_path), str(jimu_csv_next_path)],
-                    connection=conn,
-                    site=normalized_site,
-                )
-            if has_detail and seller_detail_path:
-                monthly_df = import_bsr_monthly(
-                    str(seller_detail_path),
-                    connection=conn,
-                    site=normalized_site,
-                )
+        if not errors:
+            with timer.stage("transform"):
+                if bundle is not None:
+                    insert_df = build_bsr_rows(bundle, site=site)
+                    errors.extend(validate_bsr_rows(insert_df))
+                if monthly_sheets is not None:
+                    try:
+                        monthly_df = build_monthly_rows(monthly_sheets, site)
+                    except ValueError as exc:
+                        errors.append(str(exc))
+        if errors:
+            raise HTTPException(status_code=400, detail="；".join(errors))
 
+        bsr_import_job_repo.mark_job_stage(job_id, "writing", timings)
+        with get_connection() as conn:
+            if insert_df is not None:
+                try:
+                    with timer.stage("stage"):
+                        stage_bsr_rows(insert_df, job_id, conn)
+                    # Readers keep seeing the previous batch until this short swap commits.
+                    with timer.stage("swap"):
+                        swap_staged_bsr_rows(conn, job_id, site, str(insert_df["createtime"].iloc[0]), len(insert_df))
+                finally:
+                    clear_staged_bsr_rows(conn, job_id)
+            if monthly_df is not None:
+                with timer.stage("write"):
+                    write_monthly_rows(monthly_df, conn)
+        bsr_import_job_repo.mark_job_written(
+            job_id,
+            len(insert_df) if insert_df is not None else 0,
+            len(monthly_df) if monthly_df is not None else 0,
+            timings,
+        )
+        _record_imported_hashes(job_id, site, row)
         return {
-            "rows": len(insert_df) if insert_df is not None else 0,
-            "monthly_rows": len(monthly_df) if monthly_df is not None else 0,
+            "job_id": job_id,
+            "batch_date": str(insert_df["createtime"].iloc[0]) if insert_df is not None else None,
         }
+    except HTTPException as exc:
+        bsr_import_job_repo.mark_job_failed(job_id, str(exc.detail), timings)
+    except Exception as exc:
+        logger.exception("bsr_import_job_failed job_id=%s", job_id)
+        bsr_import_job_repo.mark_job_failed(job_id, f"导入失败: {exc}", timings)
     finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.rmtree(_import_upload_root() / job_id, ignore_errors=True)
+    return None
+
+
+def _finish_post_import(
+    job_id: str,
+    site: str,
+    row: Dict[str, Any],
+    timings: Dict[str, float],
+    error_message: Optional[str] = None,
+) -> None:
+    rows_imported = int(row.get("rows_imported") or 0)
+    finished = bsr_import_job_repo.mark_job_done(
+        job_id,
+        rows_imported,
+        int(row.get("monthly_rows_imported") or 0),
+        timings,
+        error_message,
+    )
+    if finished:
+        bsr_import_events.publish_import_finished(job_id, site, rows_imported)
+
+
+def run_bsr_post_import(result: Optional[Dict[str, Any]]) -> None:
+    """Refresh the batch registry for the imported batch, mark the job done and tell the API processes."""
+    if not result:
+        return
+    job_id = str(result.get("job_id") or "")
+    row = bsr_import_job_repo.fetch_job(job_id)
+    if not row or row.get("status") != "post_processing":
+        return
+    site = normalize_site(row.get("site"))
+    timings: Dict[str, float] = dict(_load_json(row.get("stage_timings")))
+    batch_date = result.get("batch_date")
+    error_message = None
+    if batch_date:
+        try:
+            with StageTimer(timings).stage("registry"):
+                bsr_batch_repo.refresh_batch_registry(site, date.fromisoformat(batch_date), job_id)
+        except Exception:
+            # The rows are already live; a stale registry only means the caches are not pre-warmed.
+            logger.exception("bsr_batch_registry_refresh_failed job_id=%s", job_id)
+            error_message = "导入已完成，批次索引刷新失败"
+    _finish_post_import(job_id, site, row, timings, error_message)
+
+
+def reap_stale_post_imports() -> int:
+    """Finishes jobs whose post-import task was lost or crashed; their rows are already live."""
+    stale_seconds = max(60, env_int("BSR_POST_IMPORT_STALE_SECONDS", 900))
+    reaped = 0
+    for row in bsr_import_job_repo.fetch_stale_post_processing_jobs(stale_seconds):
+        job_id = str(row.get("job_id") or "")
+        logger.warning("bsr_post_import_reaped job_id=%s", job_id)
+        _finish_post_import(
+            job_id,
+            normalize_site(row.get("site")),
+            row,
+            dict(_load_json(row.get("stage_timings"))),
+            "导入已完成，后处理任务未执行（已超时关闭）",
+        )
+        reaped += 1
+    return reaped
+
+
+def _refresh_site_caches(
+    job_id: str,
+    site: str,
+    rows_imported: int,
+    role: Optional[str] = None,
+    userid: Optional[str] = None,
+) -> None:
+    # Whichever comes first in this process, the import event or a poll that sees the job done.
+    with _INVALIDATED_JOB_IDS_LOCK:
+        if job_id in _INVALIDATED_JOB_IDS:
+            return
+        _INVALIDATED_JOB_IDS[job_id] = None
+        while len(_INVALIDATED_JOB_IDS) > _INVALIDATED_JOB_IDS_MAX:
+            _INVALIDATED_JOB_IDS.popitem(last=False)
+    invalidate_bsr_site_cache(site)
+    if rows_imported > 0:
+        warm_bsr_site_cache(site, role, userid)
+
+
+def _on_import_finished(event: Dict[str, Any]) -> None:
+    job_id = str(event.get("job_id") or "")
+    if job_id:
+        _refresh_site_caches(job_id, normalize_site(event.get("site")), int(event.get("rows_imported") or 0))
+
+
+def start_bsr_import_listener() -> None:
+    """API startup: refresh caches as soon as a worker finishes an import, and reap stuck jobs."""
+    bsr_import_events.start_import_listener(
+        _on_import_finished,
+        reap_stale_post_imports,
+        max(10, env_int("BSR_POST_IMPORT_REAP_INTERVAL_SECONDS", 300)),
+    )
+
+
+def stop_bsr_import_listener() -> None:
+    bsr_import_events.stop_import_listener()
+
+
+def get_bsr_import_job(job_id: str, role: str, userid: str) -> Dict[str, Any]:
+    row = bsr_import_job_repo.fetch_job(job_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    if role != "admin" and str(row.get("operator_userid") or "") != str(userid or ""):
+        raise HTTPException(status_code=403, detail="无权访问该任务")
+    if row.get("status") == "done":
+        # Normally the import event already did this; covers a lost event (Redis down, listener restarting).
+        _refresh_site_caches(job_id, normalize_site(row.get("site")), int(row.get("rows_imported") or 0), role, userid)
+    return _to_job_item(row)
@@ -1,27 +1,32 @@
 from __future__ import annotations
 
 import threading
-import time
 from datetime import date
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 
 from ..core.brand_rules import get_own_brands_for_category
-from ..core.config import normalize_site
-from ..repositories import bsr_repo
-from . import user_service
+from ..core.cache import CacheTag, TaggedTTLCache
+from ..core.config import env_bool, env_int, normalize_site
+from ..core.logging import logger
+from ..repositories import bsr_batch_repo, bsr_repo, user_repo
+from . import rbac_service, user_service
 from .bsr_common_service import bsr_row_to_item, split_asins, to_float, to_int, unique_asins
 
 _BSR_LIST_CACHE_TTL_SECONDS = 30
-_BSR_LIST_CACHE: Dict[tuple[Any, ...], tuple[float, Dict[str, Any]]] = {}
-_BSR_LIST_CACHE_LOCK = threading.Lock()
+_BSR_LIST_CACHE = TaggedTTLCache(_BSR_LIST_CACHE_TTL_SECONDS)
 _BSR_OVERVIEW_CACHE_TTL_SECONDS = 30
-_BSR_OVERVIEW_CACHE: Dict[tuple[Any, ...], tuple[float, Dict[str, Any]]] = {}
-_BSR_OVERVIEW_CACHE_LOCK = threading.Lock()
+_BSR_OVERVIEW_CACHE = TaggedTTLCache(_BSR_OVERVIEW_CACHE_TTL_SECONDS)
 _BSR_MONTHLY_BATCH_CACHE_TTL_SECONDS = 30
-_BSR_MONTHLY_BATCH_CACHE: Dict[tuple[Any, ...], tuple[float, Dict[str, List[Dict[str, Any]]]]] = {}
-_BSR_MONTHLY_BATCH_CACHE_LOCK = threading.Lock()
+_BSR_MONTHLY_BATCH_CACHE = TaggedTTLCache(_BSR_MONTHLY_BATCH_CACHE_TTL_SECONDS)
+_BSR_DATES_CACHE_TTL_SECONDS = 30
+_BSR_DATES_CACHE = TaggedTTLCache(_BSR_DATES_CACHE_TTL_SECONDS)
+# Default views of the board (page size and dates list size as the frontend requests them).
+_BSR_DEFAULT_PAGE_SIZE = 100
+_BSR_DEFAULT_DATES_LIMIT = 200
+_WARMING_SITES: set[str] = set()
+_WARMING_SITES_LOCK = threading.Lock()
 
 
 def _to_optional_int(value: Any) -> Optional[int]:
@@ -56,7 +61,8 @@ def _build_bsr_list_cache_key(
         limit,
         offset,
         role,
-        userid,
+        # Admins join every owner's mapping, so their results do not depend on who asks.
+        "" if role == "admin" else userid,
         tuple(sorted(str(value).strip() for value in brand_filters if str(value).strip())),
         tuple(sorted(str(value).strip() for value in rating_filters if str(value).strip())),
         tuple(sorted(str(value).strip() for value in tag_filters if str(value).strip())),
@@ -68,28 +74,70 @@ def _build_bsr_list_cache_key(
 
 
 def invalidate_bsr_list_cache() -> None:
-    with _BSR_LIST_CACHE_LOCK:
-        _BSR_LIST_CACHE.clear()
-    with _BSR_OVERVIEW_CACHE_LOCK:
-        _BSR_OVERVIEW_CACHE.clear()
-    with _BSR_MONTHLY_BATCH_CACHE_LOCK:
-        _BSR_MONTHLY_BATCH_CACHE.clear()
+    _BSR_LIST_CACHE.clear()
+    _BSR_OVERVIEW_CACHE.clear()
+    _BSR_MONTHLY_BATCH_CACHE.clear()
+    _BSR_DATES_CACHE.clear()
+
+
+# Cache tags: every entry carries ("site", site); list entries also carry the batch they were
+# read from, the mapping owner they were joined with, and whether they filter on item tags.
+def _site_tag(site: str) -> CacheTag:
+    return ("site", site)
+
+
+def _batch_tag(site: str, batch_date: Optional[str]) -> CacheTag:
+    return ("batch", site, batch_date or "")
+
+
+def _tag_filtered_tag(site: str, batch_date: Optional[str]) -> CacheTag:
+    return ("tag_filtered", site, batch_date or "")
+
+
+def _mapping_owner_tag(site: str, role: str, userid: str) -> CacheTag:
+    # Admins see every owner's mapping, so their entries share one tag per site.
+    return ("mapping_admin", site) if role == "admin" else ("mapping_owner", site, userid)
+
+
+def invalidate_bsr_site_cache(site: str) -> None:
+    tag = _site_tag(normalize_site(site))
+    _BSR_LIST_CACHE.invalidate_tags(tag)
+    _BSR_OVERVIEW_CACHE.invalidate_tags(tag)
+    _BSR_MONTHLY_BATCH_CACHE.invalidate_tags(tag)
+    _BSR_DATES_CACHE.invalidate_tags(tag)
+
+
+def _invalidate_bsr_mapping_cache(site: str, userid: str) -> None:
+    # Mappings only feed the list query; overview and monthly data do not join them.
+    _BSR_LIST_CACHE.invalidate_tags(_mapping_owner_tag(site, "operator", userid), _mapping_owner_tag(site, "admin", userid))
+
+
+def _patch_bsr_tag_cache(site: str, tags_by_date: Dict[str, Dict[str, List[str]]]) -> None:
+    for batch_date, tags_by_asin in tags_by_date.items():
+        # Entries filtered by tag may gain or lose rows; entries whose batch was unresolved are unknown.
+        _BSR_LIST_CACHE.invalidate_tags(_tag_filtered_tag(site, batch_date), _batch_tag(site, None))
+
+        def _patch(result: Dict[str, Any], tags_by_asin: Dict[str, List[str]] = tags_by_asin) -> Dict[str, Any]:
+            items = [
+                {**item, "tags": list(tags_by_asin[item.get("asin")])} if item.get("asin") in tags_by_asin else item
+                for item in result.get("items") or []
+            ]
+            return {**result, "items": items}
+
+        _BSR_LIST_CACHE.patch_tag(_batch_tag(site, batch_date), _patch)
 
 
 def _build_bsr_overview_cache_key(
     createtime: Optional[date],
     compare_date: Optional[date],
     site: str,
-    role: str,
-    userid: str,
     category: Optional[str],
 ) -> tuple[Any, ...]:
+    # The overview does not join per-user mappings, so one entry serves every user.
     return (
         site,
         createtime.isoformat() if isinstance(createtime, date) else "",
         compare_date.isoformat() if isinstance(compare_date, date) else "",
-        role,
-        userid,
         str(category or "").strip(),
     )
 
@@ -121,6 +169,7 @@ def list_bsr_items(
     price_min: Optional[float] = None,
     price_max: Optional[float] = None,
     compact: bool = False,
+    cache_ttl_seconds: Optional[float] = None,
 ) -> Dict[str, Any]:
     target_site = normalize_site(site)
     normalized_brand_filters = [str(value).strip() for value in (brand_filters or []) if str(value).strip()]
@@ -145,11 +194,9 @@ def list_bsr_items(
         normalized_price_max,
         compact,
     )
-    now = time.time()
-    with _BSR_LIST_CACHE_LOCK:
-        cached = _BSR_LIST_CACHE.get(cache_key)
-        if cached and cached[0] > now:
-            return cached[1]
+    cached = _BSR_LIST_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
     rows = bsr_repo.fetch_bsr_items(
         target_site,
@@ -178,8 +225,15 @@ def list_bsr_items(
         item["is_mapped"] = int(row.get("is_mapped") or 0)
         items.append(item)
     result = {"items": items, "batch_date": batch_date}
-    with _BSR_LIST_CACHE_LOCK:
-        _BSR_LIST_CACHE[cache_key] = (now + _BSR_LIST_CACHE_TTL_SECONDS, result)
+    resolved_batch = batch_date or (createtime.isoformat() if isinstance(createtime, date) else None)
+    cache_tags = [
+        _site_tag(target_site),
+        _batch_tag(target_site, resolved_batch),
+        _mapping_owner_tag(target_site, role, userid),
+    ]
+    if normalized_tag_filters:
+        cache_tags.append(_tag_filtered_tag(target_site, resolved_batch))
+    _BSR_LIST_CACHE.set(cache_key, result, cache_tags, ttl_seconds=cache_ttl_seconds)
     return result
 
 
@@ -190,16 +244,15 @@ def list_bsr_overview(
     role: str,
     userid: str,
     category: Optional[str] = None,
+    cache_ttl_seconds: Optional[float] = None,
 ) -> Dict[str, Any]:
     target_site = normalize_site(site)
     normalized_category = str(category or "").strip() or None
     own_brand_set = get_own_brands_for_category(normalized_category)
-    cache_key = _build_bsr_overview_cache_key(createtime, compare_date, target_site, role, userid, normalized_category)
-    now = time.time()
-    with _BSR_OVERVIEW_CACHE_LOCK:
-        cached = _BSR_OVERVIEW_CACHE.get(cache_key)
-        if cached and cached[0] > now:
-            return cached[1]
+    cache_key = _build_bsr_overview_cache_key(createtime, compare_date, target_site, normalized_category)
+    cached = _BSR_OVERVIEW_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
     current_rows = bsr_repo.fetch_bsr_overview_brand_stats(target_site, createtime, normalized_category)
     prev_rows = bsr_repo.fetch_bsr_overview_brand_stats(target_site, compare_date, normalized_category) if compare_date else []
@@ -268,8 +321,7 @@ def list_bsr_overview(
         "batch_date": createtime.isoformat() if isinstance(createtime, date) else None,
         "compare_date": compare_date.isoformat() if isinstance(compare_date, date) else None,
     }
-    with _BSR_OVERVIEW_CACHE_LOCK:
-        _BSR_OVERVIEW_CACHE[cache_key] = (now + _BSR_OVERVIEW_CACHE_TTL_SECONDS, result)
+    _BSR_OVERVIEW_CACHE.set(cache_key, result, [_site_tag(target_site)], ttl_seconds=cache_ttl_seconds)
     return result
 
 
@@ -289,17 +341,120 @@ def lookup_bsr_item(
     return {"item": bsr_row_to_item(row), "found": True}
 
 
-def list_bsr_dates(site: str, limit: int, offset: int, category: Optional[str] = None) -> List[str]:
+def list_bsr_dates(
+    site: str,
+    limit: int,
+    offset: int,
+    category: Optional[str] = None,
+    cache_ttl_seconds: Optional[float] = None,
+) -> List[str]:
     target_site = normalize_site(site)
     normalized_category = str(category or "").strip() or None
+    cache_key = (target_site, limit, offset, normalized_category or "")
+    cached = _BSR_DATES_CACHE.get(cache_key)
+    if cached is not None:
+        return list(cached)
     rows = bsr_repo.fetch_bsr_dates(target_site, limit, offset, normalized_category)
     items: List[str] = []
     for row in rows:
         value = row.get("createtime")
         items.append(value.isoformat() if isinstance(value, date) else str(value))
+    _BSR_DATES_CACHE.set(cache_key, tuple(items), [_site_tag(target_site)], ttl_seconds=cache_ttl_seconds)
     return items
 
 
+def _resolve_warm_viewers(role: Optional[str], userid: Optional[str]) -> List[Tuple[str, str]]:
+    """Admin lists are shared by every admin; operator lists depend on each viewer's own mappings,
+    so they are warmed for the users active in the last BSR_CACHE_WARM_ACTIVE_DAYS."""
+    candidates: List[Tuple[str, str]] = []
+    if role:
+        candidates.append((role, str(userid or "")))
+    max_viewers = max(0, env_int("BSR_CACHE_WARM_MAX_VIEWERS", 30))
+    if max_viewers:
+        for row in user_repo.fetch_recently_active_users(max(1, env_int("BSR_CACHE_WARM_ACTIVE_DAYS", 14)), max_viewers):
+            viewer_userid = str(row.get("dingtalk_userid") or "")
+            roles = rbac_service.resolve_user_roles(viewer_userid, str(row.get("role") or "operator"))
+            candidates.append((rbac_service.pick_primary_role(roles), viewer_userid))
+    viewers: List[Tuple[str, str]] = [("admin", "")]
+    for viewer_role, viewer_userid in candidates:
+        viewer = ("admin", "") if viewer_role == "admin" else (viewer_role, viewer_userid)
+        if viewer not in viewers:
+            viewers.append(viewer)
+    return viewers
+
+
+def _warm_bsr_default_views(site: str, viewers: List[Tuple[str, str]], ttl_seconds: float) -> int:
+    batch_date = bsr_batch_repo.fetch_latest_batch_date(site)
+    if batch_date is None:
+        return 0
+    registry = bsr_batch_repo.fetch_batch_registry(site, batch_date)
+    site_entry = next((entry for entry in registry if not entry.get("category")), None)
+
+    warmed = 0
+    # Board landing requests: category options from the default overview, the site-wide dates list.
+    # The overview does not depend on the viewer.
+    list_bsr_overview(None, None, site, "admin", "", cache_ttl_seconds=ttl_seconds)
+    list_bsr_dates(site, _BSR_DEFAULT_DATES_LIMIT, 0, cache_ttl_seconds=ttl_seconds)
+    warmed += 2
+    # The overview board compares with the previous site-wide batch.
+    overview_compare = site_entry.get("prev_batch_date") if site_entry else None
+    for entry in registry:
+        category = str(entry.get("category") or "").strip()
+        if not category or not int(entry.get("ranked_count") or 0):
+            continue
+        list_bsr_dates(site, _BSR_DEFAULT_DATES_LIMIT, 0, category, cache_ttl_seconds=ttl_seconds)
+        list_bsr_overview(batch_date, overview_compare, site, "admin", "", category, cache_ttl_seconds=ttl_seconds)
+        warmed += 2
+        for viewer_role, viewer_userid in viewers:
+            list_bsr_items(
+                _BSR_DEFAULT_PAGE_SIZE,
+                0,
+                batch_date,
+                entry.get("compare_date"),
+                site,
+                viewer_role,
+                viewer_userid,
+                category=category,
+                compact=True,
+                cache_ttl_seconds=ttl_seconds,
+            )
+            warmed += 1
+    return warmed
+
+
+def _run_bsr_cache_warm(site: str, role: Optional[str], userid: Optional[str], ttl_seconds: float) -> None:
+    try:
+        viewers = _resolve_warm_viewers(role, userid)
+        warmed = _warm_bsr_default_views(site, viewers, ttl_seconds)
+        logger.info("bsr_cache_warmed site=%s viewers=%s entries=%s", site, len(viewers), warmed)
+    except Exception:
+        logger.exception("bsr_cache_warm_failed site=%s", site)
+    finally:
+        with _WARMING_SITES_LOCK:
+            _WARMING_SITES.discard(site)
+
+
+def warm_bsr_site_cache(site: str, role: Optional[str] = None, userid: Optional[str] = None) -> bool:
+    """Pre-compute the default board views of the latest batch in a background thread, for every
+    recently active viewer plus the given one."""
+    if not env_bool("BSR_CACHE_WARM_ENABLED", True):
+        return False
+    target_site = normalize_site(site)
+    with _WARMING_SITES_LOCK:
+        if target_site in _WARMING_SITES:
+            return False
+        _WARMING_SITES.add(target_site)
+    # Warmed entries outlive the normal TTL; imports, mapping and tag edits still invalidate them by tag.
+    ttl_seconds = max(_BSR_LIST_CACHE_TTL_SECONDS, env_int("BSR_CACHE_WARM_TTL_SECONDS", 600))
+    threading.Thread(
+        target=_run_bsr_cache_warm,
+        args=(target_site, role, userid, ttl_seconds),
+        name="bsr-cache-warm",
+        daemon=True,
+    ).start()
+    return True
+
+
 def list_bsr_monthly(asin: str, site: str, is_child: Optional[int] = None) -> List[Dict[str, Any]]:
     if not asin:
         raise HTTPException(status_code=400, detail="asin 不能为空")
@@ -313,11 +468,9 @@ def list_bsr_monthly_batch(asins: List[str], site: str, is_child: Optional[int]
         raise HTTPException(status_code=400, detail="asins 不能为空")
     normalized_site = normalize_site(site)
     cache_key = _build_bsr_monthly_batch_cache_key(normalized_asins, normalized_site, is_child)
-    now = time.time()
-    with _BSR_MONTHLY_BATCH_CACHE_LOCK:
-        cached = _BSR_MONTHLY_BATCH_CACHE.get(cache_key)
-        if cached and cached[0] > now:
-            return cached[1]
+    cached = _BSR_MONTHLY_BATCH_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
     rows = bsr_repo.fetch_bsr_monthly_batch(normalized_asins, normalized_site, is_child)
     result: Dict[str, List[Dict[str, Any]]] = {asin: [] for asin in normalized_asins}
     for row in rows:
@@ -334,8 +487,7 @@ def list_bsr_monthly_batch(asins: List[str], site: str, is_child: Optional[int]
                 "price": to_float(row.get("price"), 0.0),
             }
         )
-    with _BSR_MONTHLY_BATCH_CACHE_LOCK:
-        _BSR_MONTHLY_BATCH_CACHE[cache_key] = (now + _BSR_MONTHLY_BATCH_CACHE_TTL_SECONDS, result)
+    _BSR_MONTHLY_BATCH_CACHE.set(cache_key, result, [_site_tag(normalized_site)])
     return result
 
 
@@ -382,7 +534,7 @@ def update_bsr_tags(asin: str, tag_list: List[str], createtime: Optional[date],
         raise HTTPException(status_code=403, detail="Forbidden")
     if not exists:
         raise HTTPException(status_code=404, detail="ASIN not found for update")
-    invalidate_bsr_list_cache()
+    _patch_bsr_tag_cache(target_site, {target_date.isoformat(): {asin: [t for t in tag_string.split(",") if t]}})
 
     detail = f"tags={tag_string}"
     if target_date:
@@ -411,7 +563,7 @@ def update_bsr_mapping(asin: str, yida_asin: Optional[str], createtime: Optional
         raise HTTPException(status_code=400, detail="Cannot map to the same ASIN")
 
     bsr_repo.update_bsr_mapping(asin, requested_asins, target_site, userid)
-    invalidate_bsr_list_cache()
+    _invalidate_bsr_mapping_cache(target_site, userid)
 
     detail = f"yida_asin={','.join(requested_asins)}"
     detail += f", site={target_site}"
@@ -425,3 +577,79 @@ def update_bsr_mapping(asin: str, yida_asin: Optional[str], createtime: Optional
     )
 
     return {"asin": asin, "yida_asin": ",".join(requested_asins)}
+
+
+def bulk_update_bsr_tags(
+    items: List[Any],
+    createtime: Optional[date],
+    site: str,
+    role: str,
+    userid: str,
+    username: str,
+) -> Dict[str, Any]:
+    target_site = normalize_site(site)
+    tag_strings: Dict[str, str] = {}
+    for item in items:
+        tag_strings[item.asin] = ",".join([tag.strip() for tag in item.tags if tag and tag.strip()])
+
+    result = bsr_repo.bulk_update_bsr_tags(tag_strings, target_site, createtime, role, userid)
+    if result["forbidden"]:
+        raise HTTPException(status_code=403, detail=f"Forbidden: {','.join(result['forbidden'])}")
+    if result["missing"]:
+        raise HTTPException(status_code=404, detail=f"ASIN not found for update: {','.join(result['missing'])}")
+    tags_by_date: Dict[str, Dict[str, List[str]]] = {}
+    for asin, tags in tag_strings.items():
+        batch_date = result["dates"][asin].isoformat()
+        tags_by_date.setdefault(batch_date, {})[asin] = [t for t in tags.split(",") if t]
+    _patch_bsr_tag_cache(target_site, tags_by_date)
+
+    detail = f"count={len(tag_strings)}, items=" + ";".join(f"{asin}[{tags}]" for asin, tags in tag_strings.items())
+    if createtime:
+        detail += f", createtime={createtime.isoformat()}"
+    detail += f", site={target_site}"
+    user_service.log_audit(
+        module="bsr",
+        action="bulk_update_tags",
+        target_id=None,
+        operator_userid=userid,
+        operator_name=username,
+        detail=detail,
+    )
+
+    return {
+        "items": [
+            {"asin": asin, "tags": [t for t in tags.split(",") if t]}
+            for asin, tags in tag_strings.items()
+        ],
+        "updated": result["updated"],
+    }
+
+
+def bulk_update_bsr_mapping(items: List[Any], site: str, userid: str, username: str) -> Dict[str, Any]:
+    target_site = normalize_site(site)
+    requested: Dict[str, List[str]] = {}
+    for item in items:
+        yida_asins = unique_asins(split_asins(item.yida_asin)) if item.yida_asin else []
+        if any(val.lower() == item.asin.lower() for val in yida_asins):
+            raise HTTPException(status_code=400, detail=f"Cannot map to the same ASIN: {item.asin}")
+        requested[item.asin] = yida_asins
+
+    counts = bsr_repo.bulk_update_bsr_mapping(requested, target_site, userid)
+    _invalidate_bsr_mapping_cache(target_site, userid)
+
+    detail = f"count={len(requested)}, items=" + ";".join(f"{asin}[{','.join(vals)}]" for asin, vals in requested.items())
+    detail += f", site={target_site}"
+    user_service.log_audit(
+        module="bsr",
+        action="bulk_update_mapping",
+        target_id=None,
+        operator_userid=userid,
+        operator_name=username,
+        detail=detail,
+    )
+
+    return {
+        "items": [{"asin": asin, "yida_asin": ",".join(vals)} for asin, vals in requested.items()],
+        "deleted": counts["deleted"],
+        "inserted": counts["inserted"],
+    }
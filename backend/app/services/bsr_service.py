@@ -7,7 +7,9 @@ from .bsr_ai_service import (
     _call_openrouter_bsr_ai_insight,
     _parse_openrouter_text,
     _resolve_openrouter_model,
+    generate_bsr_ai_report,
     get_bsr_ai_insight,
+    open_bsr_ai_insight_stream,
 )
 from .bsr_common_service import (
     _tail_text,
@@ -20,8 +22,12 @@ from .bsr_common_service import (
     to_int,
     unique_asins,
 )
-from .bsr_import_service import import_bsr_files
+from .bsr_feature_service import extract_bsr_features, get_bsr_features
+from .bsr_import_service import get_bsr_import_job, run_bsr_import_job, run_bsr_post_import, submit_bsr_import
 from .bsr_query_service import (
+    bulk_update_bsr_mapping,
+    bulk_update_bsr_tags,
+    invalidate_bsr_site_cache,
     list_bsr_daily,
     list_bsr_dates,
     list_bsr_items,
@@ -47,7 +53,10 @@ __all__ = [
     "list_bsr_overview",
     "lookup_bsr_item",
     "list_bsr_dates",
-    "import_bsr_files",
+    "submit_bsr_import",
+    "run_bsr_import_job",
+    "run_bsr_post_import",
+    "get_bsr_import_job",
     "list_bsr_monthly",
     "list_bsr_monthly_batch",
     "list_bsr_daily",
@@ -58,6 +67,13 @@ __all__ = [
     "_call_openrouter_bsr_ai_insight",
     "_call_gemini_bsr_ai_insight",
     "get_bsr_ai_insight",
+    "generate_bsr_ai_report",
+    "open_bsr_ai_insight_stream",
+    "extract_bsr_features",
+    "get_bsr_features",
     "update_bsr_tags",
     "update_bsr_mapping",
+    "bulk_update_bsr_tags",
+    "bulk_update_bsr_mapping",
+    "invalidate_bsr_site_cache",
 ]
@@ -2,14 +2,13 @@ from __future__ import annotations
 
 import json
 import os
-import urllib.error
 import urllib.parse
-import urllib.request
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 from zoneinfo import ZoneInfo
 
 from .. import auth as auth_core
+from ..core import http_client
 from ..db import execute, fetch_one
 from ..repositories import dingtalk_todo_repo
 
@@ -231,36 +230,29 @@ def _call_todo_api(
     if payload is not None:
         body_bytes = json.dumps(payload, ensure_ascii=False).encode("utf-8")
 
-    req = urllib.request.Request(
-        url=url,
-        data=body_bytes,
-        method=method.upper(),
-        headers={
-            "Content-Type": "application/json",
-            "x-acs-dingtalk-access-token": access_token,
-            "Authorization": f"Bearer {access_token}",
-        },
-    )
+    headers = {
+        "Content-Type": "application/json",
+        "x-acs-dingtalk-access-token": access_token,
+        "Authorization": f"Bearer {access_token}",
+    }
 
     timeout = _env_int("DINGTALK_HTTP_TIMEOUT", 15)
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            raw = resp.read().decode("utf-8")
-            if not raw.strip():
-                return {}
-            parsed = json.loads(raw)
-    except urllib.error.HTTPError as exc:
-        if ignore_not_found and exc.code == 404:
+        resp = http_client.request(method, url, content=body_bytes, headers=headers, timeout=timeout)
+    except Exception as exc:
+        raise DingTalkTodoSyncError(f"Call DingTalk todo API failed: {exc}") from exc
+    if resp.status_code >= 400:
+        if ignore_not_found and resp.status_code == 404:
             return {}
-        body = ""
-        try:
-            body = exc.read().decode("utf-8")
-        except Exception:
-            body = ""
-        message = f"HTTP {exc.code}"
-        if body:
-            message = f"{message} {body[:500]}"
-        raise DingTalkTodoSyncError(message) from exc
+        message = f"HTTP {resp.status_code}"
+        if resp.text:
+            message = f"{message} {resp.text[:500]}"
+        raise DingTalkTodoSyncError(message)
+    raw = resp.text
+    if not raw.strip():
+        return {}
+    try:
+        parsed = json.loads(raw)
     except Exception as exc:
         raise DingTalkTodoSyncError(f"Call DingTalk todo API failed: {exc}") from exc
 
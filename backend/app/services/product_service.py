@@ -274,6 +274,7 @@ def create_product(payload: YidaProductPayload, creator_userid: str) -> None:
                 bsr_data.get("createtime") or date.today(),
                 bsr_site,
             )
+            bsr_service.invalidate_bsr_site_cache(bsr_site)
         else:
             product_repo.insert_product(params)
     except Exception as exc:
@@ -306,7 +307,7 @@ def update_product(asin: str, site: str, payload: YidaProductPayload) -> int:
     if bsr_has_payload(payload.bsr):
         bsr_site = normalize_site(payload.bsr.site if payload.bsr and payload.bsr.site else normalized_site)
         bsr_data = build_bsr_payload(payload.bsr, payload.brand, payload.product)
-        return product_repo.update_product_with_bsr(
+        affected = product_repo.update_product_with_bsr(
             params,
             bsr_data,
             asin,
@@ -314,6 +315,8 @@ def update_product(asin: str, site: str, payload: YidaProductPayload) -> int:
             bsr_data.get("createtime") or date.today(),
             bsr_site,
         )
+        bsr_service.invalidate_bsr_site_cache(bsr_site)
+        return affected
     return product_repo.update_product(params)
 
 
@@ -322,6 +325,7 @@ def delete_product(asin: str, site: str) -> int:
     affected = product_repo.delete_product(asin, normalized_site)
     if affected > 0:
         product_repo.delete_non_top100_bsr_items(asin, normalized_site)
+        bsr_service.invalidate_bsr_site_cache(normalized_site)
     return affected
 
 
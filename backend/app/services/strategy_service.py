@@ -129,6 +129,7 @@ def list_strategies(
     yida_asin: Optional[str],
     role: str,
     userid: str,
+    keyword: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     roles = rbac_service.resolve_user_roles(userid, role)
     scope = rbac_service.resolve_strategy_read_scope(userid, roles)
@@ -143,6 +144,7 @@ def list_strategies(
         competitor_asin,
         yida_asin,
         visible_userids,
+        keyword,
     )
     return [_row_to_item(row) for row in rows]
 
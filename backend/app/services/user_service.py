@@ -8,7 +8,7 @@ from fastapi import HTTPException
 from .. import auth as auth_core
 from ..core.logging import logger
 from ..repositories import rbac_repo, user_repo
-from . import rbac_service
+from . import audit_writer, rbac_service
 
 
 def _normalize_allowed(value: Optional[str], allowed: set[str]) -> Optional[str]:
@@ -233,7 +233,7 @@ def log_audit(
     operator_name: Optional[str],
     detail: Optional[str],
 ) -> None:
-    user_repo.insert_audit_log(module, action, target_id, operator_userid, operator_name, detail)
+    audit_writer.enqueue_audit_log(module, action, target_id, operator_userid, operator_name, detail)
 
 
 def lookup_user_name(userid: str) -> Optional[str]:
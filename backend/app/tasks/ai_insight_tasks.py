@@ -13,3 +13,8 @@ def run_ai_insight_job_task(
     operator_userid: str,
 ) -> None:
     ai_insight_service.run_ai_insight_job(job_id, asin, site, range_days, operator_userid)
+
+
+@celery_app.task(name="bi_amazon.ai_insight.run_batch")
+def run_ai_insight_batch_task(batch_id: str) -> None:
+    ai_insight_service.run_ai_insight_batch(batch_id)
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from ..core.celery_app import celery_app
+from ..services import bsr_import_service
+
+
+@celery_app.task(name="bi_amazon.bsr_import.run")
+def run_bsr_import_job_task(job_id: str) -> Optional[Dict[str, Any]]:
+    return bsr_import_service.run_bsr_import_job(job_id)
+
+
+@celery_app.task(name="bi_amazon.bsr_import.post_process")
+def run_bsr_post_import_task(result: Optional[Dict[str, Any]]) -> None:
+    bsr_import_service.run_bsr_post_import(result)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..core.celery_app import celery_app
+from ..core.logging import logger
+from ..imports.keepa_daily_importer import import_keepa_exports
+
+
+@celery_app.task(name="bi_amazon.keepa_daily_import.run")
+def run_keepa_daily_import_task(
+    export_dir: str,
+    site: str = "US",
+    asin_tokens: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    resume: bool = True,
+) -> Dict[str, Any]:
+    result = import_keepa_exports(Path(export_dir), site, asin_tokens, workers=workers, resume=resume)
+    logger.info(
+        "keepa_daily_import_done dir=%s rows=%s processed=%s skipped=%s failed=%s",
+        export_dir,
+        result["imported_rows"],
+        result["processed_count"],
+        result["skipped_count"],
+        len(result["failed_files"]),
+    )
+    return result
@@ -0,0 +1,79 @@
+"""Compare the size of the v1 (row objects) and v2 (compact columnar) AI report prompts.
+
+Run from the backend directory; synthetic windows need no database, --asin reads real rows:
+  python -m benchmarks.ai_prompt_bench --days 7 30 90 180
+  python -m benchmarks.ai_prompt_bench --asin B0XXXXXXXX --site US --days 180
+Token counts use tiktoken (cl100k_base) when it is installed, otherwise a rough estimate
+(one token per CJK character, ASCII word or 1-3 digit group, or punctuation mark).
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.ai_report_prompt import KEEPA_REPORT_PROMPT_VERSIONS, KEEPA_REPORT_SYSTEM_PROMPT
+from app.services.bsr_ai_service import _build_bsr_ai_summary, _rows_payload, build_bsr_ai_user_prompt
+
+from .generators import keepa_daily_rows
+
+_ESTIMATE_PATTERN = re.compile(r"[\u4e00-\u9fff]|[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def _token_counter() -> tuple[str, Callable[[str], int]]:
+    if importlib.util.find_spec("tiktoken") is not None:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return "tiktoken", lambda text: len(encoding.encode(text))
+    return "estimate", lambda text: len(_ESTIMATE_PATTERN.findall(text))
+
+
+def _load_rows(asin: Optional[str], site: str, days: int, rng: random.Random) -> List[Dict[str, Any]]:
+    if not asin:
+        return keepa_daily_rows(days, rng)
+    from app.repositories import bsr_repo
+
+    return bsr_repo.fetch_bsr_daily_window(asin, site, days)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="*", default=[7, 30, 90, 180])
+    parser.add_argument("--asin", default=None, help="read this ASIN's window instead of synthetic rows")
+    parser.add_argument("--site", default="US")
+    parser.add_argument("--seed", type=int, default=20261019)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    counter_name, count_tokens = _token_counter()
+    system_tokens = count_tokens(KEEPA_REPORT_SYSTEM_PROMPT)
+    print(f"token counter={counter_name} system prompt={system_tokens} tokens (same for both versions)")
+    for days in args.days:
+        rows = _load_rows(args.asin, args.site, days, rng)
+        if not rows:
+            print(f"days={days:<4} no rows")
+            continue
+        summary = _build_bsr_ai_summary(rows)
+        v1_pairs = sum(len(item) for item in _rows_payload(rows))
+        results = {}
+        for version in KEEPA_REPORT_PROMPT_VERSIONS:
+            started = time.perf_counter()
+            prompt = build_bsr_ai_user_prompt(args.asin or "B0BENCH000", args.site, days, rows, summary, version)
+            build_ms = (time.perf_counter() - started) * 1000
+            results[version] = (count_tokens(prompt), len(prompt.encode("utf-8")), build_ms)
+        v1_tokens = results["v1"][0]
+        for version, (tokens, size, build_ms) in results.items():
+            print(
+                f"days={days:<4} rows={len(rows):<4} {version} tokens={tokens:<7} bytes={size:<8} "
+                f"build={build_ms:6.1f}ms vs v1={tokens / v1_tokens * 100:5.1f}%"
+            )
+        print(f"days={days:<4} v1 key/value pairs={v1_pairs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare Excel reader engines on seller-sprite shaped workbooks.
+
+Run from the backend directory (no database needed):
+  python -m benchmarks.excel_reader_bench --rows 100 10000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from app.imports.bsr_monthly_importer import MONTHLY_SHEETS
+from app.imports.readers import read_excel_sheet, read_excel_sheets
+
+from .generators import write_bundle, write_detail_workbook
+
+_DETAIL_MONTHS = 24
+
+
+def _write_workbooks(directory: Path, rows: int, rng: random.Random) -> tuple[Path, Path]:
+    seller_path, _, asins = write_bundle(directory, rows, rng)
+    return seller_path, write_detail_workbook(directory, asins, _DETAIL_MONTHS, rng)
+
+
+def _median_ms(action, repeat: int) -> float:
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _engines() -> List[str]:
+    engines = ["openpyxl"]
+    if importlib.util.find_spec("python_calamine") is not None:
+        engines.append("calamine")
+    return engines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="*", default=[100, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=20261019)
+    parser.add_argument("--dir", default=None, help="keep generated workbooks in this directory")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engines = _engines()
+    if "calamine" not in engines:
+        print("python-calamine is not installed; only openpyxl is measured")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = Path(args.dir) if args.dir else Path(scratch)
+        directory.mkdir(parents=True, exist_ok=True)
+        for rows in args.rows:
+            seller_path, detail_path = _write_workbooks(directory, rows, rng)
+            baseline: Optional[float] = None
+            for engine in engines:
+                seller_ms = _median_ms(lambda: read_excel_sheet(seller_path, sheet_name=0, engine=engine), args.repeat)
+                detail_ms = _median_ms(lambda: read_excel_sheets(detail_path, lambda names: names, engine=engine), args.repeat)
+                total = seller_ms + detail_ms
+                baseline = baseline or total
+                print(
+                    f"rows={rows:<6} engine={engine:<9} seller={seller_ms:9.1f}ms "
+                    f"detail({len(MONTHLY_SHEETS) + 1} sheets)={detail_ms:9.1f}ms x{baseline / total:.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
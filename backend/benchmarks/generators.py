@@ -0,0 +1,191 @@
+"""Synthetic seller-sprite, jimu and Keepa files matching the column contracts of the importers."""
+
+from __future__ import annotations
+
+import datetime as dt
+import random
+import string
+from decimal import Decimal
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import pandas as pd
+
+from app.imports.bsr_monthly_importer import MONTHLY_SHEETS
+
+SELLER_COLUMNS = [
+    "ASIN", "父ASIN", "商品标题", "商品主图", "商品详情页链接", "品牌", "小类目", "价格($)", "原价", "评分",
+    "评分数", "大类BSR", "变体数", "上架时间", "月销量", "月销售额($)",
+]
+BRANDS = ["EZARC", "TOLESA", "DEWALT", "BOSCH", "MILWAUKEE", "DIABLO", "LENOX"]
+
+
+def make_asins(count: int, rng: random.Random) -> List[str]:
+    asins: dict = {}
+    while len(asins) < count:
+        asins["B0" + "".join(rng.choices(string.ascii_uppercase + string.digits, k=8))] = None
+    return list(asins)
+
+
+def month_columns(months: int, end: dt.date) -> List[str]:
+    year, month = end.year, end.month
+    columns = []
+    for _ in range(months):
+        columns.append(f"{year}-{month:02d}")
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return columns[::-1]
+
+
+def seller_frame(asins: Sequence[str], rng: random.Random) -> pd.DataFrame:
+    rows = len(asins)
+    return pd.DataFrame(
+        {
+            "ASIN": asins,
+            "父ASIN": make_asins(rows, rng),
+            "商品标题": [f"{rng.choice(BRANDS)} reciprocating saw blade {index} for wood and metal" for index in range(rows)],
+            "商品主图": [f"https://m.media-amazon.com/images/I/{asin}.jpg" for asin in asins],
+            "商品详情页链接": [f"https://www.amazon.com/dp/{asin}" for asin in asins],
+            "品牌": rng.choices(BRANDS, k=rows),
+            "小类目": "Reciprocating Saw Blades",
+            "价格($)": [round(rng.uniform(5, 80), 2) for _ in range(rows)],
+            "原价": [round(rng.uniform(5, 90), 2) for _ in range(rows)],
+            "评分": [round(rng.uniform(3, 5), 1) for _ in range(rows)],
+            "评分数": [rng.randint(0, 50000) for _ in range(rows)],
+            "大类BSR": [rng.randint(1, 200000) for _ in range(rows)],
+            "变体数": [rng.randint(1, 30) for _ in range(rows)],
+            "上架时间": [(dt.date(2020, 1, 1) + dt.timedelta(days=rng.randint(0, 2000))).isoformat() for _ in range(rows)],
+            "月销量": [rng.randint(0, 20000) for _ in range(rows)],
+            "月销售额($)": [round(rng.uniform(0, 500000), 2) for _ in range(rows)],
+        },
+        columns=SELLER_COLUMNS,
+    )
+
+
+def jimu_frame(asins: Sequence[str], first_rank: int, rng: random.Random) -> pd.DataFrame:
+    rows = len(asins)
+    return pd.DataFrame(
+        {
+            "sc-iMTngq": [f"ASIN: {asin}" for asin in asins],
+            "ant-flex": [f"{rng.uniform(1, 30):.1f}% 7天" for _ in range(rows)],
+            "zg-bdg-text": [f"#{first_rank + index:,}" for index in range(rows)],
+            "distributionText": [f"{rng.randint(0, 5000)} 自然流量" for _ in range(rows)],
+            "distributionText (3)": [f"{rng.randint(0, 5000)} 广告流量" for _ in range(rows)],
+            "exts-color-border-black (2)": [rng.randint(0, 800) for _ in range(rows)],
+            "exts-color-border-black (3)": [rng.randint(0, 400) for _ in range(rows)],
+            "exts-color-border-black (4)": [rng.randint(0, 200) for _ in range(rows)],
+        }
+    )
+
+
+def write_bundle(directory: Path, rows: int, rng: random.Random) -> Tuple[Path, List[Path], List[str]]:
+    """Seller workbook plus the two jimu CSVs; at rows=100 this is exactly the production 100/50/50 shape."""
+    asins = make_asins(rows, rng)
+    seller_path = directory / f"seller_{rows}.xlsx"
+    seller_frame(asins, rng).to_excel(seller_path, index=False)
+    half = rows // 2
+    csv_paths = []
+    for index, (start, stop) in enumerate(((0, half), (half, rows))):
+        path = directory / f"jimu_{rows}_{index + 1}.csv"
+        jimu_frame(asins[start:stop], start + 1, rng).to_csv(path, index=False)
+        csv_paths.append(path)
+    return seller_path, csv_paths, asins
+
+
+def write_detail_workbook(directory: Path, asins: Sequence[str], months: int, rng: random.Random) -> Path:
+    path = directory / f"detail_{len(asins)}.xlsx"
+    columns = month_columns(months, dt.date.today())
+    with pd.ExcelWriter(path) as writer:
+        seller_frame(asins, rng).to_excel(writer, sheet_name="商品列表", index=False)
+        for sheet_name in MONTHLY_SHEETS:
+            frame = pd.DataFrame({"ASIN": asins})
+            for column in columns:
+                if sheet_name == "历史月价格":
+                    frame[column] = [round(rng.uniform(5, 80), 2) for _ in asins]
+                else:
+                    frame[column] = [rng.randint(0, 20000) for _ in asins]
+            frame.to_excel(writer, sheet_name=sheet_name, index=False)
+    return path
+
+
+def write_keepa_exports(directory: Path, asins: Sequence[str], days: int, rng: random.Random) -> List[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    start = dt.datetime.combine(dt.date.today() - dt.timedelta(days=days), dt.time())
+    paths = []
+    for asin in asins:
+        # Two observations per day, like Keepa's irregular sampling.
+        stamps = [start + dt.timedelta(hours=12 * step + rng.randint(0, 11)) for step in range(days * 2)]
+        frame = pd.DataFrame(
+            {
+                "日期": [stamp.strftime("%Y-%m-%d %H:%M") for stamp in stamps],
+                "Buybox价格($)": [f"${rng.uniform(5, 80):.2f}" for _ in stamps],
+                "价格($)": [f"${rng.uniform(5, 80):.2f}" for _ in stamps],
+                "Coupon折扣": [rng.choice(["", "5%", "10%"]) for _ in stamps],
+                "日销量": [rng.randint(0, 400) for _ in stamps],
+                "BSR排名": [f"#{rng.randint(1, 100000):,}" for _ in stamps],
+                "BSR[Reciprocating Saw Blades]": [rng.randint(1, 500) for _ in stamps],
+                "评分": [round(rng.uniform(3, 5), 1) for _ in stamps],
+                "评分数": [rng.randint(0, 50000) for _ in stamps],
+                "卖家数": [rng.randint(1, 20) for _ in stamps],
+            }
+        )
+        path = directory / f"{asin}_keepa.xlsx"
+        frame.to_excel(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def keepa_daily_rows(days: int, rng: random.Random, end: dt.date | None = None) -> List[dict]:
+    """fact_bi_amazon_product_day rows as fetch_bsr_daily_window returns them: prices that hold for
+    weeks, FBA stockout gaps (NULL), a slowly growing review count and mostly-empty promo columns."""
+    end = end or dt.date.today()
+    price = round(rng.uniform(12, 40), 2)
+    rating_count = rng.randint(0, 200)
+    rank = rng.randint(500, 50000)
+    stockout_left = 0
+    rows = []
+    for offset in range(days):
+        day = end - dt.timedelta(days=days - 1 - offset)
+        if rng.random() < 0.05:
+            price = round(price * rng.uniform(0.85, 1.15), 2)
+        if stockout_left == 0 and rng.random() < 0.02:
+            stockout_left = rng.randint(2, 10)
+        in_stock = stockout_left == 0
+        stockout_left = max(0, stockout_left - 1)
+        rating_count += rng.choice([0, 0, 1, 2, 3]) + (rng.randint(30, 80) if rng.random() < 0.01 else 0)
+        rank = max(1, int(rank * rng.uniform(0.9, 1.1)))
+        coupon = rng.random() < 0.1
+        rows.append(
+            {
+                "date": day,
+                "buybox_price": Decimal(str(price)) if in_stock else None,
+                "price": Decimal(str(price)),
+                "prime_price": None,
+                "coupon_price": Decimal(str(round(price * 0.9, 2))) if coupon else None,
+                "coupon_discount": Decimal("10") if coupon else None,
+                "child_sales": rng.choice([None, rng.randint(0, 300)]),
+                "sales_volume": rng.randint(0, 60),
+                "fba_price": Decimal(str(price)) if in_stock else None,
+                "fbm_price": None,
+                "strikethrough_price": Decimal(str(round(price * 1.2, 2))) if offset % 30 < 20 else None,
+                "bsr_rank": rank,
+                "bsr_reciprocating_saw_blades": max(1, rank // 100),
+                "rating": Decimal("4.5") if rating_count < 500 else Decimal("4.6"),
+                "rating_count": rating_count,
+                "seller_count": 1 if rng.random() < 0.9 else 2,
+            }
+        )
+    return rows
+
+
+__all__ = [
+    "SELLER_COLUMNS",
+    "keepa_daily_rows",
+    "make_asins",
+    "month_columns",
+    "seller_frame",
+    "write_bundle",
+    "write_detail_workbook",
+    "write_keepa_exports",
+]
@@ -0,0 +1,182 @@
+"""Local stand-in for the OpenRouter and DingTalk endpoints used by app/core/http_client.py callers.
+
+Run from the backend directory. Serve it and point the app at it:
+  python -m benchmarks.http_stub_server --serve --port 8099
+  OPENROUTER_API_URL=http://127.0.0.1:8099/api/v1/chat/completions
+  DINGTALK_TOKEN_URL=http://127.0.0.1:8099/gettoken DINGTALK_TODO_API_BASE=http://127.0.0.1:8099
+or, without --serve, compare one-connection-per-call urllib against the pooled client:
+  python -m benchmarks.http_stub_server --requests 200 --latency-ms 5 --fail-every 20
+--fail-every N answers every Nth request with 503 to exercise the retry path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Tuple
+
+_REPORT_CHUNKS = ["Keepa数据深度解析报告", "\n一、关键时间点分析", "：数据不足/暂不判断。", "\n二、评分数曲线分析"]
+
+
+class StubStats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.failures = 0
+
+
+def _make_handler(stats: StubStats, latency_ms: float, fail_every: int) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self) -> None:
+            super().setup()
+            with stats.lock:
+                stats.connections += 1
+
+        def log_message(self, format: str, *args: Any) -> None:
+            return
+
+        def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+            raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def _read_body(self) -> Dict[str, Any]:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                return json.loads(raw) if raw else {}
+            except json.JSONDecodeError:
+                return {}
+
+        def _stream_report(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            events = [": OPENROUTER PROCESSING\n\n"]
+            events += [f"data: {json.dumps({'choices': [{'delta': {'content': text}}]}, ensure_ascii=False)}\n\n" for text in _REPORT_CHUNKS]
+            events.append("data: [DONE]\n\n")
+            for event in events:
+                raw = event.encode("utf-8")
+                self.wfile.write(f"{len(raw):X}\r\n".encode("ascii") + raw + b"\r\n")
+                self.wfile.flush()
+                time.sleep(latency_ms / 1000)
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _dispatch(self) -> None:
+            body = self._read_body() if self.command in {"POST", "PUT"} else {}
+            with stats.lock:
+                stats.requests += 1
+                failing = fail_every > 0 and stats.requests % fail_every == 0
+                stats.failures += int(failing)
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            if failing:
+                self._send_json(503, {"error": {"message": "stub overloaded"}})
+                return
+            path = self.path.split("?")[0]
+            if path.endswith("/chat/completions"):
+                if body.get("stream"):
+                    self._stream_report()
+                else:
+                    self._send_json(200, {"choices": [{"message": {"content": "".join(_REPORT_CHUNKS)}}]})
+            elif path == "/gettoken":
+                self._send_json(200, {"errcode": 0, "access_token": "stub-token", "expires_in": 7200})
+            elif path == "/get_jsapi_ticket":
+                self._send_json(200, {"errcode": 0, "ticket": "stub-ticket", "expires_in": 7200})
+            elif path == "/topapi/v2/user/getuserinfo":
+                self._send_json(200, {"errcode": 0, "result": {"userid": "stub-user"}})
+            elif path == "/topapi/v2/user/get":
+                self._send_json(200, {"errcode": 0, "result": {"userid": "stub-user", "name": "Stub", "unionid": "stub-union"}})
+            elif path.startswith("/v1.0/todo/"):
+                self._send_json(200, {"id": "stub-task"} if self.command == "POST" else {"result": True})
+            else:
+                self._send_json(404, {"errcode": 404, "errmsg": "not found"})
+
+        do_GET = _dispatch
+        do_POST = _dispatch
+        do_PUT = _dispatch
+        do_DELETE = _dispatch
+
+    return Handler
+
+
+@contextmanager
+def run_stub_server(port: int = 0, latency_ms: float = 0.0, fail_every: int = 0) -> Iterator[Tuple[str, StubStats]]:
+    """Serves on 127.0.0.1 in a background thread; yields (base_url, stats)."""
+    stats = StubStats()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(stats, latency_ms, fail_every))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="http-stub", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", stats
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _urllib_call(url: str) -> None:
+    try:
+        with urllib.request.urlopen(url, timeout=10) as resp:
+            resp.read()
+    except urllib.error.HTTPError:
+        pass
+
+
+def _compare(requests: int, latency_ms: float, fail_every: int) -> None:
+    from app.core import http_client
+
+    for label in ("urllib", "http_client"):
+        with run_stub_server(latency_ms=latency_ms, fail_every=fail_every) as (base_url, stats):
+            url = f"{base_url}/gettoken"
+            failed = 0
+            started = time.perf_counter()
+            for _ in range(requests):
+                if label == "urllib":
+                    _urllib_call(url)
+                elif http_client.request("GET", url).status_code != 200:
+                    failed += 1
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            http_client.close_clients()
+        print(
+            f"{label:<12} requests={requests} wall={elapsed_ms:8.1f}ms per_call={elapsed_ms / requests:6.2f}ms "
+            f"connections={stats.connections} served={stats.requests} injected_503={stats.failures} unrecovered={failed}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--serve", action="store_true", help="serve until interrupted instead of comparing clients")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.serve:
+        _compare(args.requests, args.latency_ms, args.fail_every)
+        return
+    with run_stub_server(args.port, args.latency_ms, args.fail_every) as (base_url, _):
+        print(f"stub server on {base_url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Run the BSR import path end to end on synthetic files and record per-stage cost.
+
+Run from the backend directory against a scratch database. Rows are written under site BENCH
+and removed afterwards unless --keep is given:
+  python -m benchmarks.import_bench --scale 1 10 --output benchmarks/results
+  python -m benchmarks.import_bench --scale 1 --compare benchmarks/results/import_20261019T120000.json
+Scale 1 is the production bundle (100 seller rows, 2 x 50 jimu rows); --trace-memory adds
+tracemalloc peaks per stage at the cost of slower timings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.db import get_connection
+from app.imports.bsr_importer import (
+    build_bsr_rows,
+    clear_staged_bsr_rows,
+    read_bsr_bundle,
+    stage_bsr_rows,
+    swap_staged_bsr_rows,
+    validate_bsr_bundle,
+    validate_bsr_rows,
+)
+from app.imports.bsr_monthly_importer import build_monthly_rows, read_monthly_workbook, write_monthly_rows
+from app.imports.keepa_daily_importer import import_keepa_exports
+
+from .generators import make_asins, write_bundle, write_detail_workbook, write_keepa_exports
+
+BENCH_SITE = "BENCH"
+_BENCH_TABLES = ("dim_bi_amazon_item", "fact_bi_amazon_product_month", "fact_bi_amazon_product_day")
+
+
+class _Recorder:
+    def __init__(self, trace_memory: bool) -> None:
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, float] = {}
+        self.peak_kb: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round((time.perf_counter() - started) * 1000, 1)
+            if self.trace_memory:
+                self.peak_kb[name] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+
+    def result(self, rows: int, write_stages: List[str], **extra: Any) -> Dict[str, Any]:
+        write_ms = sum(self.stages.get(name, 0.0) for name in write_stages)
+        total_ms = sum(self.stages.values())
+        payload: Dict[str, Any] = {
+            "rows": rows,
+            "stages_ms": self.stages,
+            "total_ms": round(total_ms, 1),
+            "rows_per_sec_total": round(rows / (total_ms / 1000), 1) if total_ms else None,
+            "rows_per_sec_write": round(rows / (write_ms / 1000), 1) if write_ms else None,
+            **extra,
+        }
+        if self.trace_memory:
+            payload["peak_kb"] = self.peak_kb
+        return payload
+
+
+def _bench_bundle(directory: Path, rows: int, rng: random.Random, trace_memory: bool) -> Dict[str, Any]:
+    seller_path, csv_paths, _ = write_bundle(directory, rows, rng)
+    recorder = _Recorder(trace_memory)
+    with recorder.stage("read"):
+        bundle = read_bsr_bundle(str(seller_path), [str(path) for path in csv_paths])
+    with recorder.stage("validate"):
+        # Row-count checks only pass at scale 1; they are still timed, and the import continues.
+        errors = validate_bsr_bundle(bundle)
+    with recorder.stage("transform"):
+        insert_df = build_bsr_rows(bundle, site=BENCH_SITE)
+        errors.extend(validate_bsr_rows(insert_df))
+    job_id = f"bench{uuid.uuid4().hex[:27]}"
+    with get_connection() as conn:
+        try:
+            with recorder.stage("stage"):
+                stage_bsr_rows(insert_df, job_id, conn)
+            with recorder.stage("swap"):
+                swap_staged_bsr_rows(conn, job_id, BENCH_SITE, str(insert_df["createtime"].iloc[0]), len(insert_df))
+        finally:
+            clear_staged_bsr_rows(conn, job_id)
+    return recorder.result(len(insert_df), ["stage", "swap"], validation_errors=len(errors))
+
+
+def _bench_monthly(directory: Path, rows: int, months: int, rng: random.Random, trace_memory: bool) -> Dict[str, Any]:
+    detail_path = write_detail_workbook(directory, make_asins(rows, rng), months, rng)
+    recorder = _Recorder(trace_memory)
+    with recorder.stage("read"):
+        sheets = read_monthly_workbook(str(detail_path))
+    with recorder.stage("transform"):
+        merged = build_monthly_rows(sheets, BENCH_SITE)
+    with recorder.stage("write"), get_connection() as conn:
+        write_monthly_rows(merged, conn)
+    return recorder.result(len(merged), ["write"], months=months)
+
+
+def _bench_keepa(directory: Path, asins: int, days: int, workers: Optional[int], rng: random.Random, trace_memory: bool) -> Dict[str, Any]:
+    export_dir = directory / "keepa"
+    write_keepa_exports(export_dir, make_asins(asins, rng), days, rng)
+    recorder = _Recorder(trace_memory)
+    # Parsing and writing are pipelined, so only the combined wall time is meaningful here.
+    with recorder.stage("parse_and_write"):
+        result = import_keepa_exports(export_dir, BENCH_SITE, workers=workers, resume=False)
+    return recorder.result(
+        int(result["imported_rows"]),
+        ["parse_and_write"],
+        workbooks=result["workbook_count"],
+        failed=len(result["failed_files"]),
+    )
+
+
+def _cleanup() -> None:
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            for table in _BENCH_TABLES:
+                cursor.execute(f"DELETE FROM {table} WHERE site = %s", (BENCH_SITE,))
+        conn.commit()
+
+
+def _compare(current: Dict[str, Any], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"\ncompared with {baseline_path} ({baseline.get('created_at')})")
+    for scale_key, workloads in current["results"].items():
+        for workload, stats in workloads.items():
+            previous = (baseline.get("results", {}).get(scale_key) or {}).get(workload)
+            if not previous:
+                continue
+            for stage, value in stats["stages_ms"].items():
+                before = (previous.get("stages_ms") or {}).get(stage)
+                if not before:
+                    continue
+                change = (value - before) / before * 100
+                print(f"{scale_key:<9} {workload:<8} {stage:<16} {before:9.1f}ms -> {value:9.1f}ms ({change:+6.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="*", default=[1, 10], help="multiples of the 100-row production bundle")
+    parser.add_argument("--months", type=int, default=24, help="month columns in the detail workbook")
+    parser.add_argument("--keepa-asins", type=int, default=20, help="Keepa exports per scale unit (0 to skip)")
+    parser.add_argument("--keepa-days", type=int, default=180)
+    parser.add_argument("--workers", type=int, default=None, help="Keepa parser processes")
+    parser.add_argument("--seed", type=int, default=20261019)
+    parser.add_argument("--trace-memory", action="store_true", help="record tracemalloc peaks per stage")
+    parser.add_argument("--output", default="benchmarks/results", help="directory for the JSON result file")
+    parser.add_argument("--compare", default=None, help="earlier result file to diff against")
+    parser.add_argument("--keep", action="store_true", help="keep BENCH rows in the database")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.trace_memory:
+        tracemalloc.start()
+    report: Dict[str, Any] = {
+        "created_at": dt.datetime.now().isoformat(timespec="seconds"),
+        "args": vars(args),
+        "results": {},
+    }
+    try:
+        for scale in args.scale:
+            rows = 100 * scale
+            with tempfile.TemporaryDirectory() as scratch:
+                directory = Path(scratch)
+                workloads = {
+                    "bundle": _bench_bundle(directory, rows, rng, args.trace_memory),
+                    "monthly": _bench_monthly(directory, rows, args.months, rng, args.trace_memory),
+                }
+                if args.keepa_asins > 0:
+                    workloads["keepa"] = _bench_keepa(
+                        directory, args.keepa_asins * scale, args.keepa_days, args.workers, rng, args.trace_memory
+                    )
+            report["results"][f"scale_{scale}"] = workloads
+            for workload, stats in workloads.items():
+                stages = " ".join(f"{name}={value:.1f}ms" for name, value in stats["stages_ms"].items())
+                print(
+                    f"scale={scale:<4} {workload:<8} rows={stats['rows']:<8} {stages} "
+                    f"rows/s(write)={stats['rows_per_sec_write']}"
+                )
+    finally:
+        if not args.keep:
+            _cleanup()
+    report["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"import_{dt.datetime.now().strftime('%Y%m%dT%H%M%S')}.json"
+    output_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"max_rss={report['max_rss_kb']}KB saved={output_path}")
+    if args.compare:
+        _compare(report, Path(args.compare))
+
+
+if __name__ == "__main__":
+    main()
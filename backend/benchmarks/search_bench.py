@@ -0,0 +1,206 @@
+"""Compare LIKE scans with the indexed keyword search at a multiple of production row counts.
+
+Run from the backend directory against a scratch database:
+  python -m benchmarks.search_bench --scale 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import string
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from app.db import get_connection
+from app.search import (
+    PRODUCT_SEARCH,
+    STRATEGY_SEARCH,
+    InvertedIndex,
+    SearchSpec,
+    _like_predicate,
+    normalize_search_text,
+    search,
+)
+
+_WORDS = [
+    "saw", "blade", "carbide", "bi-metal", "demolition", "pruning", "jigsaw", "reciprocating",
+    "metal", "wood", "锯条", "切木", "切金属", "往复锯", "曲线锯", "防守", "主推", "新品",
+]
+_BRANDS = ["EZARC", "TOLESA", "DEWALT", "BOSCH", "MILWAUKEE", "DIABLO", "LENOX"]
+
+# (source table, scratch table, search spec, minimum rows)
+_TARGETS = [
+    ("dim_bi_amazon_product", "bench_search_product", PRODUCT_SEARCH, 2000),
+    ("dim_bi_amazon_todo", "bench_search_todo", STRATEGY_SEARCH, 2000),
+]
+
+
+def _asin(rng: random.Random) -> str:
+    return "B0" + "".join(rng.choices(string.ascii_uppercase + string.digits, k=8))
+
+
+def _phrase(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(_WORDS, k=words))
+
+
+def _product_row(rng: random.Random, index: int) -> Tuple[Any, ...]:
+    return (
+        _asin(rng),
+        "US",
+        f"SKU-{index}",
+        rng.choice(_BRANDS),
+        _phrase(rng, 4),
+    )
+
+
+def _todo_row(rng: random.Random, index: int) -> Tuple[Any, ...]:
+    return (
+        "US",
+        _asin(rng),
+        _asin(rng),
+        f"user{index % 50}",
+        _phrase(rng, 5),
+        _phrase(rng, 40),
+        f"user{index % 50}",
+        "普通",
+        f"task-{index}",
+    )
+
+
+_INSERTS: Dict[str, Tuple[str, Callable[[random.Random, int], Tuple[Any, ...]]]] = {
+    "bench_search_product": (
+        "INSERT IGNORE INTO bench_search_product (asin, site, sku, brand, product) VALUES (%s, %s, %s, %s, %s)",
+        _product_row,
+    ),
+    "bench_search_todo": (
+        """
+        INSERT IGNORE INTO bench_search_todo (
+            site, competitor_asin, yida_asin, userid, title, detail, owner_userid, priority, dingtalk_task_id
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        _todo_row,
+    ),
+}
+
+
+def _prepare_table(cursor, source: str, scratch: str, rows: int, rng: random.Random) -> None:
+    cursor.execute(f"DROP TABLE IF EXISTS {scratch}")
+    # CREATE TABLE ... LIKE keeps the FULLTEXT index of the source table.
+    cursor.execute(f"CREATE TABLE {scratch} LIKE {source}")
+    sql, builder = _INSERTS[scratch]
+    batch: List[Tuple[Any, ...]] = []
+    for index in range(rows):
+        batch.append(builder(rng, index))
+        if len(batch) >= 2000:
+            cursor.executemany(sql, batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+
+
+def _scratch_spec(spec: SearchSpec) -> SearchSpec:
+    columns = tuple(column.split(".", 1)[-1] for column in spec.columns)
+    return SearchSpec(name=f"bench_{spec.name}", columns=columns)
+
+
+def _time_query(cursor, sql: str, params: Sequence[Any], repeat: int) -> Tuple[float, int]:
+    samples: List[float] = []
+    matched = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        matched = len(cursor.fetchall())
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), matched
+
+
+def _bench_sql(cursor, scratch: str, spec: SearchSpec, keywords: Sequence[str], repeat: int) -> None:
+    scratch_spec = _scratch_spec(spec)
+    for keyword in keywords:
+        like_sql, like_params = _like_predicate(scratch_spec, keyword)
+        ft_sql, ft_params = search(scratch_spec, keyword)
+        like_ms, like_rows = _time_query(cursor, f"SELECT 1 FROM {scratch} WHERE {like_sql}", like_params, repeat)
+        ft_ms, ft_rows = _time_query(cursor, f"SELECT 1 FROM {scratch} WHERE {ft_sql}", ft_params, repeat)
+        speedup = like_ms / ft_ms if ft_ms else float("inf")
+        print(
+            f"{scratch:<22} {keyword!r:<16} like={like_ms:8.2f}ms ({like_rows:>6}) "
+            f"indexed={ft_ms:8.2f}ms ({ft_rows:>6}) x{speedup:.1f}"
+        )
+
+
+def _bench_memory(rows: int, keywords: Sequence[str], repeat: int, rng: random.Random) -> None:
+    documents = [
+        {"dingtalk_userid": f"{rng.randint(10**8, 10**9)}{index}", "dingtalk_username": f"用户{_phrase(rng, 1)}{index}"}
+        for index in range(rows)
+    ]
+    spec = SearchSpec(
+        name="bench_user",
+        columns=(),
+        backend="memory",
+        id_column="dingtalk_userid",
+        loader=lambda: documents,
+        id_field="dingtalk_userid",
+        text_fields=("dingtalk_userid", "dingtalk_username"),
+    )
+    index = InvertedIndex(spec, ttl_seconds=3600)
+    started = time.perf_counter()
+    index.lookup("warmup")
+    build_ms = (time.perf_counter() - started) * 1000
+    haystack = [
+        (row["dingtalk_userid"], normalize_search_text(f"{row['dingtalk_userid']} {row['dingtalk_username']}"))
+        for row in documents
+    ]
+    print(f"memory index over {rows} users built in {build_ms:.2f}ms")
+    for keyword in keywords:
+        needle = normalize_search_text(keyword)
+        scan: List[float] = []
+        indexed: List[float] = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            scan_hits = [doc_id for doc_id, text in haystack if needle in text]
+            scan.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            index_hits = index.lookup(keyword)
+            indexed.append((time.perf_counter() - started) * 1000)
+        print(
+            f"{'memory_user':<22} {keyword!r:<16} scan={statistics.median(scan):8.3f}ms ({len(scan_hits):>6}) "
+            f"indexed={statistics.median(indexed):8.3f}ms ({len(index_hits):>6})"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10, help="multiple of current production row counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=20260219)
+    parser.add_argument("--keep", action="store_true", help="keep scratch tables after the run")
+    parser.add_argument("--keywords", nargs="*", default=["EZARC", "carbide", "切木", "往复锯 锯条", "B0"])
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SET SESSION innodb_ft_enable_stopword = 0")
+            for source, scratch, spec, minimum in _TARGETS:
+                cursor.execute(f"SELECT COUNT(*) AS total FROM {source}")
+                total = int((cursor.fetchone() or {}).get("total") or 0)
+                rows = max(minimum, total * args.scale)
+                print(f"{scratch}: {rows} rows ({args.scale}x {source}={total})")
+                _prepare_table(cursor, source, scratch, rows, rng)
+                conn.commit()
+                cursor.execute(f"ANALYZE TABLE {scratch}")
+                cursor.fetchall()
+                _bench_sql(cursor, scratch, spec, args.keywords, args.repeat)
+            cursor.execute("SELECT COUNT(*) AS total FROM dim_bi_amazon_user")
+            user_total = int((cursor.fetchone() or {}).get("total") or 0)
+            if not args.keep:
+                for _, scratch, _, _ in _TARGETS:
+                    cursor.execute(f"DROP TABLE IF EXISTS {scratch}")
+        conn.commit()
+    _bench_memory(max(1000, user_total * args.scale), args.keywords, args.repeat, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Maintain monthly partitions of dim_bi_amazon_log.
+
+Run from the backend directory (or /app in Docker), e.g. daily from cron:
+  python scripts/audit_log_maintenance.py partitions --ahead 3
+  python scripts/audit_log_maintenance.py archive --retain-months 6
+  python scripts/audit_log_maintenance.py status
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+def add_runtime_paths() -> None:
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="dim_bi_amazon_log partition maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    partitions = commands.add_parser("partitions", help="partition the table on first run, then add upcoming months")
+    partitions.add_argument("--ahead", type=int, default=None, help="months to pre-create (AUDIT_LOG_PARTITIONS_AHEAD)")
+
+    archive = commands.add_parser("archive", help="export partitions older than the retention window and drop them")
+    archive.add_argument("--retain-months", type=int, default=None, help="months to keep online (AUDIT_LOG_RETAIN_MONTHS)")
+    archive.add_argument("--archive-dir", default=None, help="target directory for .csv.gz files (AUDIT_LOG_ARCHIVE_DIR)")
+    archive.add_argument("--dry-run", action="store_true")
+
+    commands.add_parser("status", help="list partitions with estimated row counts")
+    args = parser.parse_args()
+
+    add_runtime_paths()
+    from app.services import audit_log_maintenance
+
+    if args.command == "partitions":
+        created = audit_log_maintenance.ensure_partitions(args.ahead)
+        print(f"[audit-log] partitions_added={len(created)} {' '.join(created)}".rstrip())
+    elif args.command == "archive":
+        archive_dir = Path(args.archive_dir) if args.archive_dir else None
+        results = audit_log_maintenance.archive_partitions(args.retain_months, archive_dir, args.dry_run)
+        for item in results:
+            print(f"[audit-log] partition={item['partition']} rows={item['rows']} file={item['file']} dropped={item['dropped']}")
+        print(f"[audit-log] archived={len(results)}")
+    else:
+        for item in audit_log_maintenance.list_partitions():
+            bound = item["less_than"].isoformat() if item["less_than"] else "MAXVALUE"
+            print(f"[audit-log] partition={item['name']} less_than={bound} rows~{item['rows']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+-- Batch AI insight jobs (app/services/ai_insight_service.py submit_batch, Celery task bi_amazon.ai_insight.run_batch).
+-- A batch is the parent of one fact_bi_amzon_insight job per ASIN; progress is counted from the children.
+
+CREATE TABLE IF NOT EXISTS `fact_bi_amazon_ai_batch` (
+  `batch_id` varchar(32) NOT NULL COMMENT '批次任务ID',
+  `site` varchar(10) NOT NULL COMMENT '站点',
+  `category` varchar(255) DEFAULT NULL COMMENT '类目(按类目排名选取ASIN时)',
+  `batch_date` date DEFAULT NULL COMMENT 'BSR批次日期(按类目排名选取ASIN时)',
+  `range_days` smallint unsigned NOT NULL COMMENT '观察窗口天数',
+  `total` int unsigned NOT NULL DEFAULT '0' COMMENT '子任务数',
+  `status` varchar(20) NOT NULL COMMENT '状态(pending/running/done/failed)',
+  `operator_userid` varchar(64) NOT NULL COMMENT '操作人用户ID',
+  `created_at` datetime NOT NULL COMMENT '创建时间',
+  `started_at` datetime DEFAULT NULL COMMENT '开始处理时间',
+  `finished_at` datetime DEFAULT NULL COMMENT '结束时间',
+  PRIMARY KEY (`batch_id`),
+  KEY `idx_ai_batch_operator_created` (`operator_userid`,`created_at`),
+  KEY `idx_ai_batch_unfinished` (`finished_at`,`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='AI分析批次任务';
+
+ALTER TABLE `fact_bi_amzon_insight`
+  ADD COLUMN `batch_id` varchar(32) DEFAULT NULL COMMENT '所属批次任务ID' AFTER `job_id`,
+  ADD KEY `idx_ai_batch_status` (`batch_id`,`status`);
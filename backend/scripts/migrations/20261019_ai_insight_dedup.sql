@@ -0,0 +1,11 @@
+-- In-flight dedup of AI insight jobs (app/services/ai_insight_service.py submit_job):
+-- a new submission for the same (asin, site, range_days) as a pending/running job does not
+-- start another model call. The same operator gets the running job back; another operator gets
+-- a follower job (leader_job_id) that is completed with the leader's result.
+-- Rows created before this migration keep range_days NULL and never match.
+
+ALTER TABLE `fact_bi_amzon_insight`
+  ADD COLUMN `range_days` smallint unsigned DEFAULT NULL COMMENT '观察窗口天数' AFTER `asin`,
+  ADD COLUMN `leader_job_id` varchar(32) DEFAULT NULL COMMENT '复用的进行中任务ID(相同输入去重)' AFTER `batch_id`,
+  ADD KEY `idx_ai_inflight` (`asin`,`site`,`range_days`,`status`,`created_at`),
+  ADD KEY `idx_ai_leader` (`leader_job_id`);
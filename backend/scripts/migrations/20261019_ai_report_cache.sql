@@ -0,0 +1,21 @@
+-- AI insight reports keyed by a fingerprint of their input: the Keepa daily window of
+-- (asin, site, range_days), the model and the prompt version. Identical inputs reuse the report.
+
+CREATE TABLE IF NOT EXISTS `fact_bi_amazon_ai_report_cache` (
+  `fingerprint` char(64) NOT NULL COMMENT '输入指纹(SHA-256: ASIN/站点/窗口/数据内容/模型/提示词版本)',
+  `site` varchar(10) NOT NULL COMMENT '站点',
+  `asin` varchar(20) NOT NULL COMMENT 'ASIN',
+  `range_days` smallint unsigned NOT NULL COMMENT '观察窗口天数',
+  `latest_date` date DEFAULT NULL COMMENT '窗口内最新数据日期',
+  `row_count` int unsigned NOT NULL DEFAULT '0' COMMENT '窗口内数据行数',
+  `content_hash` char(64) NOT NULL COMMENT '窗口数据内容哈希',
+  `model` varchar(128) NOT NULL COMMENT '模型',
+  `prompt_version` varchar(32) NOT NULL COMMENT '提示词版本',
+  `summary` text COMMENT '汇总数据(JSON)',
+  `report_text` longtext NOT NULL COMMENT 'AI分析报告',
+  `hit_count` int unsigned NOT NULL DEFAULT '0' COMMENT '命中次数',
+  `created_at` datetime NOT NULL COMMENT '生成时间',
+  `last_hit_at` datetime DEFAULT NULL COMMENT '最近命中时间',
+  PRIMARY KEY (`fingerprint`),
+  KEY `idx_ai_report_cache_site_asin` (`site`,`asin`,`range_days`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='AI分析报告缓存(按输入数据指纹)';
@@ -0,0 +1,40 @@
+-- Activity rollups maintained by the audit log writer (user_repo.insert_audit_logs).
+-- Create the tables, then backfill them once from the existing log.
+
+CREATE TABLE IF NOT EXISTS `agg_bi_amazon_user_activity` (
+  `operator_userid` varchar(64) COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '操作者userid',
+  `last_active_at` datetime NOT NULL COMMENT '最近一次操作时间',
+  `total_visits` bigint unsigned NOT NULL DEFAULT '0' COMMENT '累计访问次数',
+  PRIMARY KEY (`operator_userid`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='用户活跃汇总(由操作日志写入时增量维护)';
+
+CREATE TABLE IF NOT EXISTS `agg_bi_amazon_visit_day` (
+  `stat_date` date NOT NULL COMMENT '日期',
+  `operator_userid` varchar(64) COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '操作者userid',
+  `module` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '模块',
+  `visit_count` int unsigned NOT NULL DEFAULT '0' COMMENT '访问次数',
+  PRIMARY KEY (`stat_date`,`operator_userid`,`module`),
+  KEY `idx_visit_day_user_date` (`operator_userid`,`stat_date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='按日/用户/模块访问汇总(由操作日志写入时增量维护)';
+
+-- Run the backfill with the backend stopped so no audit rows are written in between.
+TRUNCATE TABLE `agg_bi_amazon_user_activity`;
+TRUNCATE TABLE `agg_bi_amazon_visit_day`;
+
+INSERT INTO `agg_bi_amazon_user_activity` (operator_userid, last_active_at, total_visits)
+SELECT
+    COALESCE(operator_userid, ''),
+    MAX(created_at),
+    SUM(CASE WHEN action = 'visit' THEN 1 ELSE 0 END)
+FROM dim_bi_amazon_log
+GROUP BY COALESCE(operator_userid, '');
+
+INSERT INTO `agg_bi_amazon_visit_day` (stat_date, operator_userid, module, visit_count)
+SELECT
+    DATE(created_at),
+    COALESCE(operator_userid, ''),
+    COALESCE(module, ''),
+    COUNT(*)
+FROM dim_bi_amazon_log
+WHERE action = 'visit'
+GROUP BY DATE(created_at), COALESCE(operator_userid, ''), COALESCE(module, '');
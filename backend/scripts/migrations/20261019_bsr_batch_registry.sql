@@ -0,0 +1,73 @@
+-- Batch registry for BSR imports: one row per (site, batch, category) plus a site-wide row
+-- (category = ''). Refreshed by the post-import task after every import; backfilled once here.
+
+CREATE TABLE IF NOT EXISTS `dim_bi_amazon_bsr_batch` (
+  `site` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '站点',
+  `batch_date` date NOT NULL COMMENT '批次日期',
+  `category` varchar(255) COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '类目(空字符串为全站汇总)',
+  `item_count` int unsigned NOT NULL DEFAULT '0' COMMENT '明细行数',
+  `ranked_count` int unsigned NOT NULL DEFAULT '0' COMMENT 'TOP100有效排名行数(不含type=1)',
+  `brand_count` int unsigned NOT NULL DEFAULT '0' COMMENT '品牌数',
+  `sales` decimal(16,2) NOT NULL DEFAULT '0.00' COMMENT '月销售额合计',
+  `sales_volume` bigint unsigned NOT NULL DEFAULT '0' COMMENT '月销量合计',
+  `prev_batch_date` date DEFAULT NULL COMMENT '上一批次',
+  `compare_date` date DEFAULT NULL COMMENT '默认对比批次(7天前最近批次, 否则上一批次)',
+  `job_id` varchar(32) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '最近一次刷新的导入任务ID',
+  `refreshed_at` datetime NOT NULL COMMENT '刷新时间',
+  PRIMARY KEY (`site`,`batch_date`,`category`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='BSR批次登记与汇总(导入后处理刷新)';
+
+ALTER TABLE `fact_bi_amazon_import_job`
+  MODIFY COLUMN `status` varchar(20) NOT NULL COMMENT '状态(queued/parsing/writing/post_processing/done/failed/skipped)';
+
+INSERT INTO `dim_bi_amazon_bsr_batch` (
+    site, batch_date, category, item_count, ranked_count, brand_count, sales, sales_volume, refreshed_at
+)
+SELECT
+    site,
+    createtime,
+    category,
+    COUNT(*),
+    SUM(CASE WHEN bsr_rank BETWEEN 1 AND 100 AND COALESCE(CAST(type AS CHAR), '0') <> '1' THEN 1 ELSE 0 END),
+    COUNT(DISTINCT NULLIF(TRIM(brand), '')),
+    SUM(COALESCE(sales, 0)),
+    SUM(COALESCE(sales_volume, 0)),
+    NOW()
+FROM dim_bi_amazon_item
+WHERE category IS NOT NULL AND TRIM(category) <> ''
+GROUP BY site, createtime, category
+UNION ALL
+SELECT
+    site,
+    createtime,
+    '',
+    COUNT(*),
+    SUM(CASE WHEN bsr_rank BETWEEN 1 AND 100 AND COALESCE(CAST(type AS CHAR), '0') <> '1' THEN 1 ELSE 0 END),
+    COUNT(DISTINCT NULLIF(TRIM(brand), '')),
+    SUM(COALESCE(sales, 0)),
+    SUM(COALESCE(sales_volume, 0)),
+    NOW()
+FROM dim_bi_amazon_item
+GROUP BY site, createtime
+ON DUPLICATE KEY UPDATE refreshed_at = VALUES(refreshed_at);
+
+UPDATE `dim_bi_amazon_bsr_batch` r
+SET r.prev_batch_date = (
+    SELECT MAX(p.createtime)
+    FROM dim_bi_amazon_item p
+    WHERE p.site = r.site
+      AND (r.category = '' OR p.category = r.category)
+      AND p.createtime < r.batch_date
+);
+
+UPDATE `dim_bi_amazon_bsr_batch` r
+SET r.compare_date = COALESCE(
+    (
+        SELECT MAX(p.createtime)
+        FROM dim_bi_amazon_item p
+        WHERE p.site = r.site
+          AND (r.category = '' OR p.category = r.category)
+          AND p.createtime <= DATE_SUB(r.batch_date, INTERVAL 7 DAY)
+    ),
+    r.prev_batch_date
+);
@@ -0,0 +1,16 @@
+-- Content hashes of imported BSR files, used to skip identical re-uploads (force=true bypasses).
+
+CREATE TABLE IF NOT EXISTS `dim_bi_amazon_import_file` (
+  `site` varchar(10) NOT NULL COMMENT '站点',
+  `batch_date` date NOT NULL COMMENT '批次日期',
+  `file_role` varchar(32) NOT NULL COMMENT '文件角色(seller_file/jimu_file/jimu_file_51_100/seller_file_detail)',
+  `content_hash` char(64) NOT NULL COMMENT '文件内容SHA-256',
+  `size_bytes` bigint unsigned NOT NULL DEFAULT '0' COMMENT '文件大小',
+  `job_id` varchar(32) NOT NULL COMMENT '最近一次导入该文件的任务ID',
+  `updated_at` datetime NOT NULL COMMENT '更新时间',
+  PRIMARY KEY (`site`,`batch_date`,`file_role`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='已导入文件内容哈希(用于跳过重复导入)';
+
+ALTER TABLE `fact_bi_amazon_import_job`
+  ADD COLUMN `file_hashes` text COMMENT '上传文件内容哈希(JSON, 按文件角色)' AFTER `files`,
+  MODIFY COLUMN `status` varchar(20) NOT NULL COMMENT '状态(queued/parsing/writing/done/failed/skipped)';
@@ -0,0 +1,19 @@
+-- Async BSR import jobs (app/services/bsr_import_service.py, Celery task bi_amazon.bsr_import.run).
+
+CREATE TABLE IF NOT EXISTS `fact_bi_amazon_import_job` (
+  `job_id` varchar(32) NOT NULL COMMENT '任务ID',
+  `site` varchar(10) NOT NULL COMMENT '站点',
+  `status` varchar(20) NOT NULL COMMENT '状态(queued/parsing/writing/done/failed)',
+  `operator_userid` varchar(64) NOT NULL COMMENT '操作人用户ID',
+  `files` text COMMENT '上传文件路径(JSON, 按文件角色)',
+  `rows_imported` int unsigned NOT NULL DEFAULT '0' COMMENT 'BSR明细导入行数',
+  `monthly_rows_imported` int unsigned NOT NULL DEFAULT '0' COMMENT '月度明细导入行数',
+  `stage_timings` text COMMENT '各阶段耗时ms(JSON)',
+  `error_message` varchar(1000) DEFAULT NULL COMMENT '失败原因',
+  `created_at` datetime NOT NULL COMMENT '创建时间',
+  `started_at` datetime DEFAULT NULL COMMENT '开始处理时间',
+  `finished_at` datetime DEFAULT NULL COMMENT '结束时间',
+  PRIMARY KEY (`job_id`),
+  KEY `idx_import_job_operator_created` (`operator_userid`,`created_at`),
+  KEY `idx_import_job_status_created` (`status`,`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='BSR导入任务';
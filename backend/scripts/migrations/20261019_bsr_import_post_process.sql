@@ -0,0 +1,5 @@
+-- When an import's rows went live and its post-import task was queued; jobs left in post_processing
+-- well past this are closed by the reaper in app/services/bsr_import_service.py.
+
+ALTER TABLE `fact_bi_amazon_import_job`
+  ADD COLUMN `written_at` datetime DEFAULT NULL COMMENT '明细写入完成时间(进入后处理)' AFTER `started_at`;
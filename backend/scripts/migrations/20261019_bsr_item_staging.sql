@@ -0,0 +1,37 @@
+-- Staging table for BSR imports: rows are loaded and validated here, then the (site, createtime)
+-- slice of dim_bi_amazon_item is replaced in one short transaction.
+
+CREATE TABLE IF NOT EXISTS `dim_bi_amazon_item_staging` (
+  `job_id` varchar(32) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '导入任务ID',
+  `asin` varchar(25) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'ASIN',
+  `site` varchar(10) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '站点',
+  `parent_asin` varchar(25) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '父级 ASIN',
+  `title` varchar(255) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '产品标题',
+  `image_url` varchar(512) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '产品主图 URL',
+  `product_url` varchar(512) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '亚马逊产品详情页链接',
+  `brand` varchar(50) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '品牌',
+  `category` varchar(255) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '类目',
+  `price` decimal(10,2) DEFAULT NULL COMMENT '售价',
+  `list_price` decimal(10,2) DEFAULT NULL COMMENT '原价',
+  `score` decimal(3,1) DEFAULT NULL COMMENT '评分',
+  `comment_count` int DEFAULT '0' COMMENT '评论总数',
+  `bsr_rank` int DEFAULT NULL COMMENT 'BSR排名',
+  `category_rank` int DEFAULT NULL COMMENT '大类排名',
+  `variation_count` int DEFAULT '1' COMMENT '变体数',
+  `launch_date` date DEFAULT NULL COMMENT '上架日期',
+  `conversion_rate` decimal(5,4) DEFAULT NULL COMMENT '综合转化率',
+  `conversion_rate_period` varchar(10) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '转化率周期',
+  `organic_traffic_count` int DEFAULT NULL COMMENT '7天自然流量得分',
+  `organic_search_terms` int DEFAULT '0' COMMENT '自然搜索词',
+  `ad_traffic_count` int DEFAULT NULL COMMENT '7天广告流量得分',
+  `ad_search_terms` int DEFAULT '0' COMMENT '广告流量词',
+  `search_recommend_terms` int DEFAULT '0' COMMENT '搜索推荐词',
+  `sales_volume` int DEFAULT '0' COMMENT '月销量',
+  `sales` decimal(12,2) DEFAULT '0.00' COMMENT '月销售额',
+  `tags` varchar(512) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '产品标签，多个标签用逗号分隔',
+  `type` varchar(25) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '产品类型',
+  `createtime` date NOT NULL COMMENT '批次日期',
+  `staged_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '暂存时间',
+  PRIMARY KEY (`job_id`,`asin`,`site`,`createtime`),
+  KEY `idx_item_staging_staged_at` (`staged_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='BSR明细导入暂存表';
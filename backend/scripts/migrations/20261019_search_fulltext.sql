@@ -0,0 +1,12 @@
+-- Keyword search indexes used by app/search.py (MySQL 8, ngram parser, ngram_token_size = 2).
+-- Stopwords would swallow short ASIN/brand fragments, so build with the stopword list disabled.
+-- dim_bi_amazon_log gets none: it is partitioned by month (scripts/audit_log_maintenance.py), which
+-- FULLTEXT does not allow, and audit search uses LIKE over the pruned partitions.
+
+SET SESSION innodb_ft_enable_stopword = 0;
+
+ALTER TABLE `dim_bi_amazon_product`
+  ADD FULLTEXT KEY `ft_dim_bi_amazon_product_search` (`asin`,`product`,`brand`) WITH PARSER ngram;
+
+ALTER TABLE `dim_bi_amazon_todo`
+  ADD FULLTEXT KEY `ft_dim_bi_amazon_todo_search` (`title`,`detail`,`competitor_asin`,`yida_asin`) WITH PARSER ngram;
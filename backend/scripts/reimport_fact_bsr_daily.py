@@ -1,33 +1,27 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-"""Re-import fact_bi_amazon_product_day data from exported xlsx files.
+"""Re-import fact_bi_amazon_product_day data from per-ASIN Keepa xlsx exports.
 
-No CLI args. Configure constants below, then run:
-  python backend/scripts/reimport_fact_bsr_daily.py
+Run from the backend directory (or /app in Docker):
+  python scripts/reimport_fact_bsr_daily.py --dir files/2026-02-11 --site US --workers 8
+Progress is checkpointed to import_status.csv in the export directory; rerun the same
+command to resume, or pass --restart to import every workbook again.
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
 import re
 import sys
 from pathlib import Path
 from typing import List
 
-# ===== Fixed runtime config =====
-# Windows path is supported and will be converted to /mnt/... automatically.
-TARGET_EXPORT_DIR = r"D:\Yida_project\Bi-Amazon\backend\files\2026-02-11"
-TARGET_SITE = "US"
 
-
-def add_runtime_paths() -> Path:
-    bi_amazon_root = Path(__file__).resolve().parents[2]
-    yida_root = bi_amazon_root.parent
-    for path in (bi_amazon_root, yida_root):
-        path_str = str(path)
-        if path_str not in sys.path:
-            sys.path.insert(0, path_str)
-    return bi_amazon_root
+def add_runtime_paths() -> None:
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
 
 
 def convert_windows_path(raw: str) -> Path | None:
@@ -54,6 +48,7 @@ def resolve_export_dir(raw_dir: str) -> Path:
 
 
 def collect_asin_tokens(export_dir: Path) -> List[str]:
+    # status.csv is written by the exporter and lists the ASINs that were exported successfully.
     tokens: List[str] = []
     status_csv = export_dir / "status.csv"
     if status_csv.exists():
@@ -66,43 +61,52 @@ def collect_asin_tokens(export_dir: Path) -> List[str]:
                         tokens.append(asin)
         except Exception:
             pass
-
-    if tokens:
-        return list(dict.fromkeys(tokens))
-
-    for path in sorted(export_dir.glob("*.xlsx")):
-        if path.name.startswith("~$"):
-            continue
-        match = re.match(r"([A-Za-z0-9]{10})(?:_|$)", path.name)
-        if match:
-            tokens.append(match.group(1).upper())
     return list(dict.fromkeys(tokens))
 
 
 def main() -> None:
-    site = str(TARGET_SITE or "US").strip().upper() or "US"
+    parser = argparse.ArgumentParser(description="Backfill fact_bi_amazon_product_day from Keepa xlsx exports")
+    parser.add_argument("--dir", required=True, help="export directory (Windows paths are mapped to /mnt/<drive>)")
+    parser.add_argument("--site", default="US")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: min(8, cpu count))")
+    parser.add_argument("--chunk-rows", type=int, default=20000, help="rows per upsert chunk")
+    parser.add_argument("--asins", nargs="*", default=None, help="only these ASINs (default: status.csv, else all)")
+    parser.add_argument("--restart", action="store_true", help="ignore import_status.csv and import everything")
+    args = parser.parse_args()
+
     add_runtime_paths()
-    export_dir = resolve_export_dir(str(TARGET_EXPORT_DIR or "").strip())
+    from app.imports.keepa_daily_importer import import_keepa_exports, list_export_workbooks
 
-    workbook_count = len([p for p in export_dir.glob("*.xlsx") if not p.name.startswith("~$")])
+    site = str(args.site or "US").strip().upper() or "US"
+    export_dir = resolve_export_dir(args.dir)
+    asin_tokens = args.asins if args.asins else collect_asin_tokens(export_dir)
+    workbook_count = len(list_export_workbooks(export_dir, asin_tokens))
     if workbook_count <= 0:
         raise SystemExit(f"目录下没有可导入的 xlsx: {export_dir}")
 
-    asin_tokens = collect_asin_tokens(export_dir)
-
-    from backend.app.services import bsr_service
-
     print(f"[reimport] export_dir={export_dir}")
     print(f"[reimport] site={site}")
     print(f"[reimport] workbooks={workbook_count}")
     print(f"[reimport] asin_tokens={len(asin_tokens)}")
 
-    # started_at=None: import current folder's matched xlsx directly.
-    result = bsr_service._import_fact_bsr_daily_from_exports(export_dir, site, asin_tokens, None)
+    def _progress(state: dict) -> None:
+        if state["completed"] % 100 == 0 or state["completed"] == state["total"]:
+            print(f"[reimport] parsed={state['completed']}/{state['total']} rows_written={state['imported_rows']}")
+
+    result = import_keepa_exports(
+        export_dir,
+        site,
+        asin_tokens,
+        workers=args.workers,
+        chunk_rows=args.chunk_rows,
+        resume=not args.restart,
+        progress=_progress,
+    )
     print(
         "[reimport] done:"
         f" rows={result.get('imported_rows', 0)},"
         f" workbooks={result.get('workbook_count', 0)},"
+        f" resumed_skip={result.get('skipped_count', 0)},"
         f" failed_files={len(result.get('failed_files') or [])}"
     )
     for line in (result.get("failed_files") or []):
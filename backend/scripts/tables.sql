@@ -50,11 +50,15 @@ CREATE TABLE `dim_bi_amazon_log` (
   `operator_name` varchar(50) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '操作者姓名',
   `detail` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci COMMENT '详情',
   `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-  PRIMARY KEY (`id`),
+  PRIMARY KEY (`id`,`created_at`),
   KEY `idx_module_action` (`module`,`action`),
   KEY `idx_operator_userid` (`operator_userid`),
   KEY `idx_created_at` (`created_at`)
-) ENGINE=InnoDB AUTO_INCREMENT=2539 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='操作日志';
+) ENGINE=InnoDB AUTO_INCREMENT=2539 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='操作日志'
+/*!50500 PARTITION BY RANGE  COLUMNS(created_at)
+(PARTITION p202610 VALUES LESS THAN ('2026-11-01') ENGINE = InnoDB,
+ PARTITION pmax VALUES LESS THAN (MAXVALUE) ENGINE = InnoDB) */;
+-- Monthly partitions are managed by scripts/audit_log_maintenance.py.
 
 
 -- bi_amazon.dim_bi_amazon_mapping definition
@@ -115,7 +119,8 @@ CREATE TABLE `dim_bi_amazon_product` (
   `creator_userid` varchar(64) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '创建者钉钉userid',
   PRIMARY KEY (`asin`,`site`),
   KEY `idx_dim_bsr_product_site_updated_at` (`site`,`updated_at`),
-  KEY `idx_dim_bsr_product_site_updated_created_asin` (`site`,`updated_at`,`created_at`,`asin`)
+  KEY `idx_dim_bsr_product_site_updated_created_asin` (`site`,`updated_at`,`created_at`,`asin`),
+  FULLTEXT KEY `ft_dim_bi_amazon_product_search` (`asin`,`product`,`brand`) /*!50100 WITH PARSER `ngram` */
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='易达产品表';
 
 
@@ -159,7 +164,8 @@ CREATE TABLE `dim_bi_amazon_todo` (
   KEY `idx_dim_bi_amazon_todo_site` (`site`),
   KEY `idx_dim_bi_amazon_todo_yida_asin` (`yida_asin`),
   KEY `idx_dim_bi_amazon_todo_state` (`state`),
-  KEY `idx_dim_bi_amazon_todo_review_date` (`review_date`)
+  KEY `idx_dim_bi_amazon_todo_review_date` (`review_date`),
+  FULLTEXT KEY `ft_dim_bi_amazon_todo_search` (`title`,`detail`,`competitor_asin`,`yida_asin`) /*!50100 WITH PARSER `ngram` */
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='BI Amazon钉钉待办表';
 
 
@@ -222,12 +228,37 @@ CREATE TABLE `fact_bi_amazon_product_month` (
   KEY `idx_asin` (`asin`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='BSR月度销量/销售额历史表';
 
+-- bi_amazon.fact_bi_amazon_import_job definition
+
+CREATE TABLE `fact_bi_amazon_import_job` (
+  `job_id` varchar(32) NOT NULL COMMENT '任务ID',
+  `site` varchar(10) NOT NULL COMMENT '站点',
+  `status` varchar(20) NOT NULL COMMENT '状态(queued/parsing/writing/post_processing/done/failed/skipped)',
+  `operator_userid` varchar(64) NOT NULL COMMENT '操作人用户ID',
+  `files` text COMMENT '上传文件路径(JSON, 按文件角色)',
+  `file_hashes` text COMMENT '上传文件内容哈希(JSON, 按文件角色)',
+  `rows_imported` int unsigned NOT NULL DEFAULT '0' COMMENT 'BSR明细导入行数',
+  `monthly_rows_imported` int unsigned NOT NULL DEFAULT '0' COMMENT '月度明细导入行数',
+  `stage_timings` text COMMENT '各阶段耗时ms(JSON)',
+  `error_message` varchar(1000) DEFAULT NULL COMMENT '失败原因',
+  `created_at` datetime NOT NULL COMMENT '创建时间',
+  `started_at` datetime DEFAULT NULL COMMENT '开始处理时间',
+  `written_at` datetime DEFAULT NULL COMMENT '明细写入完成时间(进入后处理)',
+  `finished_at` datetime DEFAULT NULL COMMENT '结束时间',
+  PRIMARY KEY (`job_id`),
+  KEY `idx_import_job_operator_created` (`operator_userid`,`created_at`),
+  KEY `idx_import_job_status_created` (`status`,`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='BSR导入任务';
+
 -- bi_amazon.fact_bi_amzon_insight definition
 
 CREATE TABLE `fact_bi_amzon_insight` (
   `job_id` varchar(32) NOT NULL COMMENT '任务ID',
+  `batch_id` varchar(32) DEFAULT NULL COMMENT '所属批次任务ID',
+  `leader_job_id` varchar(32) DEFAULT NULL COMMENT '复用的进行中任务ID(相同输入去重)',
   `site` varchar(10) NOT NULL COMMENT '站点',
   `asin` varchar(20) NOT NULL COMMENT 'ASIN',
+  `range_days` smallint unsigned DEFAULT NULL COMMENT '观察窗口天数',
   `operator_userid` varchar(64) NOT NULL COMMENT '操作人用户ID',
   `status` varchar(20) NOT NULL COMMENT '状态(pending/running/success/failed)',
   `report_text` longtext COMMENT 'AI分析报告',
@@ -235,10 +266,33 @@ CREATE TABLE `fact_bi_amzon_insight` (
   PRIMARY KEY (`job_id`),
   KEY `idx_ai_site_asin` (`site`,`asin`),
   KEY `idx_ai_operator` (`operator_userid`),
-  KEY `idx_ai_status_created` (`status`,`created_at`)
+  KEY `idx_ai_status_created` (`status`,`created_at`),
+  KEY `idx_ai_batch_status` (`batch_id`,`status`),
+  KEY `idx_ai_inflight` (`asin`,`site`,`range_days`,`status`,`created_at`),
+  KEY `idx_ai_leader` (`leader_job_id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='AI分析任务与结果';
 
 
+-- bi_amazon.fact_bi_amazon_ai_batch definition
+
+CREATE TABLE `fact_bi_amazon_ai_batch` (
+  `batch_id` varchar(32) NOT NULL COMMENT '批次任务ID',
+  `site` varchar(10) NOT NULL COMMENT '站点',
+  `category` varchar(255) DEFAULT NULL COMMENT '类目(按类目排名选取ASIN时)',
+  `batch_date` date DEFAULT NULL COMMENT 'BSR批次日期(按类目排名选取ASIN时)',
+  `range_days` smallint unsigned NOT NULL COMMENT '观察窗口天数',
+  `total` int unsigned NOT NULL DEFAULT '0' COMMENT '子任务数',
+  `status` varchar(20) NOT NULL COMMENT '状态(pending/running/done/failed)',
+  `operator_userid` varchar(64) NOT NULL COMMENT '操作人用户ID',
+  `created_at` datetime NOT NULL COMMENT '创建时间',
+  `started_at` datetime DEFAULT NULL COMMENT '开始处理时间',
+  `finished_at` datetime DEFAULT NULL COMMENT '结束时间',
+  PRIMARY KEY (`batch_id`),
+  KEY `idx_ai_batch_operator_created` (`operator_userid`,`created_at`),
+  KEY `idx_ai_batch_unfinished` (`finished_at`,`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='AI分析批次任务';
+
+
 -- bi_amazon.dim_bi_amazon_role_rule definition
 
 CREATE TABLE `dim_bi_amazon_role_rule` (
@@ -286,3 +340,118 @@ CREATE TABLE `rel_bi_amazon_user_role` (
   CONSTRAINT `fk_rel_user_role_role` FOREIGN KEY (`role_code`) REFERENCES `dim_bi_amazon_role` (`role_code`) ON DELETE CASCADE ON UPDATE CASCADE,
   CONSTRAINT `fk_rel_user_role_user` FOREIGN KEY (`dingtalk_userid`) REFERENCES `dim_bi_amazon_user` (`dingtalk_userid`) ON DELETE CASCADE ON UPDATE CASCADE
 ) ENGINE=InnoDB AUTO_INCREMENT=3 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='用户角色关系';
+
+
+-- bi_amazon.agg_bi_amazon_user_activity definition
+
+CREATE TABLE `agg_bi_amazon_user_activity` (
+  `operator_userid` varchar(64) COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '操作者userid',
+  `last_active_at` datetime NOT NULL COMMENT '最近一次操作时间',
+  `total_visits` bigint unsigned NOT NULL DEFAULT '0' COMMENT '累计访问次数',
+  PRIMARY KEY (`operator_userid`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='用户活跃汇总(由操作日志写入时增量维护)';
+
+
+-- bi_amazon.agg_bi_amazon_visit_day definition
+
+CREATE TABLE `agg_bi_amazon_visit_day` (
+  `stat_date` date NOT NULL COMMENT '日期',
+  `operator_userid` varchar(64) COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '操作者userid',
+  `module` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '模块',
+  `visit_count` int unsigned NOT NULL DEFAULT '0' COMMENT '访问次数',
+  PRIMARY KEY (`stat_date`,`operator_userid`,`module`),
+  KEY `idx_visit_day_user_date` (`operator_userid`,`stat_date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='按日/用户/模块访问汇总(由操作日志写入时增量维护)';
+
+
+-- bi_amazon.dim_bi_amazon_item_staging definition
+
+CREATE TABLE `dim_bi_amazon_item_staging` (
+  `job_id` varchar(32) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '导入任务ID',
+  `asin` varchar(25) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'ASIN',
+  `site` varchar(10) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '站点',
+  `parent_asin` varchar(25) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '父级 ASIN',
+  `title` varchar(255) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '产品标题',
+  `image_url` varchar(512) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '产品主图 URL',
+  `product_url` varchar(512) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '亚马逊产品详情页链接',
+  `brand` varchar(50) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '品牌',
+  `category` varchar(255) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '类目',
+  `price` decimal(10,2) DEFAULT NULL COMMENT '售价',
+  `list_price` decimal(10,2) DEFAULT NULL COMMENT '原价',
+  `score` decimal(3,1) DEFAULT NULL COMMENT '评分',
+  `comment_count` int DEFAULT '0' COMMENT '评论总数',
+  `bsr_rank` int DEFAULT NULL COMMENT 'BSR排名',
+  `category_rank` int DEFAULT NULL COMMENT '大类排名',
+  `variation_count` int DEFAULT '1' COMMENT '变体数',
+  `launch_date` date DEFAULT NULL COMMENT '上架日期',
+  `conversion_rate` decimal(5,4) DEFAULT NULL COMMENT '综合转化率',
+  `conversion_rate_period` varchar(10) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '转化率周期',
+  `organic_traffic_count` int DEFAULT NULL COMMENT '7天自然流量得分',
+  `organic_search_terms` int DEFAULT '0' COMMENT '自然搜索词',
+  `ad_traffic_count` int DEFAULT NULL COMMENT '7天广告流量得分',
+  `ad_search_terms` int DEFAULT '0' COMMENT '广告流量词',
+  `search_recommend_terms` int DEFAULT '0' COMMENT '搜索推荐词',
+  `sales_volume` int DEFAULT '0' COMMENT '月销量',
+  `sales` decimal(12,2) DEFAULT '0.00' COMMENT '月销售额',
+  `tags` varchar(512) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '产品标签，多个标签用逗号分隔',
+  `type` varchar(25) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '产品类型',
+  `createtime` date NOT NULL COMMENT '批次日期',
+  `staged_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '暂存时间',
+  PRIMARY KEY (`job_id`,`asin`,`site`,`createtime`),
+  KEY `idx_item_staging_staged_at` (`staged_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='BSR明细导入暂存表';
+
+
+-- bi_amazon.dim_bi_amazon_import_file definition
+
+CREATE TABLE `dim_bi_amazon_import_file` (
+  `site` varchar(10) NOT NULL COMMENT '站点',
+  `batch_date` date NOT NULL COMMENT '批次日期',
+  `file_role` varchar(32) NOT NULL COMMENT '文件角色(seller_file/jimu_file/jimu_file_51_100/seller_file_detail)',
+  `content_hash` char(64) NOT NULL COMMENT '文件内容SHA-256',
+  `size_bytes` bigint unsigned NOT NULL DEFAULT '0' COMMENT '文件大小',
+  `job_id` varchar(32) NOT NULL COMMENT '最近一次导入该文件的任务ID',
+  `updated_at` datetime NOT NULL COMMENT '更新时间',
+  PRIMARY KEY (`site`,`batch_date`,`file_role`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='已导入文件内容哈希(用于跳过重复导入)';
+
+
+-- bi_amazon.dim_bi_amazon_bsr_batch definition
+
+CREATE TABLE `dim_bi_amazon_bsr_batch` (
+  `site` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '站点',
+  `batch_date` date NOT NULL COMMENT '批次日期',
+  `category` varchar(255) COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT '' COMMENT '类目(空字符串为全站汇总)',
+  `item_count` int unsigned NOT NULL DEFAULT '0' COMMENT '明细行数',
+  `ranked_count` int unsigned NOT NULL DEFAULT '0' COMMENT 'TOP100有效排名行数(不含type=1)',
+  `brand_count` int unsigned NOT NULL DEFAULT '0' COMMENT '品牌数',
+  `sales` decimal(16,2) NOT NULL DEFAULT '0.00' COMMENT '月销售额合计',
+  `sales_volume` bigint unsigned NOT NULL DEFAULT '0' COMMENT '月销量合计',
+  `prev_batch_date` date DEFAULT NULL COMMENT '上一批次',
+  `compare_date` date DEFAULT NULL COMMENT '默认对比批次(7天前最近批次, 否则上一批次)',
+  `job_id` varchar(32) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '最近一次刷新的导入任务ID',
+  `refreshed_at` datetime NOT NULL COMMENT '刷新时间',
+  PRIMARY KEY (`site`,`batch_date`,`category`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='BSR批次登记与汇总(导入后处理刷新)';
+
+
+-- bi_amazon.fact_bi_amazon_ai_report_cache definition
+
+CREATE TABLE `fact_bi_amazon_ai_report_cache` (
+  `fingerprint` char(64) NOT NULL COMMENT '输入指纹(SHA-256: ASIN/站点/窗口/数据内容/模型/提示词版本)',
+  `site` varchar(10) NOT NULL COMMENT '站点',
+  `asin` varchar(20) NOT NULL COMMENT 'ASIN',
+  `range_days` smallint unsigned NOT NULL COMMENT '观察窗口天数',
+  `latest_date` date DEFAULT NULL COMMENT '窗口内最新数据日期',
+  `row_count` int unsigned NOT NULL DEFAULT '0' COMMENT '窗口内数据行数',
+  `content_hash` char(64) NOT NULL COMMENT '窗口数据内容哈希',
+  `model` varchar(128) NOT NULL COMMENT '模型',
+  `prompt_version` varchar(32) NOT NULL COMMENT '提示词版本',
+  `summary` text COMMENT '汇总数据(JSON)',
+  `report_text` longtext NOT NULL COMMENT 'AI分析报告',
+  `hit_count` int unsigned NOT NULL DEFAULT '0' COMMENT '命中次数',
+  `created_at` datetime NOT NULL COMMENT '生成时间',
+  `last_hit_at` datetime DEFAULT NULL COMMENT '最近命中时间',
+  PRIMARY KEY (`fingerprint`),
+  KEY `idx_ai_report_cache_site_asin` (`site`,`asin`,`range_days`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='AI分析报告缓存(按输入数据指纹)';
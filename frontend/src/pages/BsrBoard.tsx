@@ -1081,6 +1081,7 @@ export function BsrBoard({
   const [sellerImportDraggingNext, setSellerImportDraggingNext] = useState(false);
   const [jimuImportDraggingNext, setJimuImportDraggingNext] = useState(false);
   const [importSite, setImportSite] = useState("US");
+  const [importForce, setImportForce] = useState(false);
   const [historyPopover, setHistoryPopover] = useState<{ asin: string; site: string } | null>(null);
   const [historyMonthData, setHistoryMonthData] = useState<BsrHistoryRow[]>([]);
   const [historyChildData, setHistoryChildData] = useState<BsrHistoryRow[]>([]);
@@ -1738,6 +1739,9 @@ export function BsrBoard({
       const apiBase = import.meta.env.VITE_API_BASE_URL || "";
       const formData = new FormData();
       formData.append("site", importSite);
+      if (importForce) {
+        formData.append("force", "true");
+      }
       if (hasDetail && sellerImportFileNext) {
         formData.append("seller_file_detail", sellerImportFileNext);
       }
@@ -1755,8 +1759,37 @@ export function BsrBoard({
         const message = data?.error?.message || data?.detail || `HTTP ${res.status}`;
         throw new Error(message);
       }
-      const rows = typeof data.rows === "number" ? data.rows : null;
-      const monthlyRows = typeof data.monthly_rows === "number" ? data.monthly_rows : null;
+      const jobId = String(data?.item?.job_id || "");
+      if (!jobId) {
+        throw new Error("导入任务创建失败");
+      }
+      let job = data.item as {
+        status?: string;
+        rows?: number;
+        monthly_rows?: number;
+        error_message?: string;
+        skipped_files?: string[];
+      };
+      while (job.status !== "done" && job.status !== "failed" && job.status !== "skipped") {
+        await new Promise((resolve) => window.setTimeout(resolve, 2000));
+        const jobRes = await fetch(`${apiBase}/api/bsr/import/jobs/${encodeURIComponent(jobId)}`);
+        const jobData = await jobRes.json().catch(() => ({}));
+        if (!jobRes.ok || !jobData.ok) {
+          const message = jobData?.error?.message || jobData?.detail || `HTTP ${jobRes.status}`;
+          throw new Error(message);
+        }
+        job = jobData.item || {};
+      }
+      if (job.status === "failed") {
+        throw new Error(job.error_message || "导入失败，请检查文件或后端服务。");
+      }
+      if (job.status === "skipped") {
+        showToast("文件与今日已导入的内容一致，已跳过；如需重新导入请勾选“强制重新导入”。", "info");
+        resetImportModalState();
+        return;
+      }
+      const rows = typeof job.rows === "number" ? job.rows : null;
+      const monthlyRows = typeof job.monthly_rows === "number" ? job.monthly_rows : null;
       const parts: string[] = [];
       if (rows !== null) {
         parts.push(`BSR ${rows}条`);
@@ -1764,6 +1797,9 @@ export function BsrBoard({
       if (monthlyRows !== null) {
         parts.push(`月度明细 ${monthlyRows}条`);
       }
+      if (job.skipped_files && job.skipped_files.length > 0) {
+        parts.push(`未变化文件已跳过 ${job.skipped_files.length}个`);
+      }
       const detailText = parts.length > 0 ? `，${parts.join("，")}` : "";
       showToast(`导入成功${detailText}`, "success");
       resetImportModalState();
@@ -1785,6 +1821,50 @@ export function BsrBoard({
     let timer: number | null = null;
     let failedPollCount = 0;
     const apiBase = import.meta.env.VITE_API_BASE_URL || "";
+    const streamAbort = new AbortController();
+
+    const finishJob = (status: string) => {
+      setAiInsightJobId(null);
+      if (status === "success") {
+        showConfirm("分析完成", "分析已完成，请到 AI Insights 页面查看。", () => onOpenAiInsights?.());
+        return;
+      }
+      showToast("AI分析失败", "error");
+    };
+
+    // Status is pushed over SSE; polling only takes over when the stream is unavailable or ends early.
+    const listen = async (): Promise<boolean> => {
+      const res = await fetch(`${apiBase}/api/ai-insights/jobs/${encodeURIComponent(aiInsightJobId)}/events`, {
+        headers: { Accept: "text/event-stream" },
+        signal: streamAbort.signal,
+      });
+      if (!res.ok || !res.body) return false;
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (!cancelled) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary = buffer.indexOf("\n\n");
+        while (boundary >= 0) {
+          const block = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf("\n\n");
+          let eventName = "message";
+          let dataText = "";
+          for (const line of block.split("\n")) {
+            if (line.startsWith("event:")) eventName = line.slice(6).trim();
+            else if (line.startsWith("data:")) dataText += line.slice(5).trim();
+          }
+          if (eventName !== "done") continue;
+          const data = JSON.parse(dataText || "{}") as { item?: { status?: string } };
+          finishJob(String(data?.item?.status || "").trim().toLowerCase());
+          return true;
+        }
+      }
+      return false;
+    };
 
     const scheduleNextPoll = () => {
       if (cancelled) return;
@@ -1806,12 +1886,7 @@ export function BsrBoard({
           scheduleNextPoll();
           return;
         }
-        setAiInsightJobId(null);
-        if (status === "success") {
-          showConfirm("分析完成", "分析已完成，请到 AI Insights 页面查看。", () => onOpenAiInsights?.());
-          return;
-        }
-        showToast("AI分析失败", "error");
+        finishJob(status);
       } catch (err) {
         if (cancelled) return;
         failedPollCount += 1;
@@ -1825,9 +1900,14 @@ export function BsrBoard({
       }
     };
 
-    void poll();
+    void listen()
+      .catch(() => false)
+      .then((finished) => {
+        if (!finished && !cancelled) void poll();
+      });
     return () => {
       cancelled = true;
+      streamAbort.abort();
       if (timer) {
         window.clearTimeout(timer);
       }
@@ -3653,6 +3733,7 @@ export function BsrBoard({
     setJimuImportFileNext(null);
     setImportError(null);
     setImportLoading(false);
+    setImportForce(false);
     setSellerImportDragging(false);
     setJimuImportDragging(false);
     setSellerImportDraggingNext(false);
@@ -4264,6 +4345,15 @@ export function BsrBoard({
                     <option value="UK">UK</option>
                     <option value="DE">DE</option>
                   </select>
+                  <label className="ml-auto flex items-center gap-2 text-xs font-semibold text-gray-500 cursor-pointer">
+                    <input
+                      type="checkbox"
+                      checked={importForce}
+                      onChange={(e) => setImportForce(e.target.checked)}
+                      className="w-3.5 h-3.5 rounded border-gray-300 text-[#3B9DF8] focus:ring-[#3B9DF8]/20"
+                    />
+                    强制重新导入
+                  </label>
                 </div>
                 <div className="space-y-6">
                   <div className="grid grid-cols-1 md:grid-cols-2 gap-4">